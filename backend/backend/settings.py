@@ -22,6 +22,18 @@ FAST2SMS_API_KEY = os.getenv('FAST2SMS_API_KEY')
 FAST2SMS_SENDER_ID = os.getenv('FAST2SMS_SENDER_ID')
 OTP_EXPIRY_MINUTES = os.getenv('OTP_EXPIRY_MINUTES', '5') # Default to '5' if not found
 OTP_EXPIRY_SECONDS = int(OTP_EXPIRY_MINUTES) * 60
+# Background Aadhaar verification jobs (worker/verification_jobs.py)
+VERIFICATION_JOB_WORKERS = int(os.getenv('VERIFICATION_JOB_WORKERS', '2'))
+VERIFICATION_JOB_QUEUE_SIZE = int(os.getenv('VERIFICATION_JOB_QUEUE_SIZE', '16'))
+# Threads fanning out job-match notifications for new jobs (NotificationService.enqueue_job_match_fanout);
+# 0 runs the fan-out in the committing thread
+JOB_MATCH_FANOUT_WORKERS = int(os.getenv('JOB_MATCH_FANOUT_WORKERS', '1'))
+# Allow per-request OCR debug traces (X-OCR-Trace: 1 or ?trace=1 on verify-aadhaar); always on when DEBUG
+OCR_TRACE_ENABLED = os.getenv('OCR_TRACE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+# Log the OCR stage timings and counters (utils/instrumentation.py) as a JSON line at most this often; 0 turns it off
+OCR_METRICS_LOG_SECONDS = int(os.getenv('OCR_METRICS_LOG_SECONDS', '300'))
+# Pub/sub pushing new notifications to streaming clients (services/notification_pubsub.py)
+NOTIFICATION_BROKER = os.getenv('NOTIFICATION_BROKER', 'services.notification_pubsub.InProcessBroker')
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -100,6 +112,42 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Local-memory caches are per process; point these at Redis/Memcached to share
+# them between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Per-user job recommendation results (services/recommendation_cache.py)
+    'recommendations': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recommendations',
+        'TIMEOUT': int(os.getenv('RECOMMENDATION_CACHE_TIMEOUT', 600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RECOMMENDATION_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+    # Background verification job states (worker/verification_jobs.py). Must be shared by every
+    # process serving the API, or a status poll landing on another worker gets a 404: the default
+    # database cache needs `python manage.py createcachetable`; Redis or Memcached work too.
+    'verification_jobs': {
+        'BACKEND': os.getenv('VERIFICATION_JOB_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('VERIFICATION_JOB_CACHE_LOCATION', 'verification_job_cache'),
+    },
+    # OCR text and ID fields by image content hash (worker/ocr_cache.py); no images are stored
+    'ocr_results': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ocr_results',
+        'TIMEOUT': int(os.getenv('OCR_RESULT_CACHE_TIMEOUT', 3600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('OCR_RESULT_CACHE_MAX_ENTRIES', 2000)),
+        },
+    },
+}
+
 # MongoDB Atlas configuration (for future use)
 # DATABASES = {
 #     'default': {
@@ -160,3 +208,23 @@ STATIC_URL = '/static/'
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Logging
+# https://docs.djangoproject.com/en/3.2/topics/logging/
+# Django's defaults, plus the periodic OCR metrics line (OCR_METRICS_LOG_SECONDS) on the console
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'utils.instrumentation': {
+            'handlers': ['console'],
+            'level': os.getenv('OCR_METRICS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
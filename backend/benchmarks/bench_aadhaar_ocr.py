@@ -0,0 +1,106 @@
+"""
+OCR time per Aadhaar upload: three readtext passes vs one detailed pass
+
+"three-pass" is the previous extract_text_from_image (full card, name_area
+and number_area each through readtext); "single-pass" is the current one,
+which reads the card once with boxes and only re-reads low-confidence regions.
+Runs on synthetic cards; needs easyocr installed.
+
+Usage:
+    python benchmarks/bench_aadhaar_ocr.py [--cards 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from common import BACKEND_DIR, print_table
+
+OCR_SRC = os.path.join(BACKEND_DIR, 'services', 'ocr_id_verification', 'src')
+
+NAMES = ['Ravi Kumar Sharma', 'Priya Deshmukh', 'Mohammed Irfan Shaikh', 'Sunita Devi', 'Anil Patil']
+
+
+def make_synthetic_card(rng, width=1400, height=880):
+    """A BGR image laid out like the front of an Aadhaar card"""
+    card = np.full((height, width, 3), 245, dtype=np.uint8)
+    cv2.rectangle(card, (0, 0), (width, int(height * 0.16)), (40, 120, 240), -1)  # Orange header
+    cv2.rectangle(card, (0, int(height * 0.92)), (width, height), (60, 160, 60), -1)  # Green footer
+    cv2.putText(card, 'GOVERNMENT OF INDIA', (int(width * 0.3), int(height * 0.1)),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.6, (255, 255, 255), 3)
+
+    cv2.rectangle(card, (60, int(height * 0.25)), (340, int(height * 0.7)), (180, 180, 180), -1)  # Photo
+    lines = [
+        rng.choice(NAMES),
+        f'DOB: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1960, 2004)}',
+        rng.choice(['Male', 'Female']),
+    ]
+    for i, line in enumerate(lines):
+        cv2.putText(card, line, (400, int(height * (0.35 + i * 0.1))), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (20, 20, 20), 3)
+
+    number = ' '.join(f'{rng.randint(0, 9999):04d}' for _ in range(3))
+    cv2.putText(card, number, (int(width * 0.3), int(height * 0.84)), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (10, 10, 10), 4)
+
+    # Faint watermark, like the ones phone scanner apps add
+    cv2.putText(card, 'Scanned by CamScanner', (int(width * 0.55), int(height * 0.9)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
+    return card
+
+
+def three_pass(processor, image):
+    """The previous extract_text_from_image: full card plus two region passes"""
+    processed = processor.preprocess_aadhaar_image(image)
+    regions = processor.detect_aadhaar_regions(processed)
+    lines = []
+    for name in ('full_card', 'name_area', 'number_area'):
+        lines.extend(processor.extract_text_from_region(processed, regions[name], name))
+    return "\n".join(set(lines))
+
+
+class CountingReader:
+    """Counts readtext calls made through the shared reader"""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.calls = 0
+
+    def readtext(self, *args, **kwargs):
+        self.calls += 1
+        return self.reader.readtext(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, OCR_SRC)
+    from ocr import processor, reader
+    if not reader.ocr_available():
+        sys.exit('easyocr is not installed (and OCR_SERVER_ADDRESS is not set); nothing to benchmark')
+
+    counting = CountingReader(reader.get_reader())
+    reader._reader = counting  # Route processor's get_reader() calls through the counter
+
+    rng = random.Random(3)
+    cards = [make_synthetic_card(rng) for _ in range(args.cards)]
+
+    rows = []
+    for name, extract in (('three-pass', lambda card: three_pass(processor, card)),
+                          ('single-pass', processor.extract_text_from_image)):
+        counting.calls = 0
+        start = time.perf_counter()
+        for card in cards:
+            extract(card)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rows.append((name, f'{counting.calls / len(cards):.1f}', f'{elapsed_ms / len(cards):.0f}'))
+
+    print_table(('extraction', 'readtext calls / card', 'ms / card'), rows)
+
+
+if __name__ == '__main__':
+    main()
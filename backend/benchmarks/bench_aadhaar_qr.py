@@ -0,0 +1,99 @@
+"""
+Aadhaar QR / barcode scanning: two full-resolution decodes vs the decode ladder
+
+"legacy" is the previous AadhaarVerificationService flow: pyzbar over the
+full image for QR codes, then again for barcodes (copied below). "ladder" is
+_scan_codes: downscaled, QR region, full resolution, stopping at the first QR
+code. Cards are synthetic, photographed at several sizes with a little blur
+and noise; some have no QR code, which is where the OCR fallback would run.
+Needs pyzbar (and the zbar library) installed.
+
+Usage:
+    python benchmarks/bench_aadhaar_qr.py [--cards 20] [--repeat 3]
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from common import print_table, setup_django
+from bench_aadhaar_ocr import NAMES, make_synthetic_card
+
+SIZES = [(4000, 2514), (3000, 1886), (1400, 880)]
+
+
+def make_qr_card(rng, width, height, with_qr=True):
+    """Grayscale photo of a synthetic card with its Secure QR-style code on the right"""
+    card = cv2.cvtColor(make_synthetic_card(rng, width, height), cv2.COLOR_BGR2GRAY)
+    if with_qr:
+        xml = (f'<PrintLetterBarcodeData uid="{rng.randint(2 * 10 ** 11, 10 ** 12 - 1)}" '
+               f'name="{rng.choice(NAMES)}" gender="{rng.choice("MF")}" dob="{rng.randint(1, 28):02d}-01-1990"/>')
+        qr = cv2.QRCodeEncoder.create().encode(xml)
+        side = int(height * 0.4)
+        qr = cv2.resize(qr, (side, side), interpolation=cv2.INTER_NEAREST)
+        x, y = int(width * 0.7), int(height * 0.3)
+        card[y:y + side, x:x + side] = qr
+
+    card = cv2.GaussianBlur(card, (5, 5), 0)
+    noise = np.random.default_rng(rng.randint(0, 10 ** 6)).normal(0, 6, card.shape)
+    return np.clip(card + noise, 0, 255).astype(np.uint8)
+
+
+def legacy_scan(service, pyzbar, gray):
+    """Previous _decode_qr_codes + _decode_barcodes: two full-resolution decodes"""
+    for symbol in pyzbar.decode(gray):
+        data = symbol.data.decode('utf-8')
+        if service._is_aadhaar_qr(data):
+            return data, 'qr'
+    for symbol in pyzbar.decode(gray):
+        data = symbol.data.decode('utf-8')
+        if service._is_aadhaar_barcode(data):
+            return data, 'barcode'
+    return None, 'ocr_fallback'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=20, help='cards per size')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from services import aadhaar_verification_service as module
+    if not module.PYZBAR_AVAILABLE:
+        sys.exit('pyzbar is not installed; nothing to benchmark')
+    pyzbar = module.pyzbar
+
+    rng = random.Random(20)
+    rows = []
+    for width, height in SIZES:
+        cards = [make_qr_card(rng, width, height, with_qr=i % 5 != 0) for i in range(args.cards)]
+        for name in ('legacy', 'ladder'):
+            service = module.AadhaarVerificationService()
+            outcomes = Counter()
+            timings = []
+            for _ in range(args.repeat):
+                outcomes.clear()
+                start = time.perf_counter()
+                for card in cards:
+                    if name == 'legacy':
+                        outcomes[legacy_scan(service, pyzbar, card)[1]] += 1
+                    else:
+                        qr_data, barcode_data = service._scan_codes(card)
+                        outcomes['qr' if qr_data else 'barcode' if barcode_data else 'ocr_fallback'] += 1
+                timings.append((time.perf_counter() - start) * 1000 / len(cards))
+            rows.append((f'{width}x{height}', name, f'{min(timings):.1f}', outcomes['qr'], outcomes['ocr_fallback']))
+
+        if service.stats():
+            stages = ', '.join(f'{stage} {n // args.repeat}' for stage, n in sorted(service.stats().items()))
+            print(f'{width}x{height} ladder stages: {stages}')
+
+    print_table(('card', 'scan', 'ms / card', 'QR found', 'OCR fallbacks'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Nightly alert scoring: one get_recommendations() call per user vs get_recommendations_bulk()
+
+Users have no coordinates, so every call scores every open job (the case the
+daily alert run hits for most users). Results are checked to be identical.
+
+Usage:
+    python benchmarks/bench_bulk_recommendations.py [--users 200] [--jobs 2000]
+"""
+import argparse
+import random
+import time
+
+from common import print_table, setup_django, test_database
+
+SKILLS = ['plumbing', 'electrical', 'painting', 'carpentry', 'welding', 'masonry', 'cleaning', 'driving']
+JOB_TYPES = ['plumbing', 'electrical', 'construction', 'painting', 'cleaning', 'delivery']
+
+
+def add_data(users, jobs, rng):
+    from worker.job_features import job_skill_mask, parse_required_experience
+    from worker.models import Job, User
+
+    User.objects.bulk_create([
+        User(uid=f'bench-{i}', phoneNumber=str(i), isVerified=True,
+             skills=rng.sample(SKILLS, rng.randint(0, 3)), JobTypes=rng.sample(JOB_TYPES, rng.randint(0, 2)),
+             experienceYears=rng.randint(0, 10), averageRating=round(rng.uniform(0, 5), 1))
+        for i in range(users)
+    ])
+
+    job_rows = []
+    for i in range(jobs):
+        title = f'{rng.choice(SKILLS).title()} work {i}'
+        description = f'{" ".join(rng.sample(SKILLS, 2))} job, {rng.randint(0, 8)} years'
+        job_rows.append(Job(
+            title=title, description=description, payPerDay=500, location='Pune', pincode='411001',
+            contractorContact='0000000000', jobType=rng.choice(JOB_TYPES),
+            # bulk_create skips Job.save(), so set the precomputed features explicitly
+            skillMask=job_skill_mask(title, description, None),
+            requiredExperience=parse_required_experience(description, None),
+        ))
+    Job.objects.bulk_create(job_rows, batch_size=2000)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from services.job_recommendation_service import JobRecommendationEngine
+
+    engine = JobRecommendationEngine()
+    engine.use_cache = False
+
+    with test_database():
+        add_data(args.users, args.jobs, random.Random(5))
+        user_ids = [f'bench-{i}' for i in range(args.users)]
+
+        with CaptureQueriesContext(connection) as loop_queries:
+            per_user, loop_ms = timed(lambda: {
+                user_id: engine.get_recommendations(user_id, limit=args.limit) for user_id in user_ids
+            })
+        with CaptureQueriesContext(connection) as bulk_queries:
+            bulk, bulk_ms = timed(lambda: engine.get_recommendations_bulk(user_ids, limit=args.limit))
+        assert bulk == per_user
+
+    print(f'{args.users} users x {args.jobs} open jobs, top {args.limit}')
+    print_table(('path', 'queries', 'ms'), [
+        ('per-user loop', len(loop_queries.captured_queries), f'{loop_ms:.0f}'),
+        ('bulk', len(bulk_queries.captured_queries), f'{bulk_ms:.0f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Nightly job alert run: per-user existence check and insert vs the chunked pipeline
+
+"legacy" is the previous send_daily_job_alerts (copied below): bulk scoring,
+then for every user a title__contains query for today's alert and a
+single-row create. "pipeline" is NotificationService.send_daily_job_alerts:
+one query for the users alerted today, users streamed in chunks, one
+bulk_create per chunk. Each path runs on a fresh database with the same users
+and jobs; a share of users already have today's alert, and both paths must
+write the same digests.
+
+Usage:
+    python benchmarks/bench_daily_alerts.py [--users 5000] [--jobs 500] [--alerted 0.1]
+"""
+import argparse
+import random
+import time
+
+from common import print_table, setup_django, test_database
+from bench_bulk_recommendations import add_data
+
+
+def legacy_send_daily_job_alerts():
+    from django.utils import timezone
+    from services.job_recommendation_service import recommendation_engine
+    from worker.models import Notification, User
+
+    user_ids = list(User.objects.filter(isVerified=True).values_list('uid', flat=True))
+    all_recommendations = recommendation_engine.get_recommendations_bulk(user_ids, limit=3)
+    for user_id, recommendations in all_recommendations.items():
+        if recommendations:
+            job_titles = [job['title'] for job in recommendations[:2]]
+            title = "🔔 Daily Job Alerts"
+            message = f"Found {len(recommendations)} new jobs for you: {', '.join(job_titles)}"
+            if len(recommendations) > 2:
+                message += f" and {len(recommendations) - 2} more"
+            today_alerts = Notification.objects.filter(
+                user_id=user_id, type='job_match', title__contains='Daily Job Alerts',
+                createdAt__date=timezone.now().date()
+            )
+            if not today_alerts.exists():
+                Notification.objects.create(user_id=user_id, title=title, message=message, type='job_match')
+
+
+def run(path, args):
+    from django.db import connection
+    from services.notification_service import DAILY_ALERT_TITLE, notification_service
+    from worker.models import Notification
+
+    with test_database():
+        rng = random.Random(21)
+        add_data(args.users, args.jobs, rng)
+        Notification.objects.bulk_create([
+            Notification(user_id=f'bench-{i}', title=DAILY_ALERT_TITLE, message='Sent earlier', type='job_match')
+            for i in rng.sample(range(args.users), int(args.users * args.alerted))
+        ])
+
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Counted with a wrapper: the debug query log keeps only the last 9000 queries
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            if path == 'legacy':
+                legacy_send_daily_job_alerts()
+            else:
+                notification_service.send_daily_job_alerts()
+            elapsed = time.perf_counter() - start
+
+        digests = sorted(Notification.objects.filter(title=DAILY_ALERT_TITLE).values_list('user_id', 'message'))
+    return digests, len(queries), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--jobs', type=int, default=500)
+    parser.add_argument('--alerted', type=float, default=0.1, help='share of users already alerted today')
+    args = parser.parse_args()
+
+    setup_django()
+    import logging
+    logging.disable(logging.INFO)
+
+    results = {path: run(path, args) for path in ('legacy', 'pipeline')}
+    assert results['legacy'][0] == results['pipeline'][0], 'pipeline wrote different digests'
+
+    print(f'{args.users} verified users x {args.jobs} open jobs, {args.alerted:.0%} already alerted; digests identical')
+    print_table(('path', 'queries', 'seconds', 'users / s'), [
+        (path, queries, f'{elapsed:.2f}', f'{args.users / elapsed:.0f}')
+        for path, (_, queries, elapsed) in results.items()
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Daily-worker and fallback scoring: pandas iterrows() vs column-wise NumPy
+
+The legacy path builds a DataFrame from a list of per-job dicts and walks it
+with iterrows(); the current path builds arrays straight from values_list()
+style rows and scores every job at once. Both start from the same rows, and
+the rankings are checked to be identical.
+
+Usage:
+    python benchmarks/bench_daily_scoring.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import random
+from decimal import Decimal
+
+import pandas as pd
+
+from common import print_table, setup_django, time_call
+
+WORKER_PROFILE = {'pincode': '411046', 'jobTypes': ['plumbing', 'Construction']}
+WORDS = ['plumbing', 'construction', 'painting', 'helper', 'cleaning', 'site', 'daily', 'work', 'urgent']
+
+
+def make_rows(count, rng):
+    """Rows shaped like Job.objects.values_list('id', 'title', 'description', 'location', 'pincode', 'payPerDay')"""
+    return [
+        (
+            i,
+            ' '.join(rng.sample(WORDS, 2)).title(),
+            ' '.join(rng.sample(WORDS, 5)),
+            rng.choice(['Pune', 'Mumbai', 'Nagpur']),
+            rng.choice(['411001', '411046', '400001', '440001', '']),
+            Decimal(rng.randrange(300, 2500, 50)),
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_daily(rows, worker_profile):
+    """The iterrows() implementation this benchmark replaces"""
+    jobs_df = pd.DataFrame([
+        {'id': job_id, 'pincode': pincode, 'payPerDay': float(pay),
+         'text_content': f"{title} {description} {location}"}
+        for job_id, title, description, location, pincode, pay in rows
+    ])
+    recommendations = []
+    for _, job_row in jobs_df.iterrows():
+        score = 0.0
+        if (worker_profile['pincode'] and job_row['pincode'] and
+                job_row['pincode'].startswith(worker_profile['pincode'][:3])):
+            score += 0.5
+        for job_type in worker_profile['jobTypes']:
+            if job_type.lower() in job_row['text_content'].lower():
+                score += 0.3
+        score += min(job_row['payPerDay'] / 2000.0, 1.0) * 0.2
+        recommendations.append((job_row['id'], score))
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return [job_id for job_id, score in recommendations]
+
+
+def legacy_simple(rows, worker_profile):
+    """The iterrows() fallback scorer this benchmark replaces"""
+    jobs_df = pd.DataFrame([
+        {'id': job_id, 'pincode': pincode, 'payPerDay': float(pay)}
+        for job_id, title, description, location, pincode, pay in rows
+    ])
+    recommendations = []
+    for _, job_row in jobs_df.iterrows():
+        score = job_row['payPerDay'] / 1000.0
+        if (worker_profile['pincode'] and job_row['pincode'] and
+                job_row['pincode'].startswith(worker_profile['pincode'][:3])):
+            score += 500
+        recommendations.append((job_row['id'], score))
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return [job_id for job_id, score in recommendations]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from worker.recommendation_service import job_columns_from_rows, recommendation_service as service
+
+    rng = random.Random(7)
+    rows_out = []
+    for size in args.sizes:
+        rows = make_rows(size, rng)
+
+        def daily():
+            return service._get_daily_recommendations(WORKER_PROFILE, job_columns_from_rows(rows))
+
+        def simple():
+            return service._get_simple_recommendations(WORKER_PROFILE, job_columns_from_rows(rows))
+
+        assert daily() == legacy_daily(rows, WORKER_PROFILE)
+        assert simple() == legacy_simple(rows, WORKER_PROFILE)
+
+        for name, legacy, current in (('daily', legacy_daily, daily), ('fallback', legacy_simple, simple)):
+            old_ms = time_call(lambda: legacy(rows, WORKER_PROFILE), args.repeat)
+            new_ms = time_call(current, args.repeat)
+            rows_out.append((size, name, f'{old_ms:.1f}', f'{new_ms:.1f}', f'{old_ms / new_ms:.1f}x'))
+
+    print_table(('jobs', 'scorer', 'iterrows ms', 'column-wise ms', 'speedup'), rows_out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Aadhaar field extraction over OCR line dumps: per-field regex loops vs ocr.fields
+
+"legacy" is the previous extract_aadhaar_number + extract_name_from_aadhaar +
+DOB loop, each stripping watermarks and compiling patterns on its own (copied
+below). "single-pass" is ocr.fields.scan_aadhaar_lines. Both must agree on
+every dump. Logging is disabled so only the matching work is timed.
+
+The corpus is synthetic OCR output (header text, Hindi lines, name, DOB,
+gender, number, address, scanner watermarks, OCR noise), or every *.txt file
+in --corpus-dir, one dump per file.
+
+Usage:
+    python benchmarks/bench_field_extraction.py [--dumps 2000] [--corpus-dir DIR] [--repeat 5]
+"""
+import argparse
+import glob
+import logging
+import random
+import re
+import sys
+
+from common import print_table, time_call
+from bench_aadhaar_ocr import NAMES, OCR_SRC
+
+HEADER_LINES = ['GOVERNMENT OF INDIA', 'भारत सरकार', 'Unique Identification Authority of India',
+                'आधार - आम आदमी का अधिकार', 'मेरा आधार, मेरी पहचान']
+WATERMARK_LINES = ['Scanned by CamScanner', 'Scannd by CamScanner', 'Download from Play Store',
+                   'Created with PDF Scanner app', 'Powered by DocScan']
+ADDRESS_LINES = ['S/O Ramesh Kumar, Near Bus Stand', 'At Post Satara, Maharashtra - 415001',
+                 'Flat 12, Shivaji Nagar, Pune 411005', 'VTC: Hadapsar, District: Pune']
+NOISE_LINES = ['|', 'Il', '..', 'e', 'O0O', 'Ta', '~']
+
+
+def make_dump(rng):
+    """OCR text lines for one synthetic card, in the shuffled order EasyOCR sets come back in"""
+    number = ' '.join(f'{rng.randint(0, 9999):04d}' for _ in range(3))
+    lines = rng.sample(HEADER_LINES, 3) + [
+        rng.choice(NAMES),
+        rng.choice([f'DOB: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1960, 2004)}',
+                    f'Year of Birth: {rng.randint(1960, 2004)}',
+                    f'जन्म तिथि / DOB : {rng.randint(1, 9)}/{rng.randint(1, 9)}/{rng.randint(1960, 2004)}']),
+        rng.choice(['Male', 'Female', 'पुरुष / MALE', 'महिला / FEMALE']),
+        rng.choice([number, number.replace(' ', '-'), number.replace(' ', ''), f'Aadhaar No. {number}']),
+        f'VID : {" ".join(f"{rng.randint(0, 9999):04d}" for _ in range(4))}',
+    ]
+    lines += rng.sample(ADDRESS_LINES, rng.randint(0, 2))
+    lines += rng.sample(WATERMARK_LINES, rng.randint(0, 2))
+    lines += rng.sample(NOISE_LINES, rng.randint(0, 3))
+    rng.shuffle(lines)
+    return lines
+
+
+# --- Previous implementation (ocr/processor.py before the compiled engine), logging removed ---
+
+def legacy_remove_scanning_watermarks(text_lines):
+    watermark_patterns = [
+        r'.*scann?ed?\s+by.*', r'.*camscann?er.*', r'.*scanner.*app.*', r'.*document.*scanner.*',
+        r'.*pdf.*scanner.*', r'.*created.*with.*', r'.*powered.*by.*', r'.*download.*from.*',
+        r'.*available.*on.*', r'.*play.*store.*', r'.*app.*store.*'
+    ]
+    cleaned_lines = []
+    for line in text_lines:
+        line_clean = line.strip().lower()
+        if not any(re.search(pattern, line_clean, re.IGNORECASE) for pattern in watermark_patterns):
+            cleaned_lines.append(line)
+    return cleaned_lines
+
+
+def legacy_extract_aadhaar_number(text_lines):
+    clean_lines = legacy_remove_scanning_watermarks(text_lines)
+    aadhaar_patterns = [
+        r'\b\d{4}\s+\d{4}\s+\d{4}\b', r'\b\d{4}-\d{4}-\d{4}\b', r'\b\d{12}\b', r'\b\d{4}\s*\d{4}\s*\d{4}\b',
+        r'(?:आधार|Aadhaar|AADHAAR).*?(\d{4}\s*\d{4}\s*\d{4})', r'(?:No\.?|Number|संख्या).*?(\d{4}\s*\d{4}\s*\d{4})',
+    ]
+    for line in clean_lines:
+        line_clean = line.strip()
+        for pattern in aadhaar_patterns:
+            for match in re.findall(pattern, line_clean, re.IGNORECASE):
+                number_str = (match[0] if match else "") if isinstance(match, tuple) else match
+                digits_only = re.sub(r'\D', '', number_str)
+                if len(digits_only) == 12 and digits_only.isdigit():
+                    return f"{digits_only[:4]} {digits_only[4:8]} {digits_only[8:]}"
+    return None
+
+
+def legacy_extract_name_from_aadhaar(text_lines, filter_keywords):
+    clean_lines = legacy_remove_scanning_watermarks(text_lines)
+    aadhaar_filter_keywords = set(filter_keywords)  # The literal set was rebuilt on every call
+    name_candidates = []
+    for line in clean_lines:
+        line_clean = line.strip()
+        if not line_clean or len(line_clean) < 3:
+            continue
+        if re.search(r'\d{4}\s*\d{4}\s*\d{4}', line_clean) or re.search(r'\d{2}/\d{2}/\d{4}', line_clean):
+            continue
+        cleaned_line = re.sub(r'[^\w\s]', ' ', line_clean)
+        name_words = []
+        for word in [word.strip() for word in cleaned_line.split() if word.strip()]:
+            if word.lower() in aadhaar_filter_keywords:
+                continue
+            if re.search(r'\d', word) and len(re.findall(r'\d', word)) > len(word) * 0.3:
+                continue
+            if len(word) < 2 or len(word) > 25:
+                continue
+            if not re.search(r'[a-zA-Z]', word):
+                continue
+            name_words.append(word)
+        if name_words:
+            candidate = ' '.join(name_words)
+            if 3 <= len(candidate) <= 50 and len(name_words) <= 4:
+                name_candidates.append((candidate, len(name_words) * 0.25))
+    if name_candidates:
+        return max(name_candidates, key=lambda x: x[1])[0]
+    return None
+
+
+def legacy_extract_dob(lines):
+    dob_patterns = [
+        r'\b\d{2}/\d{2}/\d{4}\b', r'\b\d{2}-\d{2}-\d{4}\b', r'\b\d{2}\.\d{2}\.\d{4}\b', r'\b\d{1,2}/\d{1,2}/\d{4}\b',
+        r'\b\d{1,2}-\d{1,2}-\d{4}\b', r'\b\d{4}/\d{2}/\d{2}\b', r'\b\d{4}-\d{2}-\d{2}\b',
+    ]
+    for line in lines:
+        for pattern in dob_patterns:
+            match = re.search(pattern, line)
+            if match:
+                potential_dob = match.group()
+                if re.match(r'\d{2}/\d{2}/\d{4}', potential_dob) or re.match(r'\d{1,2}/\d{1,2}/\d{4}', potential_dob):
+                    return potential_dob
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dumps', type=int, default=2000)
+    parser.add_argument('--corpus-dir', help='directory of *.txt OCR dumps (one line per OCR segment)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, OCR_SRC)
+    from ocr.fields import AADHAAR_FILTER_KEYWORDS, scan_aadhaar_lines
+    logging.disable(logging.WARNING)
+
+    if args.corpus_dir:
+        dumps = []
+        for path in sorted(glob.glob(f'{args.corpus_dir}/*.txt')):
+            with open(path, encoding='utf-8') as f:
+                dumps.append([line.strip() for line in f if line.strip()])
+    else:
+        rng = random.Random(18)
+        dumps = [make_dump(rng) for _ in range(args.dumps)]
+
+    def legacy():
+        return [{'number': legacy_extract_aadhaar_number(lines),
+                 'name': legacy_extract_name_from_aadhaar(lines, AADHAAR_FILTER_KEYWORDS),
+                 'dob': legacy_extract_dob(lines)} for lines in dumps]
+
+    def single_pass():
+        return [scan_aadhaar_lines(lines) for lines in dumps]
+
+    assert legacy() == single_pass(), 'single-pass extraction disagrees with the legacy functions'
+
+    legacy_ms = time_call(legacy, args.repeat)
+    single_ms = time_call(single_pass, args.repeat)
+    rows = [
+        ('legacy', f'{legacy_ms:.1f}', f'{legacy_ms * 1000 / len(dumps):.1f}'),
+        ('single-pass', f'{single_ms:.1f}', f'{single_ms * 1000 / len(dumps):.1f}'),
+    ]
+    print(f'{len(dumps)} OCR dumps, {sum(map(len, dumps))} lines; results identical')
+    print_table(('extraction', 'total ms', 'us / dump'), rows)
+
+
+if __name__ == '__main__':
+    main()
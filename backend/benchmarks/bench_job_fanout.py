@@ -0,0 +1,131 @@
+"""
+New-job match notifications: scan every worker vs the worker match index fan-out
+
+"scan" scores the new job against every verified user with _calculate_job_score and,
+for each match, goes through create_job_match_notification (a per-pair
+exists() check, then a single-row insert). "fan-out" is
+NotificationService.notify_matching_workers: candidates from the inverted
+index, exact scoring of those only, one dedup query and a bulk insert. Workers
+are spread over a few cities with random skills; each path posts the same jobs
+on a fresh database, and both must notify the same workers.
+
+Usage:
+    python benchmarks/bench_job_fanout.py [--users 20000] [--jobs 10]
+"""
+import argparse
+import random
+import time
+
+from common import print_table, setup_django, test_database
+
+SKILLS = ['plumbing', 'electrical', 'painting', 'carpentry', 'welding', 'masonry', 'cleaning', 'driving',
+          'cooking', 'security', 'delivery', 'gardening']
+CITIES = [(18.52, 73.85), (19.08, 72.88), (28.61, 77.21), (12.97, 77.59), (13.08, 80.27), (22.57, 88.36),
+          (17.39, 78.49), (23.02, 72.57), (26.91, 75.79), (21.15, 79.09)]
+
+
+def add_users(count, rng):
+    from worker.models import User
+
+    users = []
+    for i in range(count):
+        lat, lng = rng.choice(CITIES)
+        located = rng.random() < 0.8
+        users.append(User(
+            uid=f'bench-{i}', phoneNumber=str(i), isVerified=rng.random() < 0.5,
+            skills=rng.sample(SKILLS, rng.randint(0, 2)), JobTypes=rng.sample(SKILLS, rng.randint(0, 1)),
+            experienceYears=rng.randint(0, 6), averageRating=round(rng.uniform(3, 5), 1),
+            latitude=lat + rng.uniform(-0.2, 0.2) if located else None,
+            longitude=lng + rng.uniform(-0.2, 0.2) if located else None,
+        ))
+    User.objects.bulk_create(users, batch_size=2000)
+
+
+def post_jobs(count, rng):
+    from worker.models import Job
+
+    jobs = []
+    for i in range(count):
+        skill = rng.choice(SKILLS)
+        lat, lng = rng.choice(CITIES)
+        jobs.append(Job.objects.create(
+            title=f'{skill.title()} work {i}', description=f'{skill} job, {rng.randint(0, 5)} years',
+            payPerDay=500, location='City', pincode='000000', contractorContact='0000000000',
+            jobType=skill, latitude=lat, longitude=lng,
+        ))
+    return jobs
+
+
+def scan_notify(job, max_distance_km=50.0):
+    from services.job_recommendation_service import recommendation_engine
+    from services.notification_service import notification_service
+    from worker.geo import haversine_km
+    from worker.models import User
+
+    for user in User.objects.filter(isVerified=True):
+        score = recommendation_engine._calculate_job_score(user, job)
+        if score <= 0.7:
+            continue
+        if user.latitude and user.longitude and \
+                haversine_km((user.latitude, user.longitude), (job.latitude, job.longitude)) > max_distance_km:
+            continue
+        notification_service.create_job_match_notification(
+            user.uid, job, score, recommendation_engine._get_match_reasons(user, job))
+
+
+def run(path, args):
+    from django.db import connection
+    from django.test.utils import override_settings
+    from services.notification_service import notification_service
+    from services.worker_match_index import worker_match_index
+    from worker.models import Notification
+
+    # The signal-driven fan-out runs inline, so it is done before the notifications are cleared
+    with test_database(), override_settings(JOB_MATCH_FANOUT_WORKERS=0):
+        rng = random.Random(22)
+        add_users(args.users, rng)
+        jobs = post_jobs(args.jobs, rng)  # Outside a transaction.atomic block, so on_commit fires at once
+        Notification.objects.all().delete()
+        worker_match_index.invalidate()
+        worker_match_index.candidates(jobs[0])  # Build the index outside the timed part
+
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            for job in jobs:
+                if path == 'scan':
+                    scan_notify(job)
+                else:
+                    notification_service.notify_matching_workers(job)
+            elapsed = time.perf_counter() - start
+
+        notified = sorted(Notification.objects.values_list('job__title', 'user_id', 'message'))
+    return notified, len(queries), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--jobs', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    import logging
+    logging.disable(logging.INFO)
+
+    results = {path: run(path, args) for path in ('scan', 'fan-out')}
+    assert results['scan'][0] == results['fan-out'][0], 'fan-out notified different workers'
+
+    print(f'{args.users} users, {args.jobs} new jobs; {len(results["scan"][0])} notifications, identical')
+    print_table(('path', 'queries', 'ms / job'), [
+        (path, queries, f'{elapsed * 1000 / args.jobs:.1f}') for path, (_, queries, elapsed) in results.items()
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Latency of the "jobs within 50 km" filter against the number of open jobs
+
+Compares the grid-cell indexed JobRecommendationEngine._filter_by_location
+with the previous full scan (haversine over every open job).
+
+Usage:
+    python benchmarks/bench_location_filter.py [--sizes 1000 10000 50000] [--radius 50]
+"""
+import argparse
+import random
+
+from common import print_table, setup_django, test_database, time_call
+
+# Jobs are scattered over India's bounding box; the worker sits in Pune
+INDIA_LAT = (8.0, 35.0)
+INDIA_LNG = (68.0, 97.0)
+USER_LOCATION = (18.5204, 73.8567)
+
+
+def full_scan(engine, jobs, user_location, max_distance_km):
+    """The pre-index implementation: exact distance for every open job"""
+    filtered_jobs = []
+    for job in jobs:
+        if job.latitude and job.longitude:
+            if engine._calculate_distance(user_location, (job.latitude, job.longitude)) <= max_distance_km:
+                filtered_jobs.append(job)
+        else:
+            filtered_jobs.append(job)
+    return filtered_jobs
+
+
+def add_jobs(count, rng):
+    from worker.geo import cell_for
+    from worker.models import Job
+
+    jobs = []
+    for i in range(count):
+        lat = rng.uniform(*INDIA_LAT)
+        lng = rng.uniform(*INDIA_LNG)
+        jobs.append(Job(
+            title=f'Benchmark job {i}',
+            description='Construction helper needed',
+            payPerDay=500,
+            location='Benchmark',
+            pincode='411001',
+            contractorContact='0000000000',
+            latitude=lat,
+            longitude=lng,
+            # bulk_create skips Job.save(), so set the cell explicitly
+            geoCell=cell_for(lat, lng),
+        ))
+    Job.objects.bulk_create(jobs, batch_size=2000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000, 25000, 50000])
+    parser.add_argument('--radius', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from services.job_recommendation_service import JobRecommendationEngine
+    from worker.models import Job
+
+    engine = JobRecommendationEngine()
+    rng = random.Random(42)
+    rows = []
+
+    # A fresh queryset per call so no run reuses another's result cache
+    def open_jobs():
+        return Job.objects.filter(status__in=['open', 'active'])
+
+    with test_database():
+        for size in sorted(args.sizes):
+            add_jobs(size - Job.objects.count(), rng)
+            matched = len(engine._filter_by_location(open_jobs(), USER_LOCATION, args.radius))
+            assert matched == len(full_scan(engine, open_jobs(), USER_LOCATION, args.radius))
+
+            scan_ms = time_call(lambda: full_scan(engine, open_jobs(), USER_LOCATION, args.radius), args.repeat)
+            indexed_ms = time_call(lambda: engine._filter_by_location(open_jobs(), USER_LOCATION, args.radius), args.repeat)
+            rows.append((size, matched, f'{scan_ms:.1f}', f'{indexed_ms:.1f}', f'{scan_ms / indexed_ms:.1f}x'))
+
+    print(f'Jobs within {args.radius:g} km of {USER_LOCATION}')
+    print_table(('open jobs', 'matched', 'full scan ms', 'indexed ms', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
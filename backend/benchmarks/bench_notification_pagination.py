@@ -0,0 +1,62 @@
+"""
+Deep notification pages: OFFSET slicing vs keyset (cursor) pagination
+
+"offset" is the previous listing, notifications.order_by('-createdAt')[offset:offset + limit],
+here with the same (createdAt, id) order so both return the same rows. "keyset"
+is NotificationService.get_notifications_page continuing from a cursor. Both
+run against the migrated schema, so both have the (user, createdAt, id) index;
+the SQLite query plan for the keyset page is printed to show it is used.
+
+Usage:
+    python benchmarks/bench_notification_pagination.py [--notifications 100000] [--repeat 20]
+"""
+import argparse
+
+from common import print_table, setup_django, test_database, time_call
+
+LIMIT = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notifications', type=int, default=100000, help="notifications of the heavy user")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from services.notification_service import encode_cursor, notification_service
+    from worker.models import Notification, User
+
+    with test_database():
+        User.objects.bulk_create([User(uid='heavy', phoneNumber='1'), User(uid='other', phoneNumber='2')])
+        Notification.objects.bulk_create([
+            Notification(user_id='heavy' if i % 4 else 'other', title=f'Alert {i}', message='...', isRead=i % 3 == 0)
+            for i in range(args.notifications * 4 // 3)
+        ], batch_size=5000)
+        ordered = Notification.objects.filter(user_id='heavy').order_by('-createdAt', '-id')
+        total = ordered.count()
+
+        rows = []
+        for depth in (0, total // 10, total // 2, total - LIMIT):
+            offset_page = lambda: list(ordered[depth:depth + LIMIT])
+            cursor = encode_cursor(ordered[depth - 1]) if depth else None
+            keyset_page = lambda: notification_service.get_notifications_page('heavy', LIMIT, cursor=cursor)
+
+            assert [n.id for n in offset_page()] == [item['id'] for item in keyset_page()[0]]
+            rows.append((depth, f'{time_call(offset_page, args.repeat):.2f}', f'{time_call(keyset_page, args.repeat):.2f}'))
+
+        with CaptureQueriesContext(connection) as queries:
+            keyset_page()
+        with connection.cursor() as db:
+            db.execute(f'EXPLAIN QUERY PLAN {queries.captured_queries[0]["sql"]}')
+            plan = '; '.join(row[-1] for row in db.fetchall())
+
+    print(f'{total} notifications for one user, pages of {LIMIT}; pages identical')
+    print(f'keyset plan: {plan}')
+    print_table(('rows skipped', 'offset ms', 'keyset ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
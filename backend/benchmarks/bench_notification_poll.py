@@ -0,0 +1,83 @@
+"""
+Notification badge poll: COUNT(*) over the user's notifications vs the unread counter row
+
+"legacy" is the previous get_user_notifications + get_unread_count pair (copied
+below): each looks the user up again, every listed notification with a job
+loads that job, and the badge count is a COUNT(*) over the user's unread
+notifications. "counter" is the current service: the list by user_id with
+job_id read from the row, and the count read from the UnreadNotificationCount row.
+Both must return the same list and count.
+
+Usage:
+    python benchmarks/bench_notification_poll.py [--notifications 1000 10000 50000] [--repeat 50]
+"""
+import argparse
+import random
+
+from common import print_table, setup_django, test_database, time_call
+
+
+def legacy_poll(user_id, limit=20):
+    from worker.models import Notification, User
+
+    user = User.objects.get(uid=user_id)
+    notifications = [{
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.type,
+        'isRead': notification.isRead,
+        'createdAt': notification.createdAt.isoformat(),
+        'jobId': notification.job.id if notification.job else None,
+        'actionUrl': notification.actionUrl,
+    } for notification in Notification.objects.filter(user=user).order_by('-createdAt')[:limit]]
+    user = User.objects.get(uid=user_id)
+    return notifications, Notification.objects.filter(user=user, isRead=False).count()
+
+
+def counter_poll(user_id, limit=20):
+    from services.notification_service import notification_service
+
+    return notification_service.get_user_notifications(user_id, limit), notification_service.get_unread_count(user_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notifications', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help="notifications in the polling user's history")
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from services.notification_service import notification_service
+    from worker.models import Job, Notification, User
+
+    rows = []
+    for count in args.notifications:
+        with test_database():
+            rng = random.Random(23)
+            User.objects.bulk_create([User(uid=f'bench-{i}', phoneNumber=str(i)) for i in range(50)])
+            job = Job.objects.create(title='Plumbing work', description='plumbing', payPerDay=500, location='Pune',
+                                     pincode='411001', contractorContact='0000000000')
+            Notification.objects.bulk_create([
+                Notification(user_id=f'bench-{rng.randrange(50) if i % 2 else 0}', title=f'Alert {i}', message='...',
+                             type='job_match', isRead=rng.random() < 0.7, job=job if i % 3 == 0 else None)
+                for i in range(count)
+            ], batch_size=5000)
+            notification_service.repair_unread_counts()  # bulk_create above bypassed the service
+
+            assert legacy_poll('bench-0') == counter_poll('bench-0')
+            for name, poll in (('legacy', legacy_poll), ('counter', counter_poll)):
+                with CaptureQueriesContext(connection) as queries:
+                    poll('bench-0')
+                rows.append((count, name, len(queries.captured_queries),
+                             f'{time_call(lambda: poll("bench-0"), args.repeat):.2f}'))
+
+    print('Polling user owns about half of the notifications; responses identical')
+    print_table(('notifications', 'poll', 'queries', 'ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
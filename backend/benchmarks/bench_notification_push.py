@@ -0,0 +1,65 @@
+"""
+Notification delivery: polling the listing vs pushing through the in-process broker
+
+"poll" is what clients did before the event stream: GET the notification
+listing every --poll-interval seconds, two queries each, so a new notification
+waits half an interval on average. "push" subscribes --clients streams to
+InProcessBroker on one event loop; a worker thread (like the request thread
+whose transaction committed) publishes one notification per client, and the
+time until each subscriber has it is measured.
+
+Usage:
+    python benchmarks/bench_notification_push.py [--clients 5000] [--poll-interval 10]
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from common import print_table, setup_django
+
+
+async def measure_push(clients):
+    from services.notification_pubsub import InProcessBroker
+
+    broker = InProcessBroker()
+    subscriptions = [await broker.subscribe(f'user-{i}') for i in range(clients)]
+
+    def publish_all():
+        for i in range(clients):
+            broker.publish(f'user-{i}', {'id': i, 'sent': time.perf_counter()})
+
+    publisher = threading.Thread(target=publish_all)
+    publisher.start()
+    latencies = []
+    for subscription in subscriptions:
+        event = await subscription.get(timeout=10)
+        latencies.append((time.perf_counter() - event['sent']) * 1000)
+    publisher.join()
+
+    for subscription in subscriptions:
+        await subscription.close()
+    assert broker.stats()['subscribers'] == 0
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=5000)
+    parser.add_argument('--poll-interval', type=float, default=10.0, help='seconds between client polls')
+    args = parser.parse_args()
+
+    setup_django()
+    latencies = asyncio.run(measure_push(args.clients))
+
+    polls_per_minute = args.clients * 60 / args.poll_interval
+    print(f'{args.clients} connected clients, one new notification each')
+    print_table(('delivery', 'queries / min (idle)', 'mean latency ms', 'p99 latency ms'), [
+        ('poll', f'{polls_per_minute * 2:.0f}', f'{args.poll_interval * 500:.0f}', f'{args.poll_interval * 990:.0f}'),
+        ('push', 0, f'{statistics.mean(latencies):.2f}', f'{statistics.quantiles(latencies, n=100)[98]:.2f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+OCR throughput under bursty verification traffic, by batch size
+
+Simulates --clients concurrent uploads, each OCR-ing preprocessed synthetic
+Aadhaar cards through one OcrBatcher, and reports images per second for each
+maximum batch size (1 = no batching). Needs easyocr installed.
+
+Usage:
+    python benchmarks/bench_ocr_batching.py [--batch-sizes 1 2 4 8] [--clients 8] [--cards 4]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from common import print_table
+from bench_aadhaar_ocr import OCR_SRC, make_synthetic_card
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--cards', type=int, default=4, help='cards OCR-ed by each client')
+    parser.add_argument('--window-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, OCR_SRC)
+    from ocr import processor, reader
+    from ocr.batching import OcrBatcher
+    if not reader.ocr_available() or reader.server_settings() is not None:
+        sys.exit('needs easyocr installed locally (and OCR_SERVER_ADDRESS unset)')
+
+    local_reader = reader.load_local_reader()
+    rng = random.Random(9)
+    cards = [processor.preprocess_aadhaar_image(make_synthetic_card(rng)) for _ in range(args.cards)]
+    local_reader.readtext(cards[0], detail=1, **processor.OCR_READ_OPTIONS)  # Warm up the models
+
+    rows = []
+    for batch_size in args.batch_sizes:
+        batcher = OcrBatcher(local_reader, max_batch_size=batch_size, window_ms=args.window_ms)
+
+        def client():
+            for card in cards:
+                batcher.readtext(card, detail=1, **processor.OCR_READ_OPTIONS)
+
+        threads = [threading.Thread(target=client) for _ in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        images = args.clients * args.cards
+        rows.append((batch_size, batcher.batches, f'{images / elapsed:.2f}', f'{elapsed / images * 1000:.0f}'))
+
+    print(f'{args.clients} concurrent clients x {args.cards} cards')
+    print_table(('max batch', 'batches run', 'images/s', 'ms/image'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Web-process cold start and resident memory with lazy vs eager EasyOCR loading
+
+Each scenario runs in a fresh interpreter that sets up Django and imports
+worker.views, as a web worker does at boot:
+
+    lazy     current behaviour: the OCR reader is not built at import
+    eager    the old behaviour: the reader is built during startup
+             (needs easyocr installed; reported as n/a otherwise)
+    remote   OCR_SERVER_ADDRESS set: the process only holds a RemoteReader
+
+Usage:
+    python benchmarks/bench_ocr_startup.py [--repeat 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import BACKEND_DIR, print_table
+
+CHILD = r'''
+import json, os, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+import django
+django.setup()
+import worker.views
+if {build_reader!r}:
+    from ocr.reader import get_reader
+    get_reader()
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+'''
+
+
+def run_scenario(build_reader: bool, env: dict, repeat: int):
+    timings, rss = [], []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD.format(backend=BACKEND_DIR, build_reader=build_reader)],
+            capture_output=True, text=True, env=env, cwd=BACKEND_DIR,
+        )
+        if result.returncode != 0:
+            return None
+        measurement = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(measurement['ms'])
+        rss.append(measurement['rss_mb'])
+    return statistics.median(timings), statistics.median(rss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    base_env = {k: v for k, v in os.environ.items() if not k.startswith('OCR_SERVER_')}
+    remote_env = dict(base_env, OCR_SERVER_ADDRESS='127.0.0.1:8765', OCR_SERVER_AUTHKEY='benchmark')
+
+    rows = []
+    for name, build_reader, env in (('lazy', False, base_env), ('eager', True, base_env),
+                                     ('remote', True, remote_env)):
+        measured = run_scenario(build_reader, env, args.repeat)
+        if measured is None:
+            rows.append((name, 'n/a', 'n/a'))
+        else:
+            rows.append((name, f'{measured[0]:.0f}', f'{measured[1]:.0f}'))
+
+    print_table(('scenario', 'startup ms', 'max RSS MB'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Rows and time per recommendation request, with and without the SQL prefilter
+
+"unfiltered" loads every open job as a full model row and filters by distance
+in Python, as get_recommendations did before; "prefiltered" is the current
+batch path (bounding box + grid cells in SQL, SCORING_FIELDS columns only,
+full rows just for the returned jobs). Rankings are checked to be identical.
+
+Usage:
+    python benchmarks/bench_prefilter.py [--sizes 1000 10000 50000] [--radius 50]
+"""
+import argparse
+import random
+
+import numpy as np
+
+from common import print_table, setup_django, test_database, time_call
+from bench_location_filter import USER_LOCATION, add_jobs
+
+
+def unfiltered(engine, user, jobs, max_distance_km, limit):
+    """Score every open job from full rows, like the pre-prefilter batch path"""
+    from services.job_recommendation_service import JobFeatureBatch
+
+    batch = JobFeatureBatch(list(jobs), engine)
+    scores = engine._calculate_batch_scores(user, batch)
+    keep = (scores > 0) & batch.within_distance(USER_LOCATION, max_distance_km)
+    candidates = np.flatnonzero(keep)
+    ranked = candidates[np.argsort(-scores[candidates], kind='stable')][:limit]
+    return len(batch), [batch.jobs[i].id for i in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--radius', type=float, default=50.0)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from services.job_recommendation_service import JobRecommendationEngine
+    from worker.models import Job, User
+
+    engine = JobRecommendationEngine()
+    rng = random.Random(42)
+    rows = []
+
+    with test_database():
+        user = User.objects.create(uid='bench', phoneNumber='1', skills=['construction'], JobTypes=['construction'],
+                                   latitude=USER_LOCATION[0], longitude=USER_LOCATION[1])
+        for size in sorted(args.sizes):
+            add_jobs(size - Job.objects.count(), rng)
+
+            def legacy():
+                return unfiltered(engine, user, engine._available_jobs(), args.radius, args.limit)
+
+            def prefiltered():
+                return engine._score_jobs_batch(user, engine._available_jobs(), USER_LOCATION, args.radius, args.limit)
+
+            loaded, legacy_ids = legacy()
+            engine.prefilter_stats.clear()
+            assert [item['job'].id for item in prefiltered()] == legacy_ids
+            fetched = engine.row_stats()['rows_fetched']
+
+            legacy_ms = time_call(legacy, args.repeat)
+            prefiltered_ms = time_call(prefiltered, args.repeat)
+            rows.append((size, loaded, fetched, f'{legacy_ms:.1f}', f'{prefiltered_ms:.1f}',
+                         f'{legacy_ms / prefiltered_ms:.1f}x'))
+
+    print(f'Top {args.limit} jobs within {args.radius:g} km of {USER_LOCATION}')
+    print_table(('open jobs', 'rows unfiltered', 'rows prefiltered', 'unfiltered ms', 'prefiltered ms', 'speedup'),
+                rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Aadhaar image preprocessing: previous three-step chain vs the fused pipeline
+
+"chained" is what verification used to run per upload:
+preprocess_image_from_streamlit -> enhance_text_regions -> preprocess_aadhaar_image
+(two resizes, CLAHE / bilateral / thresholding twice). "fused" is
+utils.preprocessing.PreprocessingPipeline. Both start from the JPEG bytes of
+synthetic cards at phone-photo, scan and thumbnail sizes. Needs only OpenCV.
+
+Usage:
+    python benchmarks/bench_preprocessing.py [--repeat 5]
+"""
+import argparse
+import logging
+import random
+import statistics
+import sys
+
+import cv2
+
+from common import print_table, time_call
+from bench_aadhaar_ocr import OCR_SRC, make_synthetic_card
+
+SIZES = [(3000, 1886), (1400, 880), (700, 440)]
+
+
+class UploadedBytes:
+    """The file-like object preprocess_image_from_streamlit expects"""
+
+    def __init__(self, content):
+        self.content = content
+
+    def read(self):
+        return self.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, OCR_SRC)
+    from ocr.processor import preprocess_aadhaar_image
+    from utils.helpers import preprocess_image_from_streamlit, enhance_text_regions, validate_image_quality
+    from utils.preprocessing import PreprocessingPipeline
+    logging.disable(logging.INFO)  # The chained helpers log every step
+
+    def chained(content):
+        processed = preprocess_image_from_streamlit(UploadedBytes(content))
+        validate_image_quality(processed)
+        return preprocess_aadhaar_image(enhance_text_regions(processed))
+
+    pipeline = PreprocessingPipeline()
+    rng = random.Random(5)
+
+    rows = []
+    stage_rows = []
+    for width, height in SIZES:
+        card = make_synthetic_card(rng, width, height)
+        content = cv2.imencode('.jpg', card, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+        chained_ms = time_call(lambda: chained(content), args.repeat)
+        fused_ms = time_call(lambda: pipeline.run(content), args.repeat)
+        rows.append((f'{width}x{height}', f'{chained_ms:.1f}', f'{fused_ms:.1f}', f'{chained_ms / fused_ms:.1f}x'))
+
+        reports = [pipeline.run(content)[1]['timings_ms'] for _ in range(args.repeat)]
+        stage_rows.append([f'{width}x{height}'] + [f'{statistics.median(r[stage] for r in reports):.1f}'
+                                                   for stage in reports[0]])
+
+    print_table(('card', 'chained ms', 'fused ms', 'speedup'), rows)
+    print()
+    print('Fused pipeline, median ms per stage')
+    print_table(['card'] + list(reports[0]), stage_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Ranking cost: full sort + slice vs top-k selection
+
+Compares the old "sort everything, then [:limit]" ranking with
+services.ranking for both the NumPy score arrays and the list-of-dicts path
+used by the per-job scorer. Results are checked to be identical.
+
+Usage:
+    python benchmarks/bench_top_k.py [--sizes 10000 100000 1000000] [--k 10]
+"""
+import argparse
+
+import numpy as np
+
+from common import print_table, setup_django, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from services.ranking import top_k, top_k_indices
+
+    rng = np.random.default_rng(11)
+    rows = []
+    for size in args.sizes:
+        # Rounded scores so there are many ties, like the weighted recommendation scores
+        scores = np.round(rng.random(size), 3)
+
+        def full_sort():
+            return np.argsort(-scores, kind='stable')[:args.k]
+
+        def selection():
+            return top_k_indices(scores, args.k)
+
+        assert full_sort().tolist() == selection().tolist()
+        rows.append((size, 'ndarray', f'{time_call(full_sort, args.repeat):.2f}',
+                     f'{time_call(selection, args.repeat):.2f}'))
+
+        items = [{'id': i, 'score': float(score)} for i, score in enumerate(scores[:min(size, 200000)])]
+
+        def list_sort():
+            ranked = list(items)
+            ranked.sort(key=lambda x: x['score'], reverse=True)
+            return ranked[:args.k]
+
+        def heap():
+            return top_k(items, args.k, key=lambda x: x['score'])
+
+        assert list_sort() == heap()
+        rows.append((len(items), 'list of dicts', f'{time_call(list_sort, args.repeat):.2f}',
+                     f'{time_call(heap, args.repeat):.2f}'))
+
+    print_table(('candidates', 'input', 'sort ms', 'top-k ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
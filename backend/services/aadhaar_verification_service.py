@@ -10,15 +10,28 @@ import xml.etree.ElementTree as ET
 import base64
 import re
 import logging
+import threading
+from collections import Counter
 from typing import Dict, Tuple, Optional
 
 logger = logging.getLogger(__name__)
 
+# Longest side of the downscaled first decode attempt; Aadhaar QR codes are large
+# enough to survive it and zbar is much faster on fewer pixels
+QR_DOWNSCALE_MAX_SIDE = 1000
+
+# Where the QR code usually is, as fractions (x1, y1, x2, y2) of the image:
+# the right half, on both the printed card and e-Aadhaar layouts
+QR_REGION = (0.5, 0.0, 1.0, 1.0)
+
 class AadhaarVerificationService:
     """Service for Aadhaar card QR code and barcode verification"""
     
     def __init__(self):
         self.required_fields = ['name', 'gender', 'dob', 'uid']
+        # How each verification was decided: ladder stage that found a code, or the OCR fallback
+        self.scan_stats = Counter()
+        self._stats_lock = threading.Lock()
     
     def verify_aadhaar_image(self, image_path: str) -> Dict:
         """
@@ -31,27 +44,27 @@ class AadhaarVerificationService:
             Dict with verification result and extracted data
         """
         try:
-            # Read the image
-            image = cv2.imread(image_path)
-            if image is None:
+            # Read the image (everything below works on grayscale)
+            gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
                 return {
                     'success': False,
                     'error': 'Could not read image file',
                     'verification_status': 'failed'
                 }
             
-            # Try to decode QR codes and barcodes
-            qr_data = self._decode_qr_codes(image)
+            # Decode QR codes and barcodes, cheapest attempts first
+            qr_data, barcode_data = self._scan_codes(gray)
             if qr_data:
                 return self._process_qr_data(qr_data)
             
             # If no QR code found, try barcode
-            barcode_data = self._decode_barcodes(image)
             if barcode_data:
                 return self._process_barcode_data(barcode_data)
             
             # If no codes found, try OCR as fallback
-            ocr_data = self._extract_text_ocr(image)
+            self._record('ocr_fallback')
+            ocr_data = self._extract_text_ocr(gray)
             return self._process_ocr_data(ocr_data)
             
         except Exception as e:
@@ -62,51 +75,72 @@ class AadhaarVerificationService:
                 'verification_status': 'failed'
             }
     
-    def _decode_qr_codes(self, image) -> Optional[str]:
-        """Decode QR codes from image"""
+    def _scan_codes(self, gray) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Find an Aadhaar QR code or barcode, trying cheap decodes first
+        
+        Ladder: downscaled image, then the usual QR region at full resolution,
+        then the whole full-resolution image. Stops at the first QR code; a
+        barcode is only used if no step finds a QR code.
+        
+        Returns:
+            (QR data, barcode data), either None when not found
+        """
         if not PYZBAR_AVAILABLE:
-            logger.warning("pyzbar not available, skipping QR code extraction")
-            return None
-
-        try:
-            # Convert to grayscale for better detection
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-            # Detect and decode QR codes
-            qr_codes = pyzbar.decode(gray)
-
-            for qr_code in qr_codes:
-                # Aadhaar QR codes contain XML data
-                qr_data = qr_code.data.decode('utf-8')
-                if self._is_aadhaar_qr(qr_data):
-                    return qr_data
-
-            return None
-
-        except Exception as e:
-            logger.error(f"Error decoding QR codes: {str(e)}")
-            return None
+            logger.warning("pyzbar not available, skipping QR code and barcode extraction")
+            return None, None
+        
+        height, width = gray.shape[:2]
+        barcode_data = barcode_stage = None
+        for stage, candidate in self._scan_ladder(gray, height, width):
+            qr_data, found_barcode = self._decode_codes(candidate)
+            if qr_data:
+                self._record(f'qr_{stage}')
+                return qr_data, None
+            if found_barcode and barcode_data is None:
+                barcode_data, barcode_stage = found_barcode, stage
+        
+        # Counted only when no QR code turned up, so each scan records one outcome
+        if barcode_data:
+            self._record(f'barcode_{barcode_stage}')
+        return None, barcode_data
     
-    def _decode_barcodes(self, image) -> Optional[str]:
-        """Decode barcodes from image"""
-        if not PYZBAR_AVAILABLE:
-            logger.warning("pyzbar not available, skipping barcode extraction")
-            return None
-
+    def _scan_ladder(self, gray, height: int, width: int):
+        """(stage name, image) pairs to decode, cheapest first"""
+        longest = max(height, width)
+        if longest > QR_DOWNSCALE_MAX_SIDE:
+            scale = QR_DOWNSCALE_MAX_SIDE / longest
+            yield 'downscaled', cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        
+        x1, y1, x2, y2 = QR_REGION
+        yield 'region', gray[int(height * y1):int(height * y2), int(width * x1):int(width * x2)]
+        yield 'full', gray
+    
+    def _decode_codes(self, gray) -> Tuple[Optional[str], Optional[str]]:
+        """One pyzbar pass, with each symbol classified as an Aadhaar QR code or barcode"""
+        qr_data = None
+        barcode_data = None
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            barcodes = pyzbar.decode(gray)
-
-            for barcode in barcodes:
-                barcode_data = barcode.data.decode('utf-8')
-                if self._is_aadhaar_barcode(barcode_data):
-                    return barcode_data
-
-            return None
-
+            for symbol in pyzbar.decode(gray):
+                data = symbol.data.decode('utf-8')
+                if qr_data is None and self._is_aadhaar_qr(data):
+                    # Aadhaar QR codes contain XML data
+                    qr_data = data
+                elif barcode_data is None and self._is_aadhaar_barcode(data):
+                    barcode_data = data
         except Exception as e:
-            logger.error(f"Error decoding barcodes: {str(e)}")
-            return None
+            logger.error(f"Error decoding QR codes and barcodes: {str(e)}")
+        
+        return qr_data, barcode_data
+    
+    def _record(self, outcome: str):
+        with self._stats_lock:
+            self.scan_stats[outcome] += 1
+    
+    def stats(self) -> Dict[str, int]:
+        """How verifications were decided, e.g. {'qr_downscaled': 40, 'qr_region': 3, 'ocr_fallback': 2}"""
+        with self._stats_lock:
+            return dict(self.scan_stats)
     
     def _is_aadhaar_qr(self, data: str) -> bool:
         """Check if QR data is from Aadhaar card"""
@@ -197,14 +231,11 @@ class AadhaarVerificationService:
                 'verification_status': 'failed'
             }
     
-    def _extract_text_ocr(self, image) -> str:
-        """Extract text using OCR as fallback"""
+    def _extract_text_ocr(self, gray) -> str:
+        """Extract text from the grayscale image using OCR as fallback"""
         try:
             import pytesseract
             
-            # Preprocess image for better OCR
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
             # Apply threshold to get better text recognition
             _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             
@@ -1,3 +1,4 @@
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -6,3 +7,17 @@ def compute_similarity(workers, companies):
     vectorizer = TfidfVectorizer()
     tfidf = vectorizer.fit_transform(all_text)
     return tfidf[:len(workers)], tfidf[len(workers):]
+
+def top_k_indices(scores, k):
+    # Same as np.argsort(-scores, kind='stable')[:k] without sorting every score;
+    # a copy of the backend's services/ranking.py helper, as this package stands alone
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    candidates = np.concatenate([above, ties])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
@@ -1,13 +1,85 @@
 import math
 import re
-from typing import List, Dict, Tuple
+import threading
+import numpy as np
+from typing import List, Dict, Iterable, Tuple
 from collections import Counter
-from django.db.models import Q
-from worker.models import User, Job
+from django.db.models import F, Q, Value
+from django.db.models.functions import Lower
+from django.db.models.lookups import Contains
+from worker.models import User, Job, WorkHistory
+from worker.geo import EARTH_RADIUS_KM, bounding_box, cells_within, haversine_km
+from worker.job_features import (
+    SKILL_KEYWORDS, extract_skills, job_skill_mask, parse_required_experience, skill_mask, skills_from_mask
+)
+from services.ranking import top_k, top_k_indices
+from services.recommendation_cache import recommendation_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Score matrix entries (users x jobs) per chunk in get_recommendations_bulk
+BULK_SCORE_CELLS = 2_000_000
+
+# Job columns the batch scorer reads; full rows are fetched only for returned jobs
+SCORING_FIELDS = ('id', 'jobType', 'latitude', 'longitude', 'skillMask', 'requiredExperience')
+
+
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    """Number of set bits in each skill bitmask, for arrays of any shape"""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(masks).astype(np.int64)
+    bits = (masks[..., None] >> np.arange(len(SKILL_KEYWORDS), dtype=np.int64)) & 1
+    return bits.sum(axis=-1)
+
+
+class JobFeatureBatch:
+    """Column-wise scoring features for a list of candidate jobs, extracted once"""
+    
+    def __init__(self, jobs: List[Job], engine: 'JobRecommendationEngine'):
+        self.jobs = list(jobs)
+        
+        job_type_codes = {}
+        self.job_types = []
+        skill_masks, type_codes, required_experience, latitudes, longitudes = [], [], [], [], []
+        
+        for job in self.jobs:
+            skill_masks.append(engine._job_skill_mask(job))
+            
+            if job.jobType not in job_type_codes:
+                job_type_codes[job.jobType] = len(self.job_types)
+                self.job_types.append(job.jobType)
+            type_codes.append(job_type_codes[job.jobType])
+            
+            required_experience.append(engine._parse_required_experience(job))
+            
+            # Falsy coordinates mean "no location", matching _filter_by_location
+            has_location = bool(job.latitude and job.longitude)
+            latitudes.append(job.latitude if has_location else np.nan)
+            longitudes.append(job.longitude if has_location else np.nan)
+        
+        self.skill_masks = np.array(skill_masks, dtype=np.int64)
+        self.skill_counts = _popcount(self.skill_masks)
+        self.job_type_codes = np.array(type_codes, dtype=np.int64)
+        self.required_experience = np.array(required_experience, dtype=np.int64)
+        self.latitudes = np.array(latitudes, dtype=np.float64)
+        self.longitudes = np.array(longitudes, dtype=np.float64)
+    
+    def __len__(self):
+        return len(self.jobs)
+    
+    def within_distance(self, user_location: Tuple[float, float], max_distance_km: float) -> np.ndarray:
+        """Mask of jobs within max_distance_km; jobs without location are always kept"""
+        user_lat, user_lng = map(math.radians, user_location)
+        lat = np.radians(self.latitudes)
+        lng = np.radians(self.longitudes)
+        
+        a = np.sin((lat - user_lat) / 2)**2 + math.cos(user_lat) * np.cos(lat) * np.sin((lng - user_lng) / 2)**2
+        distances = 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS_KM
+        
+        return np.isnan(self.latitudes) | (distances <= max_distance_km)
+
+
 class JobRecommendationEngine:
     """Advanced job recommendation engine with TF-IDF scoring and location-based matching"""
     
@@ -17,6 +89,16 @@ class JobRecommendationEngine:
             'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 
             'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'
         }
+        # Score all candidate jobs in one NumPy pass instead of one Python call per job
+        self.batch_scoring = True
+        # Serve repeat requests from the per-user result cache
+        self.use_cache = True
+        # Drop jobs sharing no job type or skill with the user in SQL. Off by default:
+        # every job gets a positive score, so this trades ranking fidelity for fewer rows.
+        self.prefilter_job_types = False
+        # Rows fetched / scored / returned by the batch path (see row_stats())
+        self.prefilter_stats = Counter()
+        self._stats_lock = threading.Lock()
     
     def get_recommendations(self, user_id: str, max_distance_km: float = 50.0, limit: int = 10) -> List[Dict]:
         """
@@ -31,67 +113,157 @@ class JobRecommendationEngine:
             List of recommended jobs with scores
         """
         try:
-            user = User.objects.get(uid=user_id)
-            
-            # Get user's skills and preferences
-            user_skills = user.skills or []
-            user_job_types = user.JobTypes or []
-            user_location = (user.latitude, user.longitude) if user.latitude and user.longitude else None
-            
-            # Get available jobs
-            available_jobs = Job.objects.filter(
-                status__in=['open', 'active']
-            ).exclude(
-                # Exclude jobs user has already applied to or completed
-                id__in=user.work_history.values_list('job_id', flat=True)
+            if not self.use_cache:
+                return self._compute_recommendations(user_id, max_distance_km, limit)
+            return recommendation_cache.get_or_compute(
+                user_id, (max_distance_km, limit),
+                lambda: self._compute_recommendations(user_id, max_distance_km, limit)
             )
             
+        except User.DoesNotExist:
+            logger.error(f"User {user_id} not found")
+            return []
+        except Exception as e:
+            logger.error(f"Error getting recommendations: {str(e)}")
+            return []
+    
+    def _compute_recommendations(self, user_id: str, max_distance_km: float, limit: int) -> List[Dict]:
+        """Uncached body of get_recommendations; raises User.DoesNotExist for unknown users"""
+        user = User.objects.get(uid=user_id)
+        
+        # Get user's skills and preferences
+        user_skills = user.skills or []
+        user_job_types = user.JobTypes or []
+        user_location = (user.latitude, user.longitude) if user.latitude and user.longitude else None
+        
+        # Get available jobs
+        available_jobs = self._available_jobs().exclude(
+            # Exclude jobs user has already applied to or completed
+            id__in=user.work_history.values_list('job_id', flat=True)
+        )
+        
+        # Calculate recommendation scores
+        if self.batch_scoring:
+            job_scores = self._score_jobs_batch(user, available_jobs, user_location, max_distance_km, limit)
+            # Scoring loaded only SCORING_FIELDS; fetch full rows for the returned jobs
+            job_scores = self._with_full_jobs(job_scores)
+        else:
             # Filter by location if user location is available
             if user_location:
                 available_jobs = self._filter_by_location(
                     available_jobs, user_location, max_distance_km
                 )
             
-            # Calculate recommendation scores
             job_scores = []
             for job in available_jobs:
                 score = self._calculate_job_score(user, job)
                 if score > 0:  # Only include jobs with positive scores
-                    job_scores.append({
-                        'job': job,
-                        'score': score,
-                        'match_reasons': self._get_match_reasons(user, job)
-                    })
+                    job_scores.append({'job': job, 'score': score})
             
-            # Sort by score and return top recommendations
-            job_scores.sort(key=lambda x: x['score'], reverse=True)
+            # Keep only the top recommendations by score
+            job_scores = top_k(job_scores, limit, key=lambda x: x['score'])
+        
+        # Format recommendations
+        return [
+            self._format_recommendation(user, item['job'], item['score'], user_location)
+            for item in job_scores[:limit]
+        ]
+    
+    def get_recommendations_bulk(self, user_ids: Iterable[str], max_distance_km: float = 50.0, limit: int = 10,
+                                 chunk_size: int = None, batch: JobFeatureBatch = None) -> Dict[str, List[Dict]]:
+        """
+        Get job recommendations for many users against a single load of the open jobs
+        
+        Jobs and their features are loaded once; users are then scored in chunks as a
+        users x jobs matrix. Each user's list is the same as get_recommendations returns.
+        
+        Args:
+            user_ids: User IDs to get recommendations for
+            max_distance_km: Maximum distance for location-based filtering
+            limit: Maximum number of recommendations per user
+            chunk_size: Users scored per matrix; by default sized to BULK_SCORE_CELLS entries
+            batch: Preloaded open jobs from load_job_batch(), to share across calls
             
-            # Format recommendations
-            recommendations = []
-            for item in job_scores[:limit]:
-                job = item['job']
-                recommendations.append({
-                    'id': job.id,
-                    'title': job.title,
-                    'description': job.description,
-                    'location': job.location,
-                    'wage': job.wage,
-                    'jobType': job.jobType,
-                    'requirements': job.requirements,
-                    'postedAt': job.postedAt.isoformat() if job.postedAt else None,
-                    'score': round(item['score'], 2),
-                    'match_reasons': item['match_reasons'],
-                    'distance_km': self._calculate_distance(user_location, (job.latitude, job.longitude)) if user_location and job.latitude else None
-                })
+        Returns:
+            Dict of user ID to recommended jobs with scores ([] for unknown users)
+        """
+        user_ids = list(user_ids)
+        results = {user_id: [] for user_id in user_ids}
+        if batch is None:
+            batch = self.load_job_batch()
+        if not len(batch) or not user_ids:
+            return results
+        
+        if chunk_size is None:
+            chunk_size = max(1, BULK_SCORE_CELLS // len(batch))
+        job_columns = {job.id: i for i, job in enumerate(batch.jobs)}
+        
+        for start in range(0, len(user_ids), chunk_size):
+            chunk_ids = user_ids[start:start + chunk_size]
+            users_by_id = User.objects.in_bulk(chunk_ids)
+            users = [users_by_id[user_id] for user_id in chunk_ids if user_id in users_by_id]
+            if not users:
+                continue
             
-            return recommendations
+            # Jobs each user has already applied to or completed, in one query per chunk
+            excluded = {}
+            for user_id, job_id in WorkHistory.objects.filter(user__in=users).values_list('user_id', 'job_id'):
+                if job_id in job_columns:
+                    excluded.setdefault(user_id, []).append(job_columns[job_id])
             
-        except User.DoesNotExist:
-            logger.error(f"User {user_id} not found")
-            return []
-        except Exception as e:
-            logger.error(f"Error getting recommendations: {str(e)}")
-            return []
+            scores = self._calculate_bulk_scores(users, batch)
+            
+            ranked_by_user = []
+            for row, user in enumerate(users):
+                user_location = (user.latitude, user.longitude) if user.latitude and user.longitude else None
+                
+                keep = scores[row] > 0  # Only include jobs with positive scores
+                keep[excluded.get(user.uid, [])] = False
+                if user_location:
+                    keep &= batch.within_distance(user_location, max_distance_km)
+                
+                candidates = np.flatnonzero(keep)
+                ranked_by_user.append(candidates[top_k_indices(scores[row, candidates], limit)])
+            
+            # Full rows for every job returned in this chunk, in one query
+            full_jobs = Job.objects.in_bulk({batch.jobs[i].id for ranked in ranked_by_user for i in ranked})
+            for row, (user, ranked) in enumerate(zip(users, ranked_by_user)):
+                user_location = (user.latitude, user.longitude) if user.latitude and user.longitude else None
+                results[user.uid] = [
+                    self._format_recommendation(user, full_jobs[batch.jobs[i].id], float(scores[row, i]), user_location)
+                    for i in ranked if batch.jobs[i].id in full_jobs
+                ]
+        
+        return results
+    
+    def load_job_batch(self) -> JobFeatureBatch:
+        """All open jobs with their scoring features, for get_recommendations_bulk"""
+        return JobFeatureBatch(self._scoring_rows(self._available_jobs()), self)
+    
+    def row_stats(self) -> Dict:
+        """Cumulative row counts of the batch path, showing how much the prefilter saves"""
+        with self._stats_lock:
+            return dict(self.prefilter_stats)
+    
+    def _available_jobs(self):
+        """Open jobs, in id order so equal scores rank the same in every code path"""
+        return Job.objects.filter(status__in=['open', 'active']).order_by('id')
+    
+    def _format_recommendation(self, user: User, job: Job, score: float, user_location) -> Dict:
+        """Response entry for one recommended job"""
+        return {
+            'id': job.id,
+            'title': job.title,
+            'description': job.description,
+            'location': job.location,
+            'wage': job.wage,
+            'jobType': job.jobType,
+            'requirements': job.requirements,
+            'postedAt': job.postedAt.isoformat() if job.postedAt else None,
+            'score': round(score, 2),
+            'match_reasons': self._get_match_reasons(user, job),
+            'distance_km': self._calculate_distance(user_location, (job.latitude, job.longitude)) if user_location and job.latitude else None
+        }
     
     def _calculate_job_score(self, user: User, job: Job) -> float:
         """Calculate recommendation score for a job based on user profile"""
@@ -119,14 +291,90 @@ class JobRecommendationEngine:
         
         return min(score, 1.0)  # Cap at 1.0
     
+    def _score_jobs_batch(self, user: User, jobs, user_location, max_distance_km: float,
+                          limit: int = None) -> List[Dict]:
+        """
+        Score every candidate job with NumPy in one pass
+        
+        Produces the same scores and ordering as calling _calculate_job_score per job
+        and sorting, but extracts job features once and avoids per-job Python calls.
+        Only the top `limit` jobs are ranked and returned (all of them when None).
+        """
+        if user_location:
+            jobs = self._nearby_jobs(jobs, user_location, max_distance_km)
+        if self.prefilter_job_types:
+            jobs = self._relevant_jobs(jobs, user)
+        
+        batch = JobFeatureBatch(self._scoring_rows(jobs), self)
+        if not len(batch):
+            self._record_rows(fetched=0, scored=0, returned=0)
+            return []
+        
+        scores = self._calculate_batch_scores(user, batch)
+        
+        keep = scores > 0  # Only include jobs with positive scores
+        if user_location:
+            keep &= batch.within_distance(user_location, max_distance_km)
+        
+        # Top-k selection keeps the queryset order for equal scores, like list.sort()
+        candidates = np.flatnonzero(keep)
+        ranked = candidates[top_k_indices(scores[candidates], limit)]
+        self._record_rows(fetched=len(batch), scored=len(candidates), returned=len(ranked))
+        
+        return [{'job': batch.jobs[i], 'score': float(scores[i])} for i in ranked]
+    
+    def _calculate_batch_scores(self, user: User, batch: JobFeatureBatch) -> np.ndarray:
+        """Vectorized _calculate_job_score for every job in the batch"""
+        return self._calculate_bulk_scores([user], batch)[0]
+    
+    def _calculate_bulk_scores(self, users: List[User], batch: JobFeatureBatch) -> np.ndarray:
+        """Vectorized _calculate_job_score for every (user, job) pair, as a users x jobs matrix"""
+        shape = (len(users), len(batch))
+        
+        # 1. Skill matching (40% weight)
+        skill_scores = np.zeros(shape)
+        user_masks = np.array([self._skill_mask(skill.lower() for skill in user.skills or []) for user in users],
+                              dtype=np.int64)
+        user_skill_counts = np.array([len(user.skills or []) for user in users])
+        common = _popcount(batch.skill_masks[None, :] & user_masks[:, None])
+        matched = common > 0  # Users without skills never match
+        rows, cols = np.nonzero(matched)
+        tf_score = common[matched] / user_skill_counts[rows]
+        idf_score = common[matched] / batch.skill_counts[cols]
+        skill_scores[matched] = (tf_score + idf_score) / 2
+        scores = skill_scores * 0.4
+        
+        # 2. Job type matching (25% weight), computed once per distinct job type
+        type_scores = np.array([
+            [self._calculate_job_type_score(user.JobTypes or [], job_type) for job_type in batch.job_types]
+            for user in users
+        ]).reshape(len(users), len(batch.job_types))
+        scores += type_scores[:, batch.job_type_codes] * 0.25
+        
+        # 3. Experience level matching (15% weight)
+        user_experience = np.array([user.experienceYears for user in users])[:, None]
+        exp_diff = np.abs(user_experience - batch.required_experience[None, :])
+        experience_scores = np.select(
+            [exp_diff == 0, exp_diff <= 2, exp_diff <= 5], [1.0, 0.8, 0.6], default=0.3
+        )
+        experience_scores[user_experience[:, 0] == 0] = 0.5  # Neutral for beginners
+        scores += experience_scores * 0.15
+        
+        # 4. Verification bonus (10% weight)
+        scores += np.array([self._calculate_verification_score(user) for user in users])[:, None] * 0.1
+        
+        # 5. Rating bonus (10% weight)
+        scores += np.array([self._calculate_rating_score(user.averageRating) for user in users])[:, None] * 0.1
+        
+        return np.minimum(scores, 1.0)  # Cap at 1.0
+    
     def _calculate_skill_score(self, user_skills: List[str], job: Job) -> float:
         """Calculate skill matching score using TF-IDF"""
         if not user_skills:
             return 0.0
         
-        # Extract skills from job description and requirements
-        job_text = f"{job.title} {job.description} {job.requirements or ''}"
-        job_skills = self._extract_skills_from_text(job_text)
+        # Skills mentioned in the job title, description and requirements
+        job_skills = skills_from_mask(self._job_skill_mask(job))
         
         if not job_skills:
             return 0.0
@@ -148,24 +396,17 @@ class JobRecommendationEngine:
     
     def _extract_skills_from_text(self, text: str) -> List[str]:
         """Extract skill keywords from job text"""
-        # Common blue-collar skills
-        skill_keywords = [
-            'plumber', 'plumbing', 'electrician', 'electrical', 'painter', 'painting',
-            'carpenter', 'carpentry', 'welder', 'welding', 'mason', 'masonry',
-            'construction', 'building', 'repair', 'maintenance', 'installation',
-            'hvac', 'roofing', 'flooring', 'tiling', 'drywall', 'concrete',
-            'landscaping', 'gardening', 'cleaning', 'housekeeping', 'cooking',
-            'driving', 'delivery', 'security', 'guard', 'helper', 'assistant'
-        ]
-        
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in skill_keywords:
-            if skill in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills
+        return extract_skills(text)
+    
+    def _skill_mask(self, skills) -> int:
+        """Bitmask of the SKILL_KEYWORDS present in skills (expects lowercase)"""
+        return skill_mask(skills)
+    
+    def _job_skill_mask(self, job: Job) -> int:
+        """Skill bitmask for a job, precomputed on save when available"""
+        if job.skillMask is not None:
+            return job.skillMask
+        return job_skill_mask(job.title, job.description, job.requirements)
     
     def _calculate_job_type_score(self, user_job_types: List[str], job_type: str) -> float:
         """Calculate job type matching score"""
@@ -191,19 +432,7 @@ class JobRecommendationEngine:
         if user_experience == 0:
             return 0.5  # Neutral for beginners
         
-        # Extract experience requirements from job description
-        job_text = f"{job.description} {job.requirements or ''}".lower()
-        
-        # Look for experience keywords
-        if 'fresher' in job_text or 'beginner' in job_text or 'entry level' in job_text:
-            required_exp = 0
-        elif 'experienced' in job_text or 'senior' in job_text:
-            required_exp = 5
-        else:
-            # Extract numbers followed by 'year' or 'years'
-            import re
-            exp_matches = re.findall(r'(\d+)\s*(?:year|yr)', job_text)
-            required_exp = int(exp_matches[0]) if exp_matches else 2
+        required_exp = self._parse_required_experience(job)
         
         # Score based on experience match
         exp_diff = abs(user_experience - required_exp)
@@ -216,6 +445,12 @@ class JobRecommendationEngine:
         else:
             return 0.3
     
+    def _parse_required_experience(self, job: Job) -> int:
+        """Years of experience a job asks for, precomputed on save when available"""
+        if job.requiredExperience is not None:
+            return job.requiredExperience
+        return parse_required_experience(job.description, job.requirements)
+    
     def _calculate_verification_score(self, user: User) -> float:
         """Calculate verification bonus score"""
         if user.verificationLevel == 'premium':
@@ -243,7 +478,7 @@ class JobRecommendationEngine:
         filtered_jobs = []
         user_lat, user_lng = user_location
         
-        for job in jobs:
+        for job in self._nearby_jobs(jobs, user_location, max_distance_km):
             if job.latitude and job.longitude:
                 distance = self._calculate_distance(
                     (user_lat, user_lng), 
@@ -257,27 +492,81 @@ class JobRecommendationEngine:
         
         return filtered_jobs
     
-    def _calculate_distance(self, loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
-        """Calculate distance between two coordinates using Haversine formula"""
-        if not loc1 or not loc2:
-            return float('inf')
+    def _nearby_jobs(self, jobs, user_location: Tuple[float, float], max_distance_km: float):
+        """
+        Narrow a job queryset to the bounding box and grid cells around the user before
+        exact distances are computed. Jobs without a cell (no coordinates) are kept.
+        """
+        min_lat, max_lat, min_lng, max_lng = bounding_box(user_location[0], user_location[1], max_distance_km)
+        nearby = Q(latitude__range=(min_lat, max_lat))
+        if -180 <= min_lng and max_lng <= 180:  # Boxes crossing the antimeridian filter on latitude only
+            nearby &= Q(longitude__range=(min_lng, max_lng))
         
-        lat1, lng1 = loc1
-        lat2, lng2 = loc2
+        nearby_cells = cells_within(user_location[0], user_location[1], max_distance_km)
+        if nearby_cells is not None:
+            nearby &= Q(geoCell__in=nearby_cells)
         
-        # Convert to radians
-        lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+        return jobs.filter(nearby | Q(geoCell__isnull=True))
+    
+    def _relevant_jobs(self, jobs, user: User):
+        """
+        Keep jobs with a nonzero job type or skill score: the job's type contains one of
+        the user's job types or is contained in one (as in _calculate_job_type_score), or
+        the job mentions one of their skills. Jobs without precomputed features are kept.
+        """
+        user_job_types = user.JobTypes or []
+        user_mask = self._skill_mask(skill.lower() for skill in user.skills or [])
+        if not user_job_types and not user_mask:
+            return jobs  # Nothing to overlap with
+        
+        relevant = Q(skillMask__isnull=True)
+        for job_type in user_job_types:
+            relevant |= Q(jobType__icontains=job_type)
+            # Job types that are part of the user's, e.g. 'plumbing' for 'plumbing repair'
+            relevant |= Q(Contains(Value(job_type.lower()), Lower('jobType'))) & ~Q(jobType='')
+        if user_mask:
+            jobs = jobs.annotate(skill_overlap=F('skillMask').bitand(user_mask))
+            relevant |= Q(skill_overlap__gt=0)
+        return jobs.filter(relevant)
+    
+    def _scoring_rows(self, jobs) -> List[Job]:
+        """
+        Load only SCORING_FIELDS for the candidate jobs. The text columns are fetched,
+        in one extra query, only for rows saved without precomputed features.
+        """
+        rows = list(jobs.only(*SCORING_FIELDS))
         
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlng = lng2 - lng1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
-        c = 2 * math.asin(math.sqrt(a))
+        missing = {job.id: job for job in rows if job.skillMask is None or job.requiredExperience is None}
+        if missing:
+            text_rows = Job.objects.filter(id__in=missing).values_list('id', 'title', 'description', 'requirements')
+            for job_id, title, description, requirements in text_rows:
+                job = missing[job_id]
+                job.title, job.description, job.requirements = title, description, requirements
         
-        # Earth's radius in kilometers
-        r = 6371
+        return rows
+    
+    def _with_full_jobs(self, job_scores: List[Dict]) -> List[Dict]:
+        """Swap the scoring-only job rows for full rows, in one query"""
+        full_jobs = Job.objects.in_bulk([item['job'].id for item in job_scores])
+        return [
+            {'job': full_jobs[item['job'].id], 'score': item['score']}
+            for item in job_scores if item['job'].id in full_jobs
+        ]
+    
+    def _record_rows(self, fetched: int, scored: int, returned: int):
+        with self._stats_lock:
+            self.prefilter_stats['requests'] += 1
+            self.prefilter_stats['rows_fetched'] += fetched
+            self.prefilter_stats['rows_scored'] += scored
+            self.prefilter_stats['rows_returned'] += returned
+        logger.debug(f"Recommendation rows: {fetched} fetched, {scored} scored, {returned} returned")
+    
+    def _calculate_distance(self, loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
+        """Calculate distance between two coordinates using Haversine formula"""
+        if not loc1 or not loc2:
+            return float('inf')
         
-        return c * r
+        return haversine_km(loc1, loc2)
     
     def _get_match_reasons(self, user: User, job: Job) -> List[str]:
         """Get reasons why this job matches the user"""
@@ -0,0 +1,102 @@
+"""
+Pub/sub that pushes newly created notifications to connected clients
+
+NotificationService publishes each notification once its transaction commits,
+and the notification stream view (server-sent events) subscribes per user.
+The broker class is the dotted path in settings.NOTIFICATION_BROKER; the
+default InProcessBroker delivers to subscribers in the same process. The
+stream view picks up notifications created by other processes (other workers,
+management commands) from the database at each heartbeat instead.
+"""
+import asyncio
+import threading
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Events buffered per subscriber; a stalled client loses the oldest beyond this
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One client's stream of events for a user, delivered on the client's event loop"""
+
+    def __init__(self, broker: 'InProcessBroker', user_id: str):
+        self.broker = broker
+        self.user_id = user_id
+        self.dropped = 0
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: Dict):
+        """Queue an event; safe to call from any thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # Loop already closed: the client is gone
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next event, or None if none arrives within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        await self.broker.unsubscribe(self)
+
+    def _put(self, event: Dict):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+
+class InProcessBroker:
+    """Delivers published events to subscribers in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user id -> set of Subscription
+
+    async def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: str, event: Dict):
+        """Send an event to the user's subscribers; safe to call from sync code in any thread"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'users': len(self._subscribers),
+                'subscribers': sum(len(subscribers) for subscribers in self._subscribers.values()),
+            }
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InProcessBroker:
+    """The process-wide broker named by settings.NOTIFICATION_BROKER, created on first use"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.NOTIFICATION_BROKER)()
+        return _broker
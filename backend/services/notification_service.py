@@ -1,16 +1,65 @@
-from typing import List, Dict
-from worker.models import User, Job, Notification
+from typing import Callable, List, Dict, Optional, Tuple
+import base64
+from collections import Counter
+from worker.models import User, Job, Notification, UnreadNotificationCount
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
+from worker.geo import haversine_km
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+DAILY_ALERT_TITLE = "🔔 Daily Job Alerts"
+# Match score a worker needs to be notified about a job
+JOB_MATCH_NOTIFY_SCORE = 0.7
+# Users streamed, scored and written per chunk by send_daily_job_alerts
+DAILY_ALERT_CHUNK_SIZE = 2000
+# Rows per INSERT when notifications are written with bulk_create
+NOTIFICATION_INSERT_BATCH = 500
+
+
+def encode_cursor(notification: Notification) -> str:
+    """Opaque pagination cursor pointing just past a notification"""
+    key = f"{notification.createdAt.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(createdAt, id) from encode_cursor; raises ValueError for anything else"""
+    try:
+        key = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, notification_id = key.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except ValueError as e:  # Also covers bad base64 and UTF-8
+        raise ValueError(f"Invalid notification cursor: {cursor!r}") from e
+
+
+def serialize_notification(notification: Notification) -> Dict:
+    """API representation of a notification, as listed and as pushed to streams"""
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.type,
+        'isRead': notification.isRead,
+        'createdAt': notification.createdAt.isoformat(),
+        'jobId': notification.job_id,
+        'actionUrl': notification.actionUrl
+    }
+
+
 class NotificationService:
     """Service for managing user notifications and job alerts"""
     
     def __init__(self):
-        pass
+        self._fanout_executor = None
+        self._fanout_executor_lock = threading.Lock()
     
     def create_job_match_notification(self, user_id: str, job: Job, match_score: float, match_reasons: List[str]):
         """Create notification for job match"""
@@ -28,12 +77,9 @@ class NotificationService:
             if recent_notifications.exists():
                 return None
             
-            title = f"🎯 Perfect Job Match: {job.title}"
-            message = f"Found a {int(match_score * 100)}% match job in {job.location}. "
-            if match_reasons:
-                message += f"Matches: {', '.join(match_reasons[:2])}"
+            title, message = self._job_match_text(job, match_score, match_reasons)
             
-            notification = Notification.objects.create(
+            notification = self._create(
                 user=user,
                 title=title,
                 message=message,
@@ -51,6 +97,115 @@ class NotificationService:
             logger.error(f"Error creating job match notification: {str(e)}")
             return None
     
+    def enqueue_job_match_fanout(self, job_id: int):
+        """
+        Run notify_matching_workers for a committed job on the fan-out pool, off the request thread
+
+        With settings.JOB_MATCH_FANOUT_WORKERS = 0 it runs in the calling thread instead.
+        """
+        if settings.JOB_MATCH_FANOUT_WORKERS <= 0:
+            self._run_job_match_fanout(job_id)
+            return
+        self._get_fanout_executor().submit(self._fanout_in_worker, job_id)
+
+    def _get_fanout_executor(self) -> ThreadPoolExecutor:
+        if self._fanout_executor is None:
+            with self._fanout_executor_lock:
+                if self._fanout_executor is None:
+                    self._fanout_executor = ThreadPoolExecutor(settings.JOB_MATCH_FANOUT_WORKERS,
+                                                               thread_name_prefix='job-match-fanout')
+        return self._fanout_executor
+
+    def _fanout_in_worker(self, job_id: int):
+        try:
+            self._run_job_match_fanout(job_id)
+        finally:
+            close_old_connections()  # Pool threads outlive requests; don't keep their connections open
+
+    def _run_job_match_fanout(self, job_id: int):
+        try:
+            # Read back as committed; the job may have changed or gone since it was queued
+            job = Job.objects.filter(id=job_id).first()
+            if job is not None:
+                self.notify_matching_workers(job)
+        except Exception:
+            logger.exception(f"Job match fan-out for job {job_id} failed")
+
+    def notify_matching_workers(self, job: Job, max_distance_km: float = 50.0,
+                                min_score: float = JOB_MATCH_NOTIFY_SCORE) -> Dict:
+        """
+        Push job-match notifications for a newly posted job to every verified worker it suits
+        
+        Candidate workers come from the worker match index (verified workers with a
+        shared skill or job type, in nearby grid cells), so the work done scales with
+        the workers relevant to this job rather than with all users. Candidates are
+        scored exactly as the recommendation engine does, workers notified about this
+        job in the last 24 hours are found with one query, and the notifications are
+        written in bulk.
+        
+        Returns:
+            Counts of candidates, matches, matches already notified and notifications sent
+        """
+        from services.job_recommendation_service import JobFeatureBatch, recommendation_engine
+        from services.worker_match_index import worker_match_index
+
+        stats = {'candidates': 0, 'matched': 0, 'already_notified': 0, 'notified': 0}
+        if job.status not in ('open', 'active'):
+            return stats
+        try:
+            candidates = worker_match_index.candidates(job, max_distance_km)
+            stats['candidates'] = len(candidates)
+            if not candidates:
+                return stats
+
+            users_by_id = User.objects.in_bulk(candidates)
+            users = [users_by_id[user_id] for user_id in sorted(users_by_id)]
+            scores = recommendation_engine._calculate_bulk_scores(users, JobFeatureBatch([job], recommendation_engine))
+            job_location = (job.latitude, job.longitude) if job.latitude and job.longitude else None
+
+            matches = []
+            for user, score in zip(users, scores[:, 0]):
+                if score <= min_score:
+                    continue
+                if job_location and user.latitude and user.longitude and \
+                        haversine_km((user.latitude, user.longitude), job_location) > max_distance_km:
+                    continue
+                matches.append((user, float(score)))
+            stats['matched'] = len(matches)
+
+            # Don't spam users - one query for everyone notified about this job recently
+            recently_notified = set(Notification.objects.filter(
+                type='job_match',
+                job=job,
+                createdAt__gte=timezone.now() - timedelta(hours=24)
+            ).order_by().values_list('user_id', flat=True))
+
+            notifications = []
+            for user, score in matches:
+                if user.uid in recently_notified:
+                    continue
+                title, message = self._job_match_text(job, score, recommendation_engine._get_match_reasons(user, job))
+                notifications.append(Notification(
+                    user=user, title=title, message=message, type='job_match', job=job, actionUrl=f'/jobs/{job.id}'
+                ))
+            self._bulk_create(notifications)
+            stats['already_notified'] = len(matches) - len(notifications)
+            stats['notified'] = len(notifications)
+
+        except Exception as e:
+            logger.error(f"Error notifying workers about job {job.id}: {str(e)}")
+
+        logger.info("Job %s match fan-out: %s", job.id, stats)
+        return stats
+
+    def _job_match_text(self, job: Job, match_score: float, match_reasons: List[str]):
+        """Title and message of a job match notification"""
+        title = f"🎯 Perfect Job Match: {job.title}"
+        message = f"Found a {int(match_score * 100)}% match job in {job.location}. "
+        if match_reasons:
+            message += f"Matches: {', '.join(match_reasons[:2])}"
+        return title, message
+    
     def create_verification_notification(self, user_id: str, verification_type: str, status: str):
         """Create notification for verification updates"""
         try:
@@ -66,7 +221,7 @@ class NotificationService:
                 title = f"⏳ {verification_type} Under Review"
                 message = f"Your {verification_type} is being reviewed. We'll notify you once it's processed."
             
-            notification = Notification.objects.create(
+            notification = self._create(
                 user=user,
                 title=title,
                 message=message,
@@ -97,7 +252,7 @@ class NotificationService:
             if comment:
                 message += f"Comment: \"{comment[:50]}{'...' if len(comment) > 50 else ''}\""
             
-            notification = Notification.objects.create(
+            notification = self._create(
                 user=user,
                 title=title,
                 message=message,
@@ -121,7 +276,7 @@ class NotificationService:
             title = f"💰 Payment Received!"
             message = f"You received ₹{amount} for completing '{job_title}'. Keep up the great work!"
             
-            notification = Notification.objects.create(
+            notification = self._create(
                 user=user,
                 title=title,
                 message=message,
@@ -139,49 +294,65 @@ class NotificationService:
     
     def get_user_notifications(self, user_id: str, limit: int = 20, unread_only: bool = False) -> List[Dict]:
         """Get notifications for a user"""
-        try:
-            user = User.objects.get(uid=user_id)
-            
-            notifications = Notification.objects.filter(user=user)
-            
-            if unread_only:
-                notifications = notifications.filter(isRead=False)
-            
-            notifications = notifications.order_by('-createdAt')[:limit]
-            
-            notification_list = []
-            for notification in notifications:
-                notification_list.append({
-                    'id': notification.id,
-                    'title': notification.title,
-                    'message': notification.message,
-                    'type': notification.type,
-                    'isRead': notification.isRead,
-                    'createdAt': notification.createdAt.isoformat(),
-                    'jobId': notification.job.id if notification.job else None,
-                    'actionUrl': notification.actionUrl
-                })
+        return self.get_notifications_page(user_id, limit, unread_only)[0]
+    
+    def get_notifications_page(self, user_id: str, limit: int = 20, unread_only: bool = False,
+                               cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of a user's notifications, newest first, with keyset pagination
+        
+        Pages continue from the (createdAt, id) of the last row of the previous page
+        rather than an OFFSET, so with the (user, createdAt, id) indexes every page
+        costs the same however deep it is.
+        
+        Args:
+            user_id: User whose notifications to list
+            limit: Page size
+            unread_only: Only list unread notifications
+            cursor: next_cursor of the previous page, None for the first page
             
-            return notification_list
+        Returns:
+            (notifications, next_cursor); next_cursor is None on the last page
             
-        except User.DoesNotExist:
-            logger.error(f"User {user_id} not found for notifications")
-            return []
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        notifications = Notification.objects.filter(user_id=user_id)
+        
+        if unread_only:
+            notifications = notifications.filter(isRead=False)
+        
+        if cursor:
+            created_at, notification_id = decode_cursor(cursor)
+            # The createdAt range on its own lets the index seek; the OR only breaks ties
+            notifications = notifications.filter(
+                Q(createdAt__lte=created_at) & (Q(createdAt__lt=created_at) | Q(id__lt=notification_id))
+            )
+        
+        try:
+            page = list(notifications.order_by('-createdAt', '-id')[:limit + 1])
         except Exception as e:
             logger.error(f"Error getting notifications: {str(e)}")
-            return []
+            return [], None
+        
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1]) if page else None
+        
+        return [serialize_notification(notification) for notification in page], next_cursor
     
     def mark_notification_read(self, notification_id: int, user_id: str) -> bool:
         """Mark a notification as read"""
         try:
-            user = User.objects.get(uid=user_id)
-            notification = Notification.objects.get(id=notification_id, user=user)
-            notification.isRead = True
-            notification.save()
-            return True
+            with transaction.atomic():
+                marked = Notification.objects.filter(id=notification_id, user_id=user_id, isRead=False).update(isRead=True)
+                if marked:
+                    self._add_unread({user_id: -1})
+                    return True
+            # Already read counts as success; unknown notifications or users don't
+            return Notification.objects.filter(id=notification_id, user_id=user_id).exists()
             
-        except (User.DoesNotExist, Notification.DoesNotExist):
-            return False
         except Exception as e:
             logger.error(f"Error marking notification as read: {str(e)}")
             return False
@@ -189,71 +360,189 @@ class NotificationService:
     def mark_all_notifications_read(self, user_id: str) -> bool:
         """Mark all notifications as read for a user"""
         try:
-            user = User.objects.get(uid=user_id)
-            Notification.objects.filter(user=user, isRead=False).update(isRead=True)
-            return True
+            with transaction.atomic():
+                marked = Notification.objects.filter(user_id=user_id, isRead=False).update(isRead=True)
+                if marked:
+                    # Subtract what was marked rather than zeroing, so a notification created
+                    # concurrently stays counted
+                    self._add_unread({user_id: -marked})
+                    return True
+            return User.objects.filter(uid=user_id).exists()
             
-        except User.DoesNotExist:
-            return False
         except Exception as e:
             logger.error(f"Error marking all notifications as read: {str(e)}")
             return False
     
     def get_unread_count(self, user_id: str) -> int:
-        """Get count of unread notifications"""
+        """Get count of unread notifications, from the user's counter row"""
         try:
-            user = User.objects.get(uid=user_id)
-            return Notification.objects.filter(user=user, isRead=False).count()
+            count = UnreadNotificationCount.objects.filter(user_id=user_id).values_list('count', flat=True).first()
+            return max(count or 0, 0)
             
-        except User.DoesNotExist:
-            return 0
         except Exception as e:
             logger.error(f"Error getting unread count: {str(e)}")
             return 0
     
-    def send_daily_job_alerts(self):
-        """Send daily job alerts to users based on their preferences"""
+    def repair_unread_counts(self) -> int:
+        """
+        Reset unread counters that drifted from the notifications table
+        
+        Counters can drift when notifications are removed outside this service,
+        e.g. by cascade when a job or user is deleted. Actual counts come from one
+        grouped query; each drifted user is then fixed with a compare-and-set
+        update, so a counter changed while the repair ran is left for the next run.
+        
+        Returns:
+            Number of users whose counter was corrected
+        """
+        actual = dict(Notification.objects.filter(isRead=False).values('user')
+                      .annotate(count=Count('id')).values_list('user', 'count'))
+        repaired = 0
+        for user_id, stored in User.objects.values_list('uid', 'unread_notifications__count'):
+            count = actual.get(user_id, 0)
+            if stored is None:  # No counter row yet
+                if count:
+                    repaired += UnreadNotificationCount.objects.get_or_create(
+                        user_id=user_id, defaults={'count': count})[1]
+            elif stored != count:
+                repaired += UnreadNotificationCount.objects.filter(user_id=user_id, count=stored).update(count=count)
+        logger.info("Repaired %d unread notification counters", repaired)
+        return repaired
+    
+    def _create(self, **fields) -> Notification:
+        """Create a notification and count it in its user's unread counter"""
+        with transaction.atomic():
+            notification = Notification.objects.create(**fields)
+            if not notification.isRead:
+                self._add_unread({notification.user_id: 1})
+            transaction.on_commit(lambda: self._publish([notification]))
+        return notification
+    
+    def _bulk_create(self, notifications: List[Notification]) -> List[Notification]:
+        """bulk_create notifications and count them in their users' unread counters"""
+        if not notifications:
+            return []
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(notifications, batch_size=NOTIFICATION_INSERT_BATCH)
+            self._add_unread(Counter(notification.user_id for notification in created if not notification.isRead))
+            transaction.on_commit(lambda: self._publish(created))
+        return created
+    
+    def _publish(self, notifications: List[Notification]):
+        """Push committed notifications to the users' open streams"""
+        from services.notification_pubsub import get_broker
+
         try:
-            # Get all verified users who want job alerts
-            users = User.objects.filter(isVerified=True)
+            broker = get_broker()
+            for notification in notifications:
+                broker.publish(notification.user_id, serialize_notification(notification))
+        except Exception as e:
+            # Streams are best effort; clients still see the notification on their next listing
+            logger.warning(f"Error publishing notifications: {str(e)}")
+    
+    def _add_unread(self, deltas: Dict[str, int]):
+        """
+        Apply unread counter changes atomically in the database, one INSERT and UPDATE per distinct delta
+        
+        Counter rows are inserted first, with conflicts ignored, so users without
+        one get it and a concurrent insert of the same row is harmless.
+        """
+        users_by_delta = {}
+        for user_id, delta in deltas.items():
+            if delta:
+                users_by_delta.setdefault(delta, []).append(user_id)
+        for delta, user_ids in users_by_delta.items():
+            for start in range(0, len(user_ids), NOTIFICATION_INSERT_BATCH):
+                batch = user_ids[start:start + NOTIFICATION_INSERT_BATCH]
+                UnreadNotificationCount.objects.bulk_create(
+                    [UnreadNotificationCount(user_id=user_id) for user_id in batch], ignore_conflicts=True)
+                UnreadNotificationCount.objects.filter(user_id__in=batch).update(count=F('count') + delta)
+    
+    def send_daily_job_alerts(self, chunk_size: int = DAILY_ALERT_CHUNK_SIZE,
+                              progress: Callable[[Dict], None] = None) -> Dict:
+        """
+        Send today's job alert digest to every verified user who hasn't had one yet
+        
+        Users already alerted today are fetched in one query up front. The rest are
+        read in uid-keyset chunks; each chunk is scored against one load
+        of the open jobs and its digests are written with a single bulk_create, so a
+        run costs a handful of queries per chunk rather than several per user.
+        
+        Args:
+            chunk_size: Users fetched, scored and written per chunk
+            progress: Called with the running stats after each chunk
+            
+        Returns:
+            Run stats: users seen, alerts sent, users skipped (already alerted today,
+            no matching jobs), users in failed chunks, elapsed seconds and users/second
+        """
+        from services.job_recommendation_service import recommendation_engine
 
-            for user in users:
-                # Get personalized job recommendations
-                try:
-                    from services.job_recommendation_service import recommendation_engine
-                    recommendations = recommendation_engine.get_recommendations(user.uid, limit=3)
-
-                    if recommendations:
-                        # Create a daily digest notification
-                        job_titles = [job['title'] for job in recommendations[:2]]
-                        title = "🔔 Daily Job Alerts"
-                        message = f"Found {len(recommendations)} new jobs for you: {', '.join(job_titles)}"
-                        if len(recommendations) > 2:
-                            message += f" and {len(recommendations) - 2} more"
-
-                        # Check if daily alert already sent today
-                        today_alerts = Notification.objects.filter(
-                            user=user,
-                            type='job_match',
-                            title__contains='Daily Job Alerts',
-                            createdAt__date=timezone.now().date()
-                        )
-
-                        if not today_alerts.exists():
-                            Notification.objects.create(
-                                user=user,
-                                title=title,
-                                message=message,
-                                type='job_match'
-                            )
+        stats = {'users': 0, 'alerted': 0, 'already_alerted': 0, 'no_matches': 0, 'failed': 0,
+                 'seconds': 0.0, 'users_per_second': 0.0}
+        started = time.perf_counter()
+        try:
+            start_of_day = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            alerted_today = set(Notification.objects.filter(
+                type='job_match', title=DAILY_ALERT_TITLE, createdAt__gte=start_of_day
+            ).order_by().values_list('user_id', flat=True))
+
+            batch = recommendation_engine.load_job_batch()
+            verified = User.objects.filter(isVerified=True).order_by('uid').values_list('uid', flat=True)
+
+            last_uid = None
+            while True:
+                # Keyset page, fully read before this chunk writes to User: SQLite gives
+                # no isolation between an open cursor and writes on the same connection
+                page = verified if last_uid is None else verified.filter(uid__gt=last_uid)
+                chunk = list(page[:chunk_size])
+                if not chunk:
+                    break
+                last_uid = chunk[-1]
 
+                pending = [user_id for user_id in chunk if user_id not in alerted_today]
+                stats['users'] += len(chunk)
+                stats['already_alerted'] += len(chunk) - len(pending)
+                try:
+                    recommendations = recommendation_engine.get_recommendations_bulk(pending, limit=3, batch=batch)
+                    alerts = [
+                        Notification(user_id=user_id, title=DAILY_ALERT_TITLE,
+                                     message=self._daily_alert_message(jobs), type='job_match')
+                        for user_id, jobs in recommendations.items() if jobs
+                    ]
+                    self._bulk_create(alerts)
+                    stats['alerted'] += len(alerts)
+                    stats['no_matches'] += len(pending) - len(alerts)
                 except Exception as e:
-                    logger.error(f"Error sending daily alert to user {user.uid}: {str(e)}")
-                    continue
+                    stats['failed'] += len(pending)
+                    logger.error(f"Error sending daily alerts to users {chunk[0]}..{chunk[-1]}: {str(e)}")
+
+                self._update_run_rate(stats, started)
+                logger.info("Daily job alerts: %d users processed, %d alerts sent (%.0f users/s)",
+                            stats['users'], stats['alerted'], stats['users_per_second'])
+                if progress:
+                    progress(stats)
+                if len(chunk) < chunk_size:
+                    break  # Short page: that was the last one
 
         except Exception as e:
             logger.error(f"Error in daily job alerts: {str(e)}")
 
+        self._update_run_rate(stats, started)
+        logger.info("Daily job alerts done: %s", stats)
+        return stats
+
+    def _daily_alert_message(self, recommendations: List[Dict]) -> str:
+        job_titles = [job['title'] for job in recommendations[:2]]
+        message = f"Found {len(recommendations)} new jobs for you: {', '.join(job_titles)}"
+        if len(recommendations) > 2:
+            message += f" and {len(recommendations) - 2} more"
+        return message
+
+    def _update_run_rate(self, stats: Dict, started: float):
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        stats['users_per_second'] = round(stats['users'] / stats['seconds'], 1) if stats['seconds'] else 0.0
+
     def send_relevant_job_notifications(self, user_id: str):
         """Send notifications for relevant job opportunities"""
         try:
@@ -263,7 +552,7 @@ class NotificationService:
             recommendations = recommendation_engine.get_recommendations(user_id, limit=5)
 
             for job_data in recommendations:
-                if job_data['score'] > 0.7:  # Only high-scoring matches
+                if job_data['score'] > JOB_MATCH_NOTIFY_SCORE:  # Only high-scoring matches
                     self.create_job_match_notification(
                         user_id,
                         job_data,
@@ -280,7 +569,7 @@ class NotificationService:
             user = User.objects.get(uid=user_id)
 
             # Welcome notification
-            welcome_notification = Notification.objects.create(
+            welcome_notification = self._create(
                 user=user,
                 title="🎉 Welcome to WorkerConnect!",
                 message="Complete your profile verification to access premium job opportunities and increase your earning potential.",
@@ -288,7 +577,7 @@ class NotificationService:
             )
 
             # Profile completion notification
-            profile_notification = Notification.objects.create(
+            profile_notification = self._create(
                 user=user,
                 title="📋 Complete Your Profile",
                 message="Upload certificates and work samples to showcase your skills and get better job matches.",
@@ -305,7 +594,12 @@ class NotificationService:
         """Clean up old notifications"""
         try:
             cutoff_date = timezone.now() - timedelta(days=days_old)
-            deleted_count = Notification.objects.filter(createdAt__lt=cutoff_date).delete()[0]
+            old_notifications = Notification.objects.filter(createdAt__lt=cutoff_date)
+            with transaction.atomic():
+                unread = dict(old_notifications.filter(isRead=False).values('user')
+                              .annotate(count=Count('id')).values_list('user', 'count'))
+                deleted_count = old_notifications.delete()[0]
+                self._add_unread({user_id: -count for user_id, count in unread.items()})
             logger.info(f"Cleaned up {deleted_count} old notifications")
             return deleted_count
             
@@ -0,0 +1,136 @@
+"""
+Batched OCR for concurrent verification requests
+
+OcrBatcher sits in front of an EasyOCR reader. Threads call readtext() as
+usual; a single worker thread collects the requests arriving within a short
+window and runs each group of compatible requests (same options, similar
+size) as one readtext_batched() call, then hands every caller its own result.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Padding value for batched images; preprocessed cards are black text on white
+PAD_VALUE = 255
+
+# Images batch together only when their heights and widths round up to the same
+# multiple of this, so padding adds at most this many pixels to either side.
+# Detection runs over the padded area: a small card batched with a large photo
+# would cost as much as the photo.
+SIZE_BUCKET_PX = 64
+
+
+class _Request:
+    __slots__ = ('image', 'kwargs', 'future')
+
+    def __init__(self, image, kwargs):
+        self.image = image
+        self.kwargs = kwargs
+        self.future = Future()
+
+    def batch_key(self):
+        """Requests can share a batch only with the same options, image layout and size bucket"""
+        image = self.image
+        if not isinstance(image, np.ndarray):
+            return id(self)  # File paths and encoded bytes are read one at a time
+        size = tuple(-(-side // SIZE_BUCKET_PX) for side in image.shape[:2])
+        key = (tuple(sorted(self.kwargs.items())), image.dtype.str, image.shape[2:], size)
+        try:
+            hash(key)
+        except TypeError:
+            return id(self)  # Unhashable options (e.g. an allowlist) can't be compared cheaply
+        return key
+
+
+class OcrBatcher:
+    """
+    readtext() front end that batches concurrent calls
+
+    Args:
+        reader: easyocr.Reader (or anything with readtext / readtext_batched)
+        max_batch_size: Most requests recognized in one call; 1 disables batching
+        window_ms: How long the first request of a batch waits for others to join
+    """
+
+    def __init__(self, reader, max_batch_size: int = 8, window_ms: float = 5.0):
+        self.reader = reader
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = window_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='ocr-batcher', daemon=True)
+        self._worker.start()
+        # Batches run and requests served, for tuning window and batch size
+        self.batches = 0
+        self.requests = 0
+
+    def readtext(self, image, **kwargs):
+        """Same result as reader.readtext(image, **kwargs), possibly computed in a batch"""
+        return self.submit(image, **kwargs).result()
+
+    def submit(self, image, **kwargs) -> Future:
+        request = _Request(image, kwargs)
+        self._queue.put(request)
+        return request.future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for request in pending:
+                groups.setdefault(request.batch_key(), []).append(request)
+            for group in groups.values():
+                self._run_batch(group)
+
+    def _run_batch(self, group: List[_Request]):
+        self.batches += 1
+        self.requests += len(group)
+        try:
+            if len(group) == 1 or not hasattr(self.reader, 'readtext_batched'):
+                results = [self.reader.readtext(request.image, **request.kwargs) for request in group]
+            else:
+                results = self._readtext_batched(group)
+        except Exception as e:
+            logger.exception("Batched OCR failed")
+            for request in group:
+                request.future.set_exception(e)
+            return
+
+        for request, result in zip(group, results):
+            request.future.set_result(result)
+
+    def _readtext_batched(self, group: List[_Request]):
+        """
+        One readtext_batched() call for the group. Images are padded at the bottom
+        and right to a common size, so boxes keep their original coordinates.
+        """
+        height = max(request.image.shape[0] for request in group)
+        width = max(request.image.shape[1] for request in group)
+
+        images = []
+        for request in group:
+            image = request.image
+            padded = np.full((height, width) + image.shape[2:], PAD_VALUE, dtype=image.dtype)
+            padded[:image.shape[0], :image.shape[1]] = image
+            images.append(padded)
+
+        kwargs = dict(group[0].kwargs)
+        # Recognize text boxes from every image of the batch together
+        kwargs['batch_size'] = max(kwargs.get('batch_size', 1), len(group))
+        return self.reader.readtext_batched(images, n_width=width, n_height=height, **kwargs)
@@ -0,0 +1,148 @@
+"""
+Compiled Aadhaar field extraction
+
+All patterns and keyword sets are built once at import. scan_aadhaar_lines()
+makes a single pass over the OCR lines and finds the Aadhaar number, name and
+date of birth together, dropping scanner-app watermark lines once with one
+combined regex. Results match the per-field extract_* functions it replaced.
+"""
+import re
+from typing import Dict, List, Optional
+
+# Scanner-app watermarks ("Scanned by CamScanner", "Download from Play Store", ...)
+WATERMARK_PATTERN = re.compile(
+    r'scann?ed?\s+by|camscann?er|scanner.*app|document.*scanner|pdf.*scanner|created.*with'
+    r'|powered.*by|download.*from|available.*on|play.*store|app.*store',
+    re.IGNORECASE,
+)
+
+# Tried in priority order on each line; the first one that matches wins for that line
+AADHAAR_NUMBER_PATTERNS = [
+    re.compile(r'\b\d{4}\s+\d{4}\s+\d{4}\b'),      # Standard spaced format: 4343 6321 3335
+    re.compile(r'\b\d{4}-\d{4}-\d{4}\b'),          # Hyphenated format: 4343-6321-3335
+    re.compile(r'\b\d{12}\b'),                      # Continuous format: 434363213335
+    re.compile(r'\b\d{4}\s*\d{4}\s*\d{4}\b'),      # Variable spacing
+    re.compile(r'(?:आधार|Aadhaar|AADHAAR).*?(\d{4}\s*\d{4}\s*\d{4})', re.IGNORECASE),  # After Aadhaar keyword
+    re.compile(r'(?:No\.?|Number|संख्या).*?(\d{4}\s*\d{4}\s*\d{4})', re.IGNORECASE),    # After number keyword
+]
+
+# Only slash dates count as a DOB (DD/MM/YYYY first, then D/M/YYYY)
+DOB_PATTERNS = [
+    re.compile(r'\b\d{2}/\d{2}/\d{4}\b'),
+    re.compile(r'\b\d{1,2}/\d{1,2}/\d{4}\b'),
+]
+
+DIGIT_GROUP = re.compile(r'\d{4}')
+NON_DIGIT = re.compile(r'\D')
+DIGIT = re.compile(r'\d')
+LATIN_LETTER = re.compile(r'[a-zA-Z]')
+PUNCTUATION = re.compile(r'[^\w\s]')
+NUMBER_IN_LINE = re.compile(r'\d{4}\s*\d{4}\s*\d{4}')
+DATE_IN_LINE = re.compile(r'\d{2}/\d{2}/\d{4}')
+
+# Words that are never part of the card holder's name
+COMMON_FILTER_KEYWORDS = frozenset({
+    'government', 'india', 'aadhaar', 'aadhar', 'card', 'unique', 'identification',
+    'authority', 'uid', 'uidai', 'male', 'female', 'dob', 'date', 'birth', 'year',
+    'address', 'pin', 'code', 'state', 'district', 'village', 'city', 'phone',
+    'mobile', 'email', 'www', 'http', 'com', 'org', 'net', 'help', 'care',
+    'toll', 'free', 'number', 'contact', 'support', 'service', 'center',
+    'issued', 'valid', 'expires', 'expiry', 'signature', 'photo', 'image',
+    'scan', 'copy', 'original', 'duplicate', 'specimen', 'sample', 'demo',
+    'test', 'example', 'template', 'format', 'layout', 'design', 'watermark',
+})
+
+AADHAAR_FILTER_KEYWORDS = COMMON_FILTER_KEYWORDS | frozenset({
+    'enrollment', 'no', 'maharashtra', 'pune', 'college', 'javal', 'bhatti',
+    'vidyapeeth', 'satara', 'bharatiya', 'vishisht', 'olakh', 'pradhikaran',
+    'आधार', 'भारत', 'सरकार', 'प्राधिकरण', 'माझे', 'ओळख', '2006', '2005', '1105',
+    '9890157233', '411046', 'pict', 'kf31213540f1',
+    # Scanning app watermarks and artifacts
+    'camscanner', 'scanned', 'scannd', 'scanner', 'cam', 'by', 'app', 'document',
+    'pdf', 'jpeg', 'png', 'created', 'with', 'using', 'powered', 'version',
+    'premium', 'trial', 'download', 'install', 'available', 'play',
+    'store', 'apple', 'android', 'ios', 'application', 'software',
+})
+
+
+def is_watermark(line: str) -> bool:
+    return WATERMARK_PATTERN.search(line) is not None
+
+
+def find_aadhaar_number(line: str) -> Optional[str]:
+    """Aadhaar number on one line, formatted "1234 5678 9012", or None"""
+    if not DIGIT_GROUP.search(line):
+        return None
+    for pattern in AADHAAR_NUMBER_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            digits = NON_DIGIT.sub('', match.group(1) if pattern.groups else match.group())
+            if len(digits) == 12:
+                return f"{digits[:4]} {digits[4:8]} {digits[8:]}"
+    return None
+
+
+def find_dob(line: str) -> Optional[str]:
+    if '/' not in line:
+        return None
+    for pattern in DOB_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            return match.group()
+    return None
+
+
+def name_words(line: str) -> List[str]:
+    """Words of a line that could belong to the card holder's name"""
+    if len(line) < 3 or NUMBER_IN_LINE.search(line) or DATE_IN_LINE.search(line):
+        return []
+
+    words = []
+    for word in PUNCTUATION.sub(' ', line).split():
+        if word.lower() in AADHAAR_FILTER_KEYWORDS:
+            continue
+        if len(DIGIT.findall(word)) > len(word) * 0.3:  # Mostly numbers
+            continue
+        if len(word) < 2 or len(word) > 25:
+            continue
+        if not LATIN_LETTER.search(word):
+            continue
+        words.append(word)
+    return words
+
+
+def scan_aadhaar_lines(lines: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Find the Aadhaar number, name and DOB in one pass over OCR text lines
+
+    The number and name come from the first / best non-watermark line; the DOB
+    from the first line with a slash date.
+
+    Returns:
+        {'number': ..., 'name': ..., 'dob': ...}, None for fields not found
+    """
+    number = dob = name = None
+    best_confidence = 0.0
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if dob is None:
+            dob = find_dob(line)
+
+        if is_watermark(line):
+            continue
+
+        if number is None:
+            number = find_aadhaar_number(line)
+
+        words = name_words(line)
+        if words:
+            candidate = ' '.join(words)
+            confidence = len(words) * 0.25  # More words = higher confidence
+            if 3 <= len(candidate) <= 50 and len(words) <= 4 and confidence > best_confidence:
+                name, best_confidence = candidate, confidence
+
+    return {'number': number, 'name': name, 'dob': dob}
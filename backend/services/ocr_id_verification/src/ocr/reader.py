@@ -0,0 +1,135 @@
+"""
+Access to the EasyOCR reader
+
+The reader (and the torch model behind it) is only loaded the first time a
+request actually needs OCR, not when ocr.processor is imported. Setting
+OCR_SERVER_ADDRESS instead sends readtext() calls to a dedicated OCR process
+(see ocr/server.py), so web workers never load the model at all.
+
+Environment:
+    OCR_SERVER_ADDRESS  "host:port" or a Unix socket path of a running OCR server
+    OCR_SERVER_AUTHKEY  Shared secret for the OCR server connection (required with the address)
+    OCR_BATCH_SIZE      Batch concurrent in-process readtext() calls up to this size (default 1: off)
+    OCR_BATCH_WINDOW_MS How long a batch waits for more requests (default 5)
+"""
+import importlib.util
+import logging
+import os
+import threading
+from multiprocessing.connection import Client
+from typing import Optional, Tuple, Union
+
+from .batching import OcrBatcher
+
+logger = logging.getLogger(__name__)
+
+# English and Hindi support for Aadhaar cards
+OCR_LANGUAGES = ['en', 'hi']
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def parse_address(address: str) -> Union[Tuple[str, int], str]:
+    """"host:port" becomes a TCP address; anything else is a Unix socket path"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return address
+
+
+def server_settings() -> Optional[Tuple[Union[Tuple[str, int], str], bytes]]:
+    """(address, authkey) of the configured OCR server, or None to run OCR in-process"""
+    address = os.getenv('OCR_SERVER_ADDRESS')
+    if not address:
+        return None
+    authkey = os.getenv('OCR_SERVER_AUTHKEY')
+    if not authkey:
+        raise RuntimeError("OCR_SERVER_AUTHKEY must be set when OCR_SERVER_ADDRESS is used")
+    return parse_address(address), authkey.encode()
+
+
+def ocr_available() -> bool:
+    """Whether OCR can run: EasyOCR is installed here or an OCR server is configured"""
+    return bool(os.getenv('OCR_SERVER_ADDRESS')) or importlib.util.find_spec('easyocr') is not None
+
+
+def load_local_reader():
+    """Build an EasyOCR reader in this process (slow: loads the detection and recognition models)"""
+    import easyocr
+
+    logger.info(f"Loading EasyOCR reader for {OCR_LANGUAGES}...")
+    return easyocr.Reader(OCR_LANGUAGES)
+
+
+def batch_settings() -> Tuple[int, float]:
+    """(max batch size, window in ms) for OcrBatcher from the environment"""
+    return int(os.getenv('OCR_BATCH_SIZE', '1')), float(os.getenv('OCR_BATCH_WINDOW_MS', '5'))
+
+
+def get_reader():
+    """
+    The shared reader, created on first use
+
+    Returns a RemoteReader when OCR_SERVER_ADDRESS is set, otherwise a local
+    easyocr.Reader (behind an OcrBatcher when OCR_BATCH_SIZE > 1). All of them
+    expose readtext().
+    """
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                settings = server_settings()
+                if settings:
+                    _reader = RemoteReader(*settings)
+                else:
+                    max_batch_size, window_ms = batch_settings()
+                    reader = load_local_reader()
+                    _reader = OcrBatcher(reader, max_batch_size, window_ms) if max_batch_size > 1 else reader
+    return _reader
+
+
+class OcrServerError(RuntimeError):
+    """The OCR server reported a failure while running a request"""
+
+
+class RemoteReader:
+    """readtext() proxy that runs OCR in the dedicated OCR server process"""
+
+    def __init__(self, address, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        # One connection per thread; Connection objects are not thread-safe
+        self._local = threading.local()
+
+    def readtext(self, image, **kwargs):
+        return self._call('readtext', image, **kwargs)
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            return self._request(method, args, kwargs)
+        except (EOFError, OSError):
+            # Server restarted or the connection went stale: reconnect once
+            self._close()
+            return self._request(method, args, kwargs)
+
+    def _request(self, method: str, args, kwargs):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = Client(self.address, authkey=self.authkey)
+            self._local.connection = connection
+
+        connection.send((method, args, kwargs))
+        status, result = connection.recv()
+        if status != 'ok':
+            raise OcrServerError(result)
+        return result
+
+    def _close(self):
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except OSError:
+                pass
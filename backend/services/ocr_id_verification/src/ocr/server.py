@@ -0,0 +1,99 @@
+"""
+Dedicated OCR worker process
+
+Holds the only EasyOCR reader and serves readtext() calls from web processes
+that have OCR_SERVER_ADDRESS / OCR_SERVER_AUTHKEY pointing at it. Requests
+arriving together from different clients are recognized in one batch.
+
+Usage (from services/ocr_id_verification/src):
+    OCR_SERVER_AUTHKEY=... python -m ocr.server --address 127.0.0.1:8765 [--batch-size 8] [--batch-window-ms 5]
+"""
+import argparse
+import logging
+import os
+import threading
+from multiprocessing.connection import Listener
+
+from ocr.batching import OcrBatcher
+from ocr.reader import load_local_reader, parse_address
+
+logger = logging.getLogger(__name__)
+
+
+class OcrServer:
+    """Accepts connections and runs each request against one shared, batching reader"""
+
+    def __init__(self, address, authkey: bytes, reader=None, max_batch_size: int = 8, window_ms: float = 5.0):
+        self.address = address
+        self.authkey = authkey
+        # Load the model up front so the first request doesn't pay for it
+        reader = reader if reader is not None else load_local_reader()
+        # One batcher thread runs all inference; requests from many clients queue there
+        self.batcher = OcrBatcher(reader, max_batch_size, window_ms)
+        self._listener = None
+
+    def serve_forever(self):
+        self._listener = Listener(self.address, authkey=self.authkey)
+        logger.info(f"OCR server listening on {self._listener.address}")
+        try:
+            while True:
+                try:
+                    connection = self._listener.accept()
+                except OSError:
+                    if self._listener is None:
+                        break  # shutdown() closed the listener
+                    logger.exception("Rejected OCR client connection")
+                    continue
+                threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return  # Client went away
+
+                try:
+                    if method != 'readtext':
+                        raise ValueError(f"Unsupported OCR method: {method}")
+                    result = self.batcher.readtext(*args, **kwargs)
+                    reply = ('ok', result)
+                except Exception as e:
+                    logger.exception("OCR request failed")
+                    reply = ('error', f"{type(e).__name__}: {e}")
+
+                try:
+                    connection.send(reply)
+                except (EOFError, OSError):
+                    return
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--address', default=os.getenv('OCR_SERVER_ADDRESS', '127.0.0.1:8765'),
+                        help='host:port or Unix socket path to listen on')
+    parser.add_argument('--batch-size', type=int, default=int(os.getenv('OCR_BATCH_SIZE', '8')),
+                        help='most concurrent requests recognized together (1 disables batching)')
+    parser.add_argument('--batch-window-ms', type=float, default=float(os.getenv('OCR_BATCH_WINDOW_MS', '5')),
+                        help='how long a batch waits for more requests')
+    args = parser.parse_args()
+
+    authkey = os.getenv('OCR_SERVER_AUTHKEY')
+    if not authkey:
+        parser.error('OCR_SERVER_AUTHKEY must be set')
+
+    logging.basicConfig(level=logging.INFO)
+    OcrServer(parse_address(args.address), authkey.encode(),
+              max_batch_size=args.batch_size, window_ms=args.batch_window_ms).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,12 @@ import cv2
 import numpy as np
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the host application
 logger = logging.getLogger(__name__)
 
 def preprocess_image_from_streamlit(uploaded_file):
     """Enhanced image preprocessing for better OCR accuracy with advanced techniques"""
-    logger.info("🖼️ Starting enhanced image preprocessing...")
+    logger.debug("🖼️ Starting enhanced image preprocessing...")
 
     try:
         # Read file bytes
@@ -18,7 +17,7 @@ def preprocess_image_from_streamlit(uploaded_file):
         if img is None:
             raise ValueError("Could not decode image from uploaded file.")
 
-        logger.info(f"📐 Original image dimensions: {img.shape[:2]}")
+        logger.debug("📐 Original image dimensions: %s", img.shape[:2])
 
         # Get original dimensions
         height, width = img.shape[:2]
@@ -30,14 +29,14 @@ def preprocess_image_from_streamlit(uploaded_file):
             new_width = int(width * scale)
             new_height = int(height * scale)
             img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
-            logger.info(f"📏 Resized to: {new_height}x{new_width}")
+            logger.debug("📏 Resized to: %dx%d", new_height, new_width)
         elif max(height, width) < 800:
             # Upscale small images for better OCR
             scale = 800 / max(height, width)
             new_width = int(width * scale)
             new_height = int(height * scale)
             img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-            logger.info(f"📈 Upscaled to: {new_height}x{new_width}")
+            logger.debug("📈 Upscaled to: %dx%d", new_height, new_width)
 
         # Convert to grayscale
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -45,11 +44,11 @@ def preprocess_image_from_streamlit(uploaded_file):
         # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization) for better contrast
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         enhanced = clahe.apply(gray)
-        logger.info("✨ Applied CLAHE contrast enhancement")
+        logger.debug("✨ Applied CLAHE contrast enhancement")
 
         # Apply bilateral filter to reduce noise while preserving edges
         filtered = cv2.bilateralFilter(enhanced, 9, 75, 75)
-        logger.info("🔧 Applied bilateral filtering")
+        logger.debug("🔧 Applied bilateral filtering")
 
         # Apply Gaussian blur to reduce remaining noise
         blurred = cv2.GaussianBlur(filtered, (3, 3), 0)
@@ -64,7 +63,7 @@ def preprocess_image_from_streamlit(uploaded_file):
 
         # Combine both thresholding methods for better results
         thresh_combined = cv2.bitwise_and(thresh_adaptive, thresh_otsu)
-        logger.info("🎯 Applied combined adaptive and Otsu thresholding")
+        logger.debug("🎯 Applied combined adaptive and Otsu thresholding")
 
         # Enhanced morphological operations
         # Use different kernel sizes for different operations
@@ -77,35 +76,35 @@ def preprocess_image_from_streamlit(uploaded_file):
         # Remove small noise
         opened = cv2.morphologyEx(closed, cv2.MORPH_OPEN, kernel_open)
 
-        logger.info("🧹 Applied morphological operations")
+        logger.debug("🧹 Applied morphological operations")
 
         # Apply slight dilation to make text more readable
         kernel_dilate = np.ones((1, 1), np.uint8)
         final_image = cv2.dilate(opened, kernel_dilate, iterations=1)
 
-        logger.info("✅ Image preprocessing completed successfully")
+        logger.debug("✅ Image preprocessing completed successfully")
         return final_image
 
     except Exception as e:
-        logger.error(f"❌ Error in image preprocessing: {str(e)}")
+        logger.error("❌ Error in image preprocessing: %s", e)
         raise
 
 def load_image(image_path):
     """Load image from file path with error handling"""
     try:
-        logger.info(f"📂 Loading image from: {image_path}")
+        logger.debug("📂 Loading image from: %s", image_path)
         image = cv2.imread(image_path)
         if image is None:
             raise ValueError(f"Could not load image from {image_path}")
-        logger.info(f"✅ Image loaded successfully: {image.shape}")
+        logger.debug("✅ Image loaded successfully: %s", image.shape)
         return image
     except Exception as e:
-        logger.error(f"❌ Error loading image: {str(e)}")
+        logger.error("❌ Error loading image: %s", e)
         raise
 
 def preprocess_image(image):
     """Enhanced basic image preprocessing with multiple techniques"""
-    logger.info("🔧 Starting basic image preprocessing...")
+    logger.debug("🔧 Starting basic image preprocessing...")
 
     try:
         # Convert to grayscale if needed
@@ -124,16 +123,16 @@ def preprocess_image(image):
         # Apply Otsu's thresholding
         _, thresh_image = cv2.threshold(blurred_image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-        logger.info("✅ Basic preprocessing completed")
+        logger.debug("✅ Basic preprocessing completed")
         return thresh_image
 
     except Exception as e:
-        logger.error(f"❌ Error in basic preprocessing: {str(e)}")
+        logger.error("❌ Error in basic preprocessing: %s", e)
         raise
 
 def validate_image_quality(image):
     """Validate if image quality is sufficient for OCR"""
-    logger.info("🔍 Validating image quality...")
+    logger.debug("🔍 Validating image quality...")
 
     try:
         if image is None:
@@ -156,16 +155,16 @@ def validate_image_quality(image):
         if laplacian_var < 100:  # Threshold for blur detection
             return False, f"Image appears blurry (variance: {laplacian_var:.2f})"
 
-        logger.info(f"✅ Image quality validation passed (variance: {laplacian_var:.2f})")
+        logger.debug("✅ Image quality validation passed (variance: %.2f)", laplacian_var)
         return True, "Image quality is acceptable"
 
     except Exception as e:
-        logger.error(f"❌ Error validating image quality: {str(e)}")
+        logger.error("❌ Error validating image quality: %s", e)
         return False, f"Error validating image: {str(e)}"
 
 def enhance_text_regions(image):
     """Enhance text regions in the image for better OCR"""
-    logger.info("📝 Enhancing text regions...")
+    logger.debug("📝 Enhancing text regions...")
 
     try:
         # Convert to grayscale if needed
@@ -189,9 +188,9 @@ def enhance_text_regions(image):
                                   [-1,-1,-1]])
         sharpened = cv2.filter2D(enhanced, -1, kernel_sharpen)
 
-        logger.info("✅ Text regions enhanced")
+        logger.debug("✅ Text regions enhanced")
         return sharpened
 
     except Exception as e:
-        logger.error(f"❌ Error enhancing text regions: {str(e)}")
+        logger.error("❌ Error enhancing text regions: %s", e)
         return image  # Return original image if enhancement fails
@@ -0,0 +1,145 @@
+"""
+Low-overhead OCR instrumentation
+
+Stages are timed with span() into process-wide totals, and notable outcomes
+are tallied with count(); both cost a perf_counter call and a dict update.
+The per-line detail (OCR lines, skipped words, match ratios) goes through
+trace(), which does nothing unless a trace was started for the current
+request with start_trace(); messages are %-formatted only when the trace is
+read, so disabled tracing never builds strings.
+
+The totals are written to the log as one JSON line (log_snapshot()), at most
+every few seconds once log_snapshot_every() is set, checked as stages are
+recorded so an idle process logs nothing.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_active_trace: ContextVar[Optional['Trace']] = ContextVar('ocr_trace', default=None)
+
+_lock = threading.Lock()
+_counters = Counter()
+_span_totals: Dict[str, list] = {}  # name -> [calls, total ms]
+_log_interval = None  # Seconds between snapshot log lines, None when off
+_next_log = None  # time.monotonic() at which the next line is due
+
+
+class Trace:
+    """Spans and debug events recorded for one request"""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans = []
+        self.events = []
+
+    def as_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'spans': [{'name': name, 'ms': round(ms, 2)} for name, ms in self.spans],
+            'events': [message % args if args else message for message, args in self.events],
+        }
+
+
+@contextmanager
+def start_trace(trace_id: str):
+    """Record spans and trace() events of the code inside the block into a Trace"""
+    active = Trace(trace_id)
+    token = _active_trace.set(active)
+    try:
+        yield active
+    finally:
+        _active_trace.reset(token)
+
+
+def tracing() -> bool:
+    """Whether a trace is active, for callers that need extra work to build trace arguments"""
+    return _active_trace.get() is not None
+
+
+def trace(message: str, *args):
+    """Record a %-style debug event in the active trace, if any"""
+    active = _active_trace.get()
+    if active is not None:
+        active.events.append((message, args))
+
+
+@contextmanager
+def span(name: str):
+    """Time the block as stage `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, (time.perf_counter() - start) * 1000)
+
+
+def record_timing(name: str, ms: float):
+    """Add an externally measured stage time (e.g. preprocessing stage timings)"""
+    with _lock:
+        totals = _span_totals.get(name)
+        if totals is None:
+            totals = _span_totals[name] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += ms
+
+    active = _active_trace.get()
+    if active is not None:
+        active.spans.append((name, ms))
+    if _next_log is not None:
+        _log_if_due()
+
+
+def count(name: str, n: int = 1):
+    with _lock:
+        _counters[name] += n
+    if _next_log is not None:
+        _log_if_due()
+
+
+def snapshot() -> Dict:
+    """Counters and per-stage call counts / total / mean ms for this process"""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'spans': {
+                name: {'calls': calls, 'total_ms': round(total, 2), 'mean_ms': round(total / calls, 2)}
+                for name, (calls, total) in _span_totals.items()
+            },
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _span_totals.clear()
+
+
+def log_snapshot():
+    """Write snapshot() to the log as one JSON line"""
+    logger.info('ocr_metrics %s', json.dumps(snapshot(), sort_keys=True))
+
+
+def log_snapshot_every(seconds: Optional[float]):
+    """Log the snapshot at most every `seconds` while stages are recorded; None or 0 turns it off"""
+    global _log_interval, _next_log
+    with _lock:
+        _log_interval = seconds or None
+        _next_log = time.monotonic() + seconds if seconds else None
+
+
+def _log_if_due():
+    global _next_log
+    now = time.monotonic()
+    with _lock:
+        if _next_log is None or now < _next_log:
+            return
+        _next_log = now + _log_interval
+    log_snapshot()
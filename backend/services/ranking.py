@@ -0,0 +1,53 @@
+"""
+Top-k selection shared by the recommendation engines
+
+Ranking only needs the best `limit` results, so instead of sorting every
+candidate these select the top k in O(N) (argpartition) or O(N log k) (heap)
+and sort just those. Ties always keep the candidates' original order, exactly
+like a stable descending sort followed by [:k].
+"""
+import heapq
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+
+
+def top_k_indices(scores, k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of indices to return; None ranks every score
+
+    Returns:
+        Same result as np.argsort(-scores, kind='stable')[:k]
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # k-th largest score: everything above it is in, and only the first
+    # (lowest-index) ties at that score fill the remaining slots
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    candidates = np.concatenate([above, ties])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def top_k(items: Iterable[T], k: Optional[int], key: Callable[[T], float]) -> List[T]:
+    """
+    The k items with the highest key, best first
+
+    Same result as sorted(items, key=key, reverse=True)[:k]; None keeps every item.
+    """
+    if k is None:
+        return sorted(items, key=key, reverse=True)
+    # heapq.nlargest is stable: equal keys keep their input order
+    return heapq.nlargest(k, items, key=key)
@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, List
+
+from django.core.cache import caches
+
+
+class RecommendationCache:
+    """
+    Per-user cache of recommendation results built on Django's cache framework
+
+    Entries are keyed on a per-user profile version and a global job-set version.
+    User, WorkHistory and Job writes bump those versions (see worker/signals.py),
+    so stale entries are never read again and simply age out under the cache
+    backend's TIMEOUT and MAX_ENTRIES limits (the "recommendations" alias in
+    settings.CACHES).
+    """
+
+    JOBS_VERSION_KEY = 'recs:jobs_version'
+
+    def __init__(self, alias: str = 'recommendations'):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_or_compute(self, user_id: str, params: Hashable, compute: Callable[[], List[Dict]]) -> List[Dict]:
+        """Return the cached result for user_id and params, computing and storing it on a miss"""
+        user_version_key = self._user_version_key(user_id)
+        versions = self.cache.get_many([self.JOBS_VERSION_KEY, user_version_key])
+        jobs_version = versions.get(self.JOBS_VERSION_KEY) or self._init_version(self.JOBS_VERSION_KEY)
+        user_version = versions.get(user_version_key) or self._init_version(user_version_key)
+
+        key = f"recs:{user_id}:{user_version}:{jobs_version}:{hash(params)}"
+        result = self.cache.get(key)
+        if result is not None:
+            self._count(hit=True)
+            return result
+
+        self._count(hit=False)
+        result = compute()
+        self.cache.set(key, result)
+        return result
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached result for one user"""
+        self._bump(self._user_version_key(user_id))
+
+    def invalidate_jobs(self):
+        """Drop every cached result after the open-job set changed"""
+        self._bump(self.JOBS_VERSION_KEY)
+
+    def stats(self) -> Dict:
+        """Hit and miss counters for this process"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _user_version_key(self, user_id: str) -> str:
+        return f"recs:user_version:{user_id}"
+
+    def _init_version(self, key: str) -> int:
+        # Seed missing versions from the clock rather than 1, so a version key that was
+        # evicted can never come back with a value matching entries that are still cached
+        self.cache.add(key, time.time_ns(), timeout=None)
+        return self.cache.get(key) or time.time_ns()
+
+    def _bump(self, key: str):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Key missing or evicted: any fresh seed invalidates the old entries
+            self._init_version(key)
+
+
+# Global instance
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,185 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from worker.geo import cell_for, cells_within
+from worker.job_features import SKILL_BITS, job_skill_mask, skill_mask
+from worker.models import Job, User
+
+
+class _Postings:
+    """The index structures themselves; WorkerMatchIndex swaps in a new one on rebuild"""
+
+    def __init__(self):
+        self.entries = {}  # uid -> (skill bits, job types, cell) as indexed
+        self.by_skill = {}  # skill bit -> uids
+        self.by_job_type = {}  # lowercased job type -> uids
+        self.by_cell = {}  # grid cell -> uids
+        self.no_location = set()
+
+    def add(self, uid: str, skills: Optional[Iterable[str]], job_types: Optional[Iterable[str]],
+            latitude: Optional[float], longitude: Optional[float]):
+        mask = skill_mask(skill.lower() for skill in skills or [])
+        bits = tuple(bit for bit in SKILL_BITS.values() if mask & bit)
+        types = tuple({job_type.lower() for job_type in job_types or [] if job_type is not None})
+        if not bits and not types:
+            return  # Can never reach the match threshold
+
+        cell = cell_for(latitude, longitude)
+        self.entries[uid] = (bits, types, cell)
+        for bit in bits:
+            self.by_skill.setdefault(bit, set()).add(uid)
+        for job_type in types:
+            self.by_job_type.setdefault(job_type, set()).add(uid)
+        if cell is None:
+            self.no_location.add(uid)
+        else:
+            self.by_cell.setdefault(cell, set()).add(uid)
+
+    def remove(self, uid: str):
+        entry = self.entries.pop(uid, None)
+        if entry is None:
+            return
+
+        bits, types, cell = entry
+        for index, keys in ((self.by_skill, bits), (self.by_job_type, types), (self.by_cell, (cell,))):
+            for key in keys:
+                uids = index.get(key)
+                if uids is not None:
+                    uids.discard(uid)
+                    if not uids:
+                        del index[key]
+        self.no_location.discard(uid)
+
+    def save(self, uid: str, is_verified: bool, skills, job_types, latitude, longitude):
+        self.remove(uid)
+        if is_verified:
+            self.add(uid, skills, job_types, latitude, longitude)
+
+
+class WorkerMatchIndex:
+    """
+    Inverted index from job features to the workers they can match
+
+    Workers are indexed by each SKILL_KEYWORDS bit in their skill mask, by their
+    lowercased job types, and by the grid cell of their location. A job can only
+    score above the job-match notification threshold through a skill or job type
+    overlap (see JobRecommendationEngine._calculate_job_score), so candidates()
+    returns every worker who could match, and only those, without scanning all
+    users. Only verified workers are indexed, the same audience as the daily job
+    alerts.
+
+    Built from the database on first use, then kept current by User save/delete
+    signals; rebuilt after max_age_seconds so writes made by other processes
+    (or bulk_create, which sends no signals) are picked up. Rebuilds read the
+    users without holding the lock: lookups keep using the previous index until
+    the new one is swapped in, and user changes made meanwhile are replayed onto it.
+    """
+
+    def __init__(self, max_age_seconds: int = 600):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()  # Guards the fields below; held only briefly
+        self._build_lock = threading.Lock()  # One rebuild at a time
+        self._postings = None
+        self._built_at = None
+        self._changes_during_build = None  # User changes to replay onto the index being built
+
+    def user_saved(self, user: User):
+        self._change((user.uid, user.isVerified, user.skills, user.JobTypes, user.latitude, user.longitude))
+
+    def user_removed(self, user_id: str):
+        self._change((user_id, False, None, None, None, None))
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup"""
+        with self._lock:
+            self._built_at = None
+
+    def candidates(self, job: Job, max_distance_km: float = 50.0) -> Set[str]:
+        """
+        Workers sharing a skill or job type with the job, near it when it has a location
+
+        Workers without a location are always kept, as the recommendation engine does.
+        Exact scores and distances are left to the caller.
+        """
+        mask = job.skillMask if job.skillMask is not None else job_skill_mask(
+            job.title, job.description, job.requirements)
+        job_type = (job.jobType or '').lower()
+
+        self._ensure_built()
+        with self._lock:
+            postings = self._postings
+
+            matched = set()
+            for bit in SKILL_BITS.values():
+                if mask & bit:
+                    matched |= postings.by_skill.get(bit, set())
+            if job_type:
+                # Exact or partial match either way, as in _calculate_job_type_score
+                for user_type, uids in postings.by_job_type.items():
+                    if user_type in job_type or job_type in user_type:
+                        matched |= uids
+
+            if not matched or not (job.latitude and job.longitude):
+                return matched
+
+            cells = cells_within(job.latitude, job.longitude, max_distance_km)
+            if cells is None:  # Too large an area for the cells to narrow anything
+                return matched
+            nearby = matched & postings.no_location
+            for cell in cells:
+                nearby |= matched & postings.by_cell.get(cell, set())
+            return nearby
+
+    def stats(self) -> Dict:
+        with self._lock:
+            postings = self._postings or _Postings()
+            return {
+                'workers': len(postings.entries),
+                'skills': len(postings.by_skill),
+                'job_types': len(postings.by_job_type),
+                'cells': len(postings.by_cell),
+            }
+
+    def _change(self, change):
+        with self._lock:
+            if self._postings is not None:
+                self._postings.save(*change)
+            if self._changes_during_build is not None:
+                self._changes_during_build.append(change)
+
+    def _is_fresh(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at <= self.max_age_seconds
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._is_fresh():
+                return
+
+        if not self._build_lock.acquire(blocking=self._postings is None):
+            return  # Another thread is rebuilding; the previous index still answers meanwhile
+        try:
+            with self._lock:
+                if self._is_fresh():
+                    return  # Built while we waited for the build lock
+                self._changes_during_build = []
+
+            postings = _Postings()
+            rows = User.objects.filter(isVerified=True).values_list(
+                'uid', 'skills', 'JobTypes', 'latitude', 'longitude')
+            for uid, skills, job_types, latitude, longitude in rows.iterator(chunk_size=5000):
+                postings.add(uid, skills, job_types, latitude, longitude)
+
+            with self._lock:
+                for change in self._changes_during_build:
+                    postings.save(*change)
+                self._postings = postings
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._changes_during_build = None
+            self._build_lock.release()
+
+
+# Global instance
+worker_match_index = WorkerMatchIndex()
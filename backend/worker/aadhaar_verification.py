@@ -0,0 +1,177 @@
+"""
+Aadhaar card verification pipeline
+Preprocessing, EasyOCR text extraction, field extraction and name matching for
+one uploaded image. Shared by the synchronous verify-aadhaar view and the
+background verification jobs (see verification_jobs.py).
+"""
+import logging
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from rest_framework import status
+
+from .ocr_cache import ocr_result_cache
+
+# Add your OCR module to path (updated path)
+ocr_path = os.path.join(os.path.dirname(__file__), '..', 'services', 'ocr_id_verification', 'src')
+if ocr_path not in sys.path:
+    sys.path.append(ocr_path)
+
+from utils.instrumentation import count, log_snapshot_every, span, start_trace, trace
+
+logger = logging.getLogger(__name__)
+
+log_snapshot_every(settings.OCR_METRICS_LOG_SECONDS)
+
+
+def verify_aadhaar_image(file_bytes: bytes, user_name: str, trace_id: Optional[str] = None) -> Tuple[Dict, int]:
+    """
+    Run the Aadhaar OCR verification on an uploaded image
+
+    Args:
+        file_bytes: Raw bytes of the uploaded image (any bytes-like object, e.g. an upload buffer)
+        user_name: Name the user entered, matched against the card
+        trace_id: Record the per-stage timings and per-line OCR trace under this id and
+            return them in the response's 'trace' (debug mode)
+
+    Returns:
+        (response data, HTTP status code) for the verify-aadhaar endpoint
+    """
+    if trace_id is None:
+        with span('verify.total'):
+            return _verify(file_bytes, user_name)
+
+    with start_trace(trace_id) as request_trace, span('verify.total'):
+        data, status_code = _verify(file_bytes, user_name)
+    data['trace'] = request_trace.as_dict()
+    logger.debug("Aadhaar verification trace %s: %s", trace_id, data['trace'])
+    return data, status_code
+
+
+def _verify(file_bytes: bytes, user_name: str) -> Tuple[Dict, int]:
+    trace("Aadhaar verification for user name %r", user_name)
+
+    # Try to use your enhanced AI/ML OCR first
+    try:
+        from ocr.processor import enhanced_fuzzy_match
+
+        # Same photo uploaded before (e.g. retry after a name mismatch): reuse its OCR output
+        cache_key = ocr_result_cache.image_key(file_bytes)
+        cached = ocr_result_cache.get(cache_key)
+        if cached is not None:
+            trace("Reusing OCR result for a previously uploaded image")
+            extracted_text = cached['extracted_text']
+            extracted_fields = cached['extracted_fields']
+        else:
+            extracted_text, extracted_fields = _run_ocr(file_bytes)
+            ocr_result_cache.set(cache_key, {'extracted_text': extracted_text, 'extracted_fields': extracted_fields})
+
+        # Prepare response data
+        extracted_name = extracted_fields.get('Name', '').strip()
+        extracted_id = extracted_fields.get('ID Number', '').strip()
+        extracted_dob = extracted_fields.get('DOB', '').strip()
+
+        trace("Extracted name %r, Aadhaar number %r, DOB %r", extracted_name, extracted_id, extracted_dob)
+
+        # Enhanced name matching logic with fuzzy matching
+        name_match = False
+        confidence = 0.0
+        match_message = ""
+
+        # If we have an Aadhaar number, that's the primary verification
+        if extracted_id:
+            # Use enhanced fuzzy matching for name verification
+            if extracted_name and user_name:
+                with span('name_match'):
+                    name_match, confidence, match_message = enhanced_fuzzy_match(
+                        extracted_name, user_name, min_confidence=0.8
+                    )
+                trace("Enhanced matching result: %s", match_message)
+                # STRICT REQUIREMENT: No verification without proper name matching
+                confidence = 0.0
+                name_match = False
+                trace("STRICT VERIFICATION FAILED: No name extracted from Aadhaar card")
+        else:
+            trace("No Aadhaar number extracted")
+
+        # STRICT VERIFICATION: Require BOTH Aadhaar number AND 80% name match
+        if extracted_id:
+            if name_match and confidence >= 0.8:  # Strict 80% requirement
+                verification_status = 'verified'
+                message = f'✅ Aadhaar verified successfully! Enhanced OCR with 80%+ name match achieved. (confidence: {confidence:.1%}) - {match_message}'
+            else:
+                verification_status = 'name_mismatch'
+                if extracted_name and len(extracted_name.strip()) > 0:
+                    if len(extracted_name.strip()) <= 2:
+                        message = f'❌ Name Verification Failed: OCR extracted incomplete name "{extracted_name}". Please upload a clearer image of your Aadhaar card where the full name is clearly visible.'
+                    else:
+                        message = f'❌ Name Verification Failed: Name verification failed. Aadhaar shows "{extracted_name}" but you entered "{user_name}". Please enter your full name as shown on your Aadhaar card.'
+                else:
+                    message = f'❌ Name Verification Failed: Could not extract name from Aadhaar card. Please ensure the image is clear and shows your full name prominently.'
+        else:
+            verification_status = 'failed'
+            message = '❌ Aadhaar Number Not Found: Could not extract Aadhaar number from image. Please ensure the image is clear and shows the full Aadhaar card.'
+
+        # Determine success based on verification status
+        is_success = verification_status == 'verified'
+        status_code = status.HTTP_200_OK if is_success else status.HTTP_400_BAD_REQUEST
+        count(f'verify.{verification_status}')
+
+        return {
+            'success': is_success,
+            'verification_status': verification_status,
+            'message': message,
+            'extracted_data': {
+                'name': extracted_name,
+                'aadhaar_number': extracted_id,
+                'dob': extracted_dob,
+                'raw_text': extracted_text[:500]  # First 500 chars for debugging
+            },
+            'comparison': {
+                'name_match': name_match,
+                'confidence': confidence,
+                'extracted_name': extracted_name,
+                'provided_name': user_name
+            },
+            'ocr_method': 'Enhanced_Aadhaar_OCR_v2_Advanced_Preprocessing_80_Percent_Strict'
+        }, status_code
+
+    except Exception as ocr_error:
+        logger.warning("Aadhaar OCR failed: %s", ocr_error)
+        count('verify.ocr_failed')
+        # NO FALLBACK - Strict 80% matching required
+        return {
+            'success': False,
+            'verification_status': 'ocr_failed',
+            'message': f'OCR processing failed: {str(ocr_error)}. Please ensure the Aadhaar card image is clear and well-lit.',
+            'error': 'OCR_PROCESSING_ERROR'
+        }, status.HTTP_400_BAD_REQUEST
+
+
+def _run_ocr(file_bytes: bytes) -> Tuple[str, Dict]:
+    """Preprocess the image, OCR it and extract the ID fields; (extracted text, fields)"""
+    from ocr.processor import extract_text_from_image, extract_id_fields
+    from ocr.reader import ocr_available
+    from utils.preprocessing import aadhaar_preprocessing
+
+    if not ocr_available():
+        raise ImportError("No module named 'easyocr' and OCR_SERVER_ADDRESS is not set")
+
+    # One fused pass: decode to grayscale, resize, denoise, enhance and binarize (stages timed inside)
+    enhanced_image, report = aadhaar_preprocessing.run(file_bytes)
+    trace("Image quality check: %s", report['quality_message'])
+
+    if not report['quality_ok']:
+        count('preprocess.low_quality')
+        # Continue processing but note the quality issue
+
+    # Use your enhanced EasyOCR extraction
+    extracted_text = extract_text_from_image(enhanced_image, preprocessed=True)
+    trace("Extracted text (%d chars): %r", len(extracted_text), extracted_text)
+
+    # Use your enhanced field extraction
+    extracted_fields = extract_id_fields(extracted_text)
+
+    return extracted_text, extracted_fields
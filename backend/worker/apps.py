@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class WorkerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'worker'
+
+    def ready(self):
+        # Register signal handlers that keep in-process caches in sync with writes
+        from . import signals  # noqa: F401
@@ -0,0 +1,93 @@
+"""
+Grid-cell spatial index for job locations
+Coordinates are bucketed into fixed lat/lng cells so a radius query only
+has to look at jobs stored in the cells that overlap its bounding box.
+"""
+import math
+from typing import List, Optional, Tuple
+
+# Earth's radius in kilometers
+EARTH_RADIUS_KM = 6371
+
+# Cell edge in degrees (~28 km of latitude). A 50 km query covers ~25 cells.
+CELL_SIZE_DEGREES = 0.25
+
+# Above this many cells an indexed lookup is no cheaper than a full scan
+MAX_QUERY_CELLS = 400
+
+# Cell columns around the globe; column numbers wrap at the antimeridian
+CELL_COLUMNS = round(360 / CELL_SIZE_DEGREES)
+
+
+def cell_for(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    """Return the grid cell key for a coordinate, or None if it has no location"""
+    if not latitude or not longitude:
+        return None
+    row = math.floor(latitude / CELL_SIZE_DEGREES)
+    col = _wrap_column(math.floor(longitude / CELL_SIZE_DEGREES))
+    return f"{row}:{col}"
+
+
+def _wrap_column(col: int) -> int:
+    """Column number in [-CELL_COLUMNS / 2, CELL_COLUMNS / 2), so 180 and -180 share a column"""
+    return (col + CELL_COLUMNS // 2) % CELL_COLUMNS - CELL_COLUMNS // 2
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Smallest lat/lng box containing every point within radius_km
+
+    Returns:
+        (min_lat, max_lat, min_lng, max_lng) in degrees
+    """
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    lat = math.radians(latitude)
+
+    min_lat = math.degrees(lat - angular_radius)
+    max_lat = math.degrees(lat + angular_radius)
+
+    # Exact longitude spread of a spherical cap; near the poles it covers every meridian
+    sin_ratio = math.sin(angular_radius) / math.cos(lat) if math.cos(lat) > 0 else 2.0
+    if min_lat <= -90 or max_lat >= 90 or sin_ratio >= 1:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    delta_lng = math.degrees(math.asin(sin_ratio))
+    return min_lat, max_lat, longitude - delta_lng, longitude + delta_lng
+
+
+def cells_within(latitude: float, longitude: float, radius_km: float) -> Optional[List[str]]:
+    """
+    Grid cells that may contain points within radius_km of the coordinate
+
+    Returns None when the area is too large for the index to help, in which
+    case callers should fall back to scanning every job. Boxes crossing the
+    antimeridian wrap onto the columns on the other side.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+
+    min_row = math.floor(min_lat / CELL_SIZE_DEGREES)
+    max_row = math.floor(max_lat / CELL_SIZE_DEGREES)
+    min_col = math.floor(min_lng / CELL_SIZE_DEGREES)
+    max_col = math.floor(max_lng / CELL_SIZE_DEGREES)
+
+    cols = sorted({_wrap_column(col) for col in range(min_col, min(max_col, min_col + CELL_COLUMNS - 1) + 1)})
+    if (max_row - min_row + 1) * len(cols) > MAX_QUERY_CELLS:
+        return None
+
+    return [
+        f"{row}:{col}"
+        for row in range(min_row, max_row + 1)
+        for col in cols
+    ]
+
+
+def haversine_km(loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
+    """Great-circle distance between two (lat, lng) pairs in kilometers"""
+    lat1, lng1, lat2, lng2 = map(math.radians, [loc1[0], loc1[1], loc2[0], loc2[1]])
+
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+
+    return c * EARTH_RADIUS_KM
@@ -0,0 +1,61 @@
+"""
+Per-job scoring features derived from the job text
+Computed once in Job.save() so recommendation requests don't re-parse
+title/description/requirements on every call.
+"""
+import re
+from typing import Iterable, List, Optional
+
+# Common blue-collar skills
+SKILL_KEYWORDS = [
+    'plumber', 'plumbing', 'electrician', 'electrical', 'painter', 'painting',
+    'carpenter', 'carpentry', 'welder', 'welding', 'mason', 'masonry',
+    'construction', 'building', 'repair', 'maintenance', 'installation',
+    'hvac', 'roofing', 'flooring', 'tiling', 'drywall', 'concrete',
+    'landscaping', 'gardening', 'cleaning', 'housekeeping', 'cooking',
+    'driving', 'delivery', 'security', 'guard', 'helper', 'assistant'
+]
+
+# Bit position of each keyword in a skill bitmask
+SKILL_BITS = {skill: 1 << i for i, skill in enumerate(SKILL_KEYWORDS)}
+
+EXPERIENCE_PATTERN = re.compile(r'(\d+)\s*(?:year|yr)')
+
+
+def extract_skills(text: str) -> List[str]:
+    """Skill keywords mentioned in a piece of job text"""
+    text_lower = text.lower()
+    return [skill for skill in SKILL_KEYWORDS if skill in text_lower]
+
+
+def skill_mask(skills: Iterable[str]) -> int:
+    """Bitmask of the SKILL_KEYWORDS present in skills (expects lowercase)"""
+    mask = 0
+    for skill in skills:
+        mask |= SKILL_BITS.get(skill, 0)
+    return mask
+
+
+def skills_from_mask(mask: int) -> List[str]:
+    """Inverse of skill_mask"""
+    return [skill for skill, bit in SKILL_BITS.items() if mask & bit]
+
+
+def parse_required_experience(description: str, requirements: Optional[str]) -> int:
+    """Years of experience a job asks for, defaulting to 2"""
+    job_text = f"{description} {requirements or ''}".lower()
+
+    # Look for experience keywords
+    if 'fresher' in job_text or 'beginner' in job_text or 'entry level' in job_text:
+        return 0
+    elif 'experienced' in job_text or 'senior' in job_text:
+        return 5
+
+    # Extract numbers followed by 'year' or 'years'
+    exp_matches = EXPERIENCE_PATTERN.findall(job_text)
+    return int(exp_matches[0]) if exp_matches else 2
+
+
+def job_skill_mask(title: str, description: str, requirements: Optional[str]) -> int:
+    """Skill bitmask for a job's title, description and requirements"""
+    return skill_mask(extract_skills(f"{title} {description} {requirements or ''}"))
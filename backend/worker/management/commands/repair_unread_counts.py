@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from services.notification_service import notification_service
+
+
+class Command(BaseCommand):
+    help = "Recount users' unread notifications and fix counters that drifted (run periodically)"
+
+    def handle(self, *args, **options):
+        repaired = notification_service.repair_unread_counts()
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} unread notification counters"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from services.notification_service import DAILY_ALERT_CHUNK_SIZE, notification_service
+
+
+class Command(BaseCommand):
+    help = "Send today's job alert digest to verified users who haven't had one yet (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DAILY_ALERT_CHUNK_SIZE,
+                            help='users fetched, scored and written per chunk')
+
+    def handle(self, *args, **options):
+        def report(stats):
+            self.stdout.write(f"{stats['users']} users, {stats['alerted']} alerts sent "
+                              f"({stats['users_per_second']:.0f} users/s)")
+
+        stats = notification_service.send_daily_job_alerts(chunk_size=options['chunk_size'], progress=report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {stats['seconds']:.1f}s: {stats['alerted']} alerts sent, "
+            f"{stats['already_alerted']} already alerted today, {stats['no_matches']} without matching jobs, "
+            f"{stats['failed']} failed"
+        ))
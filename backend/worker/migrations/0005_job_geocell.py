@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:13
+
+from django.db import migrations, models
+
+from worker.geo import cell_for
+
+
+def populate_geo_cells(apps, schema_editor):
+    Job = apps.get_model("worker", "Job")
+    jobs = []
+    for job in Job.objects.exclude(latitude__isnull=True).exclude(longitude__isnull=True).iterator():
+        job.geoCell = cell_for(job.latitude, job.longitude)
+        jobs.append(job)
+    Job.objects.bulk_update(jobs, ["geoCell"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("worker", "0004_job_duration_days_job_employer_rating_job_jobtype_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="geoCell",
+            field=models.CharField(blank=True, db_index=True, max_length=32, null=True),
+        ),
+        migrations.RunPython(populate_geo_cells, migrations.RunPython.noop),
+    ]
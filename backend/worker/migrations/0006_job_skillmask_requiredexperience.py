@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:31
+
+from django.db import migrations, models
+
+from worker.job_features import job_skill_mask, parse_required_experience
+
+
+def populate_job_features(apps, schema_editor):
+    Job = apps.get_model("worker", "Job")
+    jobs = []
+    for job in Job.objects.iterator():
+        job.skillMask = job_skill_mask(job.title, job.description, job.requirements)
+        job.requiredExperience = parse_required_experience(job.description, job.requirements)
+        jobs.append(job)
+    Job.objects.bulk_update(jobs, ["skillMask", "requiredExperience"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("worker", "0005_job_geocell"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="requiredExperience",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="skillMask",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_job_features, migrations.RunPython.noop),
+    ]
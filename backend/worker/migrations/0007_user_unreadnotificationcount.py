@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_unread_counts(apps, schema_editor):
+    User = apps.get_model("worker", "User")
+    Notification = apps.get_model("worker", "Notification")
+    unread = (
+        Notification.objects.filter(user=OuterRef("pk"), isRead=False)
+        .values("user")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    User.objects.update(unreadNotificationCount=Coalesce(Subquery(unread), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("worker", "0006_job_skillmask_requiredexperience"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="unreadNotificationCount",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_unread_counts, migrations.RunPython.noop),
+    ]
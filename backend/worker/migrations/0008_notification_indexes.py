@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("worker", "0007_user_unreadnotificationcount"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["user", "-createdAt", "-id"], name="notification_user_created"),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["user", "isRead", "-createdAt", "-id"], name="notification_user_unread"),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_unread_counts(apps, schema_editor):
+    User = apps.get_model("worker", "User")
+    UnreadNotificationCount = apps.get_model("worker", "UnreadNotificationCount")
+    UnreadNotificationCount.objects.bulk_create(
+        (UnreadNotificationCount(user_id=uid, count=count)
+         for uid, count in User.objects.exclude(unreadNotificationCount=0).values_list("uid", "unreadNotificationCount")),
+        batch_size=1000,
+    )
+
+
+def restore_unread_counts(apps, schema_editor):
+    User = apps.get_model("worker", "User")
+    UnreadNotificationCount = apps.get_model("worker", "UnreadNotificationCount")
+    for user_id, count in UnreadNotificationCount.objects.values_list("user_id", "count"):
+        User.objects.filter(uid=user_id).update(unreadNotificationCount=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("worker", "0008_notification_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnreadNotificationCount",
+            fields=[
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="unread_notifications", serialize=False, to="worker.user")),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(copy_unread_counts, restore_unread_counts),
+        migrations.RemoveField(
+            model_name="user",
+            name="unreadNotificationCount",
+        ),
+    ]
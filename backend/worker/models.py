@@ -1,5 +1,7 @@
 from django.db import models
 from decimal import Decimal
+from .geo import cell_for
+from .job_features import job_skill_mask, parse_required_experience
 
 class User(models.Model):
     uid = models.CharField(max_length=128, unique=True, primary_key=True)
@@ -67,12 +69,43 @@ class Job(models.Model):
     # Location coordinates for distance-based matching
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    # Spatial index cell derived from latitude/longitude on save (see worker.geo)
+    geoCell = models.CharField(max_length=32, blank=True, null=True, db_index=True)
 
     # Additional job metadata
     duration_days = models.IntegerField(default=1)
     urgency = models.CharField(max_length=20, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], default='medium')
     employer_rating = models.FloatField(default=4.0)
 
+    # Scoring features precomputed from the job text on save (see worker.job_features).
+    # Null when a row was written without save(), e.g. by bulk_create.
+    skillMask = models.BigIntegerField(null=True, blank=True)
+    requiredExperience = models.IntegerField(null=True, blank=True)
+
+    # Derived columns recomputed on save, keyed by the fields they are computed from.
+    # queryset.update() skips save(), so it leaves them stale for the rows it changes;
+    # update through save() instead when any source field changes.
+    DERIVED_FIELDS = {
+        'geoCell': {'latitude', 'longitude'},
+        'skillMask': {'title', 'description', 'requirements'},
+        'requiredExperience': {'description', 'requirements'},
+    }
+
+    def save(self, *args, **kwargs):
+        # Keep the spatial index cell in sync with the coordinates
+        self.geoCell = cell_for(self.latitude, self.longitude)
+        # Parse the text once here instead of on every recommendation request
+        self.skillMask = job_skill_mask(self.title, self.description, self.requirements)
+        self.requiredExperience = parse_required_experience(self.description, self.requirements)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            kwargs['update_fields'] = update_fields | {
+                derived for derived, sources in self.DERIVED_FIELDS.items() if update_fields & sources
+            }
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
@@ -157,6 +190,24 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-createdAt']
+        indexes = [
+            # A user's notifications newest first, and the keyset pagination tie-break on id
+            models.Index(fields=['user', '-createdAt', '-id'], name='notification_user_created'),
+            # The same for unread_only listings
+            models.Index(fields=['user', 'isRead', '-createdAt', '-id'], name='notification_user_unread'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user.name}"
+
+class UnreadNotificationCount(models.Model):
+    """
+    A user's unread notification count, so the badge poll is a single-row read
+
+    Kept in step by NotificationService with F() updates and reconciled by the
+    repair_unread_counts command. It lives outside User so that saving a user
+    never writes back a stale count over concurrent updates. Rows are created
+    on a user's first counter update; no row means zero.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_notifications')
+    count = models.IntegerField(default=0)
@@ -0,0 +1,57 @@
+"""
+Content-hash cache for OCR results
+Re-uploads of the same photo (e.g. after a name mismatch) reuse the extracted
+text and ID fields instead of re-running preprocessing and EasyOCR. Entries are
+keyed by a SHA-256 of the image bytes and the pipeline version, and hold only
+the OCR output, never the image itself.
+"""
+import hashlib
+import threading
+from typing import Dict, Optional
+
+from django.core.cache import caches
+
+# Bump whenever preprocessing, OCR or field extraction changes, so results
+# produced by an older pipeline are never served again
+AADHAAR_PIPELINE_VERSION = 'aadhaar-ocr-4'
+
+
+class OcrResultCache:
+    """OCR output by image content hash, on the "ocr_results" cache alias (TTL and size bounded)"""
+
+    def __init__(self, alias: str = 'ocr_results'):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def image_key(self, image_bytes: bytes, pipeline_version: str = AADHAAR_PIPELINE_VERSION) -> str:
+        """Cache key for an uploaded image under a given pipeline version"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return f"ocr:{pipeline_version}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        result = self.cache.get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def set(self, key: str, result: Dict):
+        """Store OCR output (extracted text and fields only)"""
+        self.cache.set(key, result)
+
+    def stats(self) -> Dict:
+        """Hit and miss counters for this process"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+# Global instance
+ocr_result_cache = OcrResultCache()
@@ -2,17 +2,188 @@
 AI/ML Recommendation Service
 Integrates with the bluecollar_recommender AIML system
 """
-import pandas as pd
 import numpy as np
+import threading
+import time
+from scipy.sparse import vstack
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from services.ranking import top_k_indices
 from .models import Job, User
 import os
 from django.conf import settings
 
+
+# Variable-width strings: dtype=str pads every element to the longest one
+TEXT_DTYPE = np.dtypes.StringDType()
+
+
+def _job_text(title, description, location):
+    """Text the TF-IDF model indexes for a job"""
+    return f"{title} {description} {location}"
+
+
+def load_job_columns(jobs):
+    """
+    Column arrays for a Job queryset, read with a single values_list() query
+
+    Returns a dict of equal-length NumPy arrays: id, pincode ('' when missing),
+    payPerDay (0 when missing) and text_content (title, description and location).
+    """
+    return job_columns_from_rows(jobs.values_list('id', 'title', 'description', 'location', 'pincode', 'payPerDay'))
+
+
+def job_columns_from_rows(rows):
+    """Build the load_job_columns arrays from (id, title, description, location, pincode, payPerDay) rows"""
+    rows = list(rows)
+    ids, titles, descriptions, locations, pincodes, pays = zip(*rows) if rows else ((),) * 6
+
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'pincode': np.array([pincode or '' for pincode in pincodes], dtype=TEXT_DTYPE),
+        'payPerDay': np.array([pay or 0 for pay in pays], dtype=np.float64),  # No pay scores as 0
+        'text_content': np.array([_job_text(*fields) for fields in zip(titles, descriptions, locations)],
+                                 dtype=TEXT_DTYPE),
+    }
+
+
+def jobs_in_order(job_ids):
+    """Fetch jobs with one in_bulk() query, keeping the order of job_ids"""
+    jobs_by_id = Job.objects.in_bulk(job_ids)
+    return [jobs_by_id[job_id] for job_id in job_ids if job_id in jobs_by_id]
+
+
+def _same_area(job_pincodes, worker_pincode):
+    """Mask of jobs whose pincode starts with the worker's 3-digit pincode prefix"""
+    if not worker_pincode:
+        return np.zeros(len(job_pincodes), dtype=bool)
+    return (job_pincodes != '') & np.char.startswith(job_pincodes, worker_pincode[:3])
+
+
+def _add_job_type_boost(scores, job_texts, job_types, boost):
+    """Add boost to scores once for every worker job type mentioned in the job text"""
+    if job_types:
+        job_texts_lower = np.char.lower(job_texts)
+        for job_type in job_types:
+            scores += boost * (np.char.find(job_texts_lower, job_type.lower()) >= 0)
+    return scores
+
+
+def _ranked_ids(job_ids, scores, limit=None):
+    """Top job ids by descending score; ties keep their original order"""
+    order = top_k_indices(scores, limit)
+    return [int(job_id) for job_id in job_ids[order]]
+
+
+class JobTfidfIndex:
+    """
+    Long-lived TF-IDF matrix over the open jobs
+
+    Fitted once and then kept current from Job save/delete signals, queued when
+    the write commits so rolled-back writes never reach it: newly opened
+    jobs are transformed with the existing vocabulary and appended, closed or
+    deleted jobs are dropped. The vocabulary and IDF weights are refitted from
+    scratch after refit_after incremental changes, or after max_age_seconds so
+    writes made by other processes are picked up.
+    """
+
+    def __init__(self, max_features=1000, refit_after=200, max_age_seconds=300):
+        self.max_features = max_features
+        self.refit_after = refit_after
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._pending = {}  # job id -> (text, pincode) to upsert, or None to remove
+        self._snapshot = None
+        self._fitted_at = 0.0
+        self._changes_since_fit = 0
+
+    def job_saved(self, job):
+        """Queue an update for a saved job; applied on the next lookup"""
+        with self._lock:
+            if job.status == 'open':
+                self._pending[job.id] = (_job_text(job.title, job.description, job.location), job.pincode or '')
+            else:
+                self._pending[job.id] = None
+
+    def job_removed(self, job_id):
+        """Queue removal of a deleted job"""
+        with self._lock:
+            self._pending[job_id] = None
+
+    def invalidate(self):
+        """Force a full refit on the next lookup"""
+        with self._lock:
+            self._snapshot = None
+
+    def snapshot(self):
+        """
+        Current (vectorizer, matrix, job_ids, texts, pincodes), or None if no jobs are open
+
+        The returned objects are never mutated, so callers can use them without the lock.
+        """
+        with self._lock:
+            expired = time.monotonic() - self._fitted_at > self.max_age_seconds
+            if self._snapshot is None or expired or self._changes_since_fit + len(self._pending) > self.refit_after:
+                self._fit()
+            elif self._pending:
+                self._apply_pending()
+            return self._snapshot or None
+
+    def _fit(self):
+        jobs = load_job_columns(Job.objects.filter(status='open'))
+
+        self._pending = {}
+        self._changes_since_fit = 0
+        self._fitted_at = time.monotonic()
+
+        if not len(jobs['id']):
+            self._snapshot = ()
+            return
+
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=self.max_features)
+        matrix = vectorizer.fit_transform(jobs['text_content']).tocsr()
+        self._snapshot = (vectorizer, matrix, jobs['id'], jobs['text_content'], jobs['pincode'])
+
+    def _apply_pending(self):
+        if not self._snapshot:
+            # Nothing fitted yet to extend; start over from the database
+            self._fit()
+            return
+
+        vectorizer, matrix, job_ids, texts, pincodes = self._snapshot
+        keep = ~np.isin(job_ids, list(self._pending))
+        new_ids = [job_id for job_id, value in self._pending.items() if value is not None]
+        new_texts = [self._pending[job_id][0] for job_id in new_ids]
+        new_pincodes = [self._pending[job_id][1] for job_id in new_ids]
+
+        matrix = matrix[keep]
+        if new_ids:
+            matrix = vstack([matrix, vectorizer.transform(new_texts)]).tocsr()
+
+        self._changes_since_fit += len(self._pending)
+        self._pending = {}
+        self._snapshot = self._make_snapshot(
+            vectorizer,
+            matrix,
+            list(job_ids[keep]) + new_ids,
+            list(texts[keep]) + new_texts,
+            list(pincodes[keep]) + new_pincodes,
+        )
+
+    def _make_snapshot(self, vectorizer, matrix, job_ids, texts, pincodes):
+        if not job_ids:
+            return ()
+        return (
+            vectorizer,
+            matrix,
+            np.array(job_ids, dtype=np.int64),
+            np.array(texts, dtype=TEXT_DTYPE),
+            np.array(pincodes, dtype=TEXT_DTYPE),
+        )
+
+
 class JobRecommendationService:
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+        self.job_index = JobTfidfIndex()
         
     def get_job_recommendations(self, worker, limit=10):
         """
@@ -25,49 +196,25 @@ class JobRecommendationService:
             if not all_jobs.exists():
                 return []
             
-            # Convert jobs to DataFrame for ML processing
-            jobs_df = self._jobs_to_dataframe(all_jobs)
-            
             # Get worker profile for matching
             worker_profile = self._get_worker_profile(worker)
             
             # Calculate recommendations based on worker type
             if worker.userType == 'skilled':
-                recommendations = self._get_skilled_recommendations(worker_profile, jobs_df)
+                # Skilled matching reads the persistent TF-IDF index, not the job table
+                recommendations = self._get_skilled_recommendations(worker_profile, limit=limit)
             else:
-                recommendations = self._get_daily_recommendations(worker_profile, jobs_df)
+                job_columns = load_job_columns(all_jobs)
+                recommendations = self._get_daily_recommendations(worker_profile, job_columns, limit)
             
-            # Convert back to Job objects
-            recommended_jobs = []
-            for job_id in recommendations[:limit]:
-                try:
-                    job = Job.objects.get(id=job_id)
-                    recommended_jobs.append(job)
-                except Job.DoesNotExist:
-                    continue
-                    
-            return recommended_jobs
+            # Convert back to Job objects in a single query
+            return jobs_in_order(recommendations[:limit])
             
         except Exception as e:
             print(f"Recommendation error: {e}")
             # Fallback to simple location-based recommendations
             return self._get_fallback_recommendations(worker, limit)
     
-    def _jobs_to_dataframe(self, jobs):
-        """Convert Django Job queryset to pandas DataFrame"""
-        data = []
-        for job in jobs:
-            data.append({
-                'id': job.id,
-                'title': job.title,
-                'description': job.description,
-                'location': job.location,
-                'pincode': job.pincode,
-                'payPerDay': float(job.payPerDay),
-                'text_content': f"{job.title} {job.description} {job.location}"
-            })
-        return pd.DataFrame(data)
-    
     def _get_worker_profile(self, worker):
         """Extract worker profile for matching"""
         job_types = worker.JobTypes if worker.JobTypes else []
@@ -82,106 +229,67 @@ class JobRecommendationService:
             'text_content': f"{worker.name} {job_types_str} {worker.userType}"
         }
     
-    def _get_skilled_recommendations(self, worker_profile, jobs_df):
+    def _get_skilled_recommendations(self, worker_profile, job_columns=None, limit=None):
         """Get recommendations for skilled workers using ML"""
         try:
-            # Create text corpus for similarity calculation
-            job_texts = jobs_df['text_content'].tolist()
-            worker_text = worker_profile['text_content']
-            
-            # Add worker profile to corpus
-            all_texts = [worker_text] + job_texts
-            
-            # Calculate TF-IDF vectors
-            tfidf_matrix = self.vectorizer.fit_transform(all_texts)
-            
-            # Calculate cosine similarity between worker and jobs
-            worker_vector = tfidf_matrix[0:1]  # First row is worker
-            job_vectors = tfidf_matrix[1:]     # Rest are jobs
+            index = self.job_index.snapshot()
+            if index is None:
+                return []
+            vectorizer, job_vectors, job_ids, job_texts, job_pincodes = index
             
-            similarities = cosine_similarity(worker_vector, job_vectors).flatten()
+            # Only the worker's text is vectorized per request. TF-IDF rows are
+            # L2-normalized, so one sparse mat-vec product gives cosine similarity.
+            worker_vector = vectorizer.transform([worker_profile['text_content']])
+            similarities = np.asarray((job_vectors @ worker_vector.T).todense()).ravel()
             
-            # Get job indices sorted by similarity
-            job_indices = np.argsort(similarities)[::-1]
+            # Boost score for matching job types
+            scores = _add_job_type_boost(similarities.copy(), job_texts, worker_profile['jobTypes'], 0.3)
             
-            # Apply additional filters
-            filtered_recommendations = []
-            for idx in job_indices:
-                job_row = jobs_df.iloc[idx]
-                score = similarities[idx]
-                
-                # Boost score for matching job types
-                if worker_profile['jobTypes']:
-                    for job_type in worker_profile['jobTypes']:
-                        if job_type.lower() in job_row['text_content'].lower():
-                            score += 0.3
-                
-                # Boost score for nearby locations (same pincode prefix)
-                if (worker_profile['pincode'] and job_row['pincode'] and 
-                    job_row['pincode'].startswith(worker_profile['pincode'][:3])):
-                    score += 0.2
-                
-                filtered_recommendations.append((job_row['id'], score))
+            # Boost score for nearby locations (same pincode prefix)
+            scores += 0.2 * _same_area(job_pincodes, worker_profile['pincode'])
             
-            # Sort by final score and return job IDs
-            filtered_recommendations.sort(key=lambda x: x[1], reverse=True)
-            return [job_id for job_id, score in filtered_recommendations]
+            # Select the top scores and return job IDs
+            return _ranked_ids(job_ids, scores, limit)
             
         except Exception as e:
             print(f"Skilled recommendation error: {e}")
-            return self._get_simple_recommendations(worker_profile, jobs_df)
+            if job_columns is None:
+                job_columns = load_job_columns(Job.objects.filter(status='open'))
+            return self._get_simple_recommendations(worker_profile, job_columns, limit)
     
-    def _get_daily_recommendations(self, worker_profile, jobs_df):
+    def _get_daily_recommendations(self, worker_profile, job_columns, limit=None):
         """Get recommendations for daily workers"""
         try:
-            # For daily workers, prioritize location and basic job matching
-            recommendations = []
+            # For daily workers, prioritize location and basic job matching.
+            # Every term is computed for all jobs at once, in the same order as
+            # the original per-row formula so the scores are identical.
             
-            for _, job_row in jobs_df.iterrows():
-                score = 0.0
-                
-                # Location matching (highest priority for daily workers)
-                if (worker_profile['pincode'] and job_row['pincode'] and 
-                    job_row['pincode'].startswith(worker_profile['pincode'][:3])):
-                    score += 0.5
-                
-                # Job type matching
-                if worker_profile['jobTypes']:
-                    for job_type in worker_profile['jobTypes']:
-                        if job_type.lower() in job_row['text_content'].lower():
-                            score += 0.3
-                
-                # Pay rate consideration (higher pay = higher score)
-                normalized_pay = min(job_row['payPerDay'] / 2000.0, 1.0)  # Normalize to 0-1
-                score += normalized_pay * 0.2
-                
-                recommendations.append((job_row['id'], score))
+            # Location matching (highest priority for daily workers)
+            scores = np.where(_same_area(job_columns['pincode'], worker_profile['pincode']), 0.5, 0.0)
             
-            # Sort by score and return job IDs
-            recommendations.sort(key=lambda x: x[1], reverse=True)
-            return [job_id for job_id, score in recommendations]
+            # Job type matching
+            scores = _add_job_type_boost(scores, job_columns['text_content'], worker_profile['jobTypes'], 0.3)
+            
+            # Pay rate consideration (higher pay = higher score)
+            normalized_pay = np.minimum(job_columns['payPerDay'] / 2000.0, 1.0)  # Normalize to 0-1
+            scores += normalized_pay * 0.2
+            
+            # Select the top scores and return job IDs
+            return _ranked_ids(job_columns['id'], scores, limit)
             
         except Exception as e:
             print(f"Daily recommendation error: {e}")
-            return self._get_simple_recommendations(worker_profile, jobs_df)
+            return self._get_simple_recommendations(worker_profile, job_columns, limit)
     
-    def _get_simple_recommendations(self, worker_profile, jobs_df):
+    def _get_simple_recommendations(self, worker_profile, job_columns, limit=None):
         """Simple fallback recommendations"""
         # Just return jobs sorted by pay rate and location proximity
-        recommendations = []
+        scores = job_columns['payPerDay'] / 1000.0  # Simple pay-based scoring
         
-        for _, job_row in jobs_df.iterrows():
-            score = job_row['payPerDay'] / 1000.0  # Simple pay-based scoring
-            
-            # Boost local jobs
-            if (worker_profile['pincode'] and job_row['pincode'] and 
-                job_row['pincode'].startswith(worker_profile['pincode'][:3])):
-                score += 500
-                
-            recommendations.append((job_row['id'], score))
+        # Boost local jobs
+        scores += 500 * _same_area(job_columns['pincode'], worker_profile['pincode'])
         
-        recommendations.sort(key=lambda x: x[1], reverse=True)
-        return [job_id for job_id, score in recommendations]
+        return _ranked_ids(job_columns['id'], scores, limit)
     
     def _get_fallback_recommendations(self, worker, limit):
         """Ultimate fallback - just return recent jobs"""
@@ -0,0 +1,62 @@
+import copy
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from services.notification_service import notification_service
+from services.recommendation_cache import recommendation_cache
+from services.worker_match_index import worker_match_index
+from .models import Job, User, WorkHistory
+from .recommendation_service import recommendation_service
+
+
+@receiver(post_save, sender=Job)
+def update_job_index_on_save(sender, instance, **kwargs):
+    """Keep the TF-IDF job index in step with jobs opening, closing or changing, once committed"""
+    job = copy.copy(instance)  # As saved, even if the instance is changed again before commit
+    transaction.on_commit(lambda: recommendation_service.job_index.job_saved(job))
+
+
+@receiver(post_delete, sender=Job)
+def update_job_index_on_delete(sender, instance, **kwargs):
+    job_id = instance.id  # Cleared on the instance once the delete finishes
+    transaction.on_commit(lambda: recommendation_service.job_index.job_removed(job_id))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_recommendations_on_job_change(sender, instance, **kwargs):
+    """Any job write can change every user's recommendations"""
+    recommendation_cache.invalidate_jobs()
+
+
+@receiver(post_save, sender=Job)
+def notify_matching_workers_on_create(sender, instance, created, **kwargs):
+    """Queue the job-match fan-out for a new job once it is committed; it runs off the request thread"""
+    if created:
+        job_id = instance.id
+        transaction.on_commit(lambda: notification_service.enqueue_job_match_fanout(job_id))
+
+
+@receiver(post_save, sender=User)
+def update_worker_match_index_on_save(sender, instance, **kwargs):
+    worker_match_index.user_saved(instance)
+
+
+@receiver(post_delete, sender=User)
+def update_worker_match_index_on_delete(sender, instance, **kwargs):
+    worker_match_index.user_removed(instance.uid)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_recommendations_on_user_change(sender, instance, **kwargs):
+    recommendation_cache.invalidate_user(instance.uid)
+
+
+@receiver(post_save, sender=WorkHistory)
+@receiver(post_delete, sender=WorkHistory)
+def invalidate_recommendations_on_work_history_change(sender, instance, **kwargs):
+    """Jobs in a user's work history are excluded from their recommendations"""
+    recommendation_cache.invalidate_user(instance.user_id)
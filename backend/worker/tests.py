@@ -1,3 +1,1436 @@
-from django.test import TestCase
+import asyncio
+import json
+import math
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from services import aadhaar_verification_service as code_scanning
+from services.job_recommendation_service import JobRecommendationEngine
+from services import notification_pubsub
+from services.notification_pubsub import get_broker
+from services.notification_service import DAILY_ALERT_TITLE, notification_service
+from services.ranking import top_k, top_k_indices
+from services.recommendation_cache import recommendation_cache
+from services import worker_match_index as worker_match_index_module
+from services.worker_match_index import worker_match_index
+from . import aadhaar_verification, geo, views
+from .models import User, Job, Notification, UnreadNotificationCount, WorkHistory
+from .ocr_cache import ocr_result_cache
+from .recommendation_service import (
+    TEXT_DTYPE, JobTfidfIndex, _add_job_type_boost, _same_area, job_columns_from_rows, recommendation_service,
+)
+from .uploads import open_upload_buffer, upload_temp_path, upload_to_ndarray
+from .verification_jobs import VerificationJobs
+# The OCR package is on sys.path once aadhaar_verification is imported
+from ocr import batching, fields as ocr_fields, processor as ocr_processor
+from utils import instrumentation
+from utils.preprocessing import PreprocessingPipeline
+
+
+def make_job(**fields):
+    defaults = {
+        'title': 'Helper',
+        'description': 'General helper work',
+        'payPerDay': 500,
+        'location': 'Pune',
+        'pincode': '411001',
+        'contractorContact': '9999999999',
+    }
+    defaults.update(fields)
+    return Job.objects.create(**defaults)
+
+
+class GeoIndexTests(TestCase):
+    """Grid cells cover every point in the radius and wrap at the antimeridian"""
+
+    def test_cell_boundaries(self):
+        self.assertEqual(geo.cell_for(18.52, 73.85), '74:295')
+        self.assertEqual(geo.cell_for(18.5, 73.75), '74:295')  # Lower edges belong to the cell
+        self.assertEqual(geo.cell_for(18.4999, 73.7499), '73:294')
+        self.assertEqual(geo.cell_for(-0.1, -0.1), '-1:-1')
+        self.assertEqual(geo.cell_for(10.0, 180.0), geo.cell_for(10.0, -180.0))
+        self.assertIsNone(geo.cell_for(None, 73.85))
+
+    def test_cells_cover_radius(self):
+        cells = set(geo.cells_within(18.52, 73.85, 50))
+        for bearing in range(0, 360, 15):
+            dlat = 49 / 111.0 * math.cos(math.radians(bearing))
+            dlng = 49 / (111.0 * math.cos(math.radians(18.52))) * math.sin(math.radians(bearing))
+            self.assertIn(geo.cell_for(18.52 + dlat, 73.85 + dlng), cells)
+
+    def test_cells_wrap_at_antimeridian(self):
+        cells = geo.cells_within(-17.7, 179.9, 30)
+        self.assertIn(geo.cell_for(-17.7, 179.9), cells)
+        self.assertIn(geo.cell_for(-17.7, -179.9), cells)
+        self.assertEqual(len(cells), len(set(cells)))
+
+    def test_large_area_falls_back_to_full_scan(self):
+        self.assertIsNotNone(geo.cells_within(18.52, 73.85, 50))
+        self.assertIsNone(geo.cells_within(18.52, 73.85, 2000))
+        self.assertIsNone(geo.cells_within(89.9, 0.0, 50))  # Polar cap spans every column
+
+    def test_cell_lookup_matches_distance_filter(self):
+        near = make_job(latitude=18.60, longitude=73.90)
+        far = make_job(latitude=19.50, longitude=73.90)
+        make_job()  # No location
+        cells = geo.cells_within(18.52, 73.85, 50)
+        self.assertEqual(set(Job.objects.filter(geoCell__in=cells).values_list('id', flat=True)), {near.id})
+        self.assertGreater(geo.haversine_km((18.52, 73.85), (far.latitude, far.longitude)), 50)
+
+
+class JobFeatureTests(TestCase):
+
+    def test_features_are_computed_on_save(self):
+        job = make_job(title='Plumber', description='Bathroom plumbing repair, 4 years', requirements='Own tools')
+        engine = JobRecommendationEngine()
+        self.assertEqual(sorted(engine._extract_skills_from_text('Plumber Bathroom plumbing repair')),
+                         sorted(['plumber', 'plumbing', 'repair']))
+        self.assertEqual(job.skillMask, engine._skill_mask(['plumber', 'plumbing', 'repair']))
+        self.assertEqual(job.requiredExperience, 4)
+
+        job.description = 'Senior plumber'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual(job.requiredExperience, 5)
+
+    def test_update_fields_include_derived_columns(self):
+        job = make_job(title='Plumber', description='Plumbing work', latitude=18.52, longitude=73.85)
+
+        job.latitude, job.longitude = 28.61, 77.21
+        job.save(update_fields=['latitude', 'longitude'])
+        job.description = 'Painting walls, 3 years'
+        job.save(update_fields=['description'])
+        job.refresh_from_db()
+
+        self.assertEqual(job.geoCell, geo.cell_for(28.61, 77.21))
+        self.assertEqual(job.requiredExperience, 3)
+        self.assertEqual(job.skillMask, JobRecommendationEngine()._skill_mask(['plumber', 'painting']))
+
+
+class TopKTests(TestCase):
+    """Top-k selection matches a stable full sort, including ties"""
+
+    def test_top_k_matches_stable_sort(self):
+        rng = np.random.default_rng(3)
+        for n in (0, 1, 7, 500):
+            scores = rng.integers(0, 5, n) / 4.0  # plenty of ties
+            for k in (None, 0, 1, 3, 10, n, n + 2):
+                with self.subTest(n=n, k=k):
+                    expected = np.argsort(-scores, kind='stable')[:k]
+                    self.assertEqual(top_k_indices(scores, k).tolist(), expected.tolist())
+
+                    items = [{'id': i, 'score': score} for i, score in enumerate(scores)]
+                    expected_items = sorted(items, key=lambda x: x['score'], reverse=True)[:k]
+                    self.assertEqual(top_k(items, k, key=lambda x: x['score']), expected_items)
+
+
+class JobTfidfIndexTests(TestCase):
+    """Incremental index updates match a fresh fit's rows, and only committed writes reach the index"""
+
+    def setUp(self):
+        self.jobs = [
+            make_job(title='Plumber', description='Bathroom plumbing repair'),
+            make_job(title='Painter', description='Interior wall painting'),
+            make_job(title='Electrician', description='House wiring and fittings'),
+        ]
+        self.index = JobTfidfIndex(refit_after=5)
+
+    def rows(self, snapshot):
+        return {int(job_id): row for job_id, row in zip(snapshot[2], snapshot[1].toarray())}
+
+    def test_empty_index(self):
+        Job.objects.all().delete()
+        self.assertIsNone(self.index.snapshot())
+
+        job = make_job(title='Mason', description='Brick work')
+        self.index.job_saved(job)
+        self.assertEqual(list(self.index.snapshot()[2]), [job.id])
+
+    def test_edited_job_replaces_its_row(self):
+        vectorizer = self.index.snapshot()[0]
+        plumber, painter, electrician = self.jobs
+        painter.description = 'Exterior wall painting and plumbing'
+        painter.save()
+        self.index.job_saved(painter)
+
+        snapshot = self.index.snapshot()
+        self.assertIs(snapshot[0], vectorizer)  # Applied incrementally, not refitted
+        self.assertEqual(list(snapshot[2]), [plumber.id, electrician.id, painter.id])
+        self.assertEqual(snapshot[1].shape[0], 3)
+        self.assertEqual(snapshot[3][-1], 'Painter Exterior wall painting and plumbing Pune')
+        rows = self.rows(snapshot)
+        np.testing.assert_allclose(rows[painter.id], vectorizer.transform([snapshot[3][-1]]).toarray()[0])
+        np.testing.assert_allclose(rows[plumber.id], vectorizer.transform([snapshot[3][0]]).toarray()[0])
+
+    def test_snapshot_strings_are_not_padded(self):
+        self.index.snapshot()
+        self.index.job_saved(make_job(title='Cook', description='x' * 20000))
+
+        snapshot = self.index.snapshot()
+        self.assertEqual((snapshot[3].dtype, snapshot[4].dtype), (TEXT_DTYPE, TEXT_DTYPE))
+        self.assertLess(snapshot[3].nbytes, 20000)
+        self.assertEqual(snapshot[3][0], 'Plumber Bathroom plumbing repair Pune')
+
+    def test_closed_and_deleted_jobs_drop_out(self):
+        self.index.snapshot()
+        plumber, painter, electrician = self.jobs
+        painter.status = 'closed'
+        self.index.job_saved(painter)
+        self.index.job_removed(electrician.id)
+
+        snapshot = self.index.snapshot()
+        self.assertEqual(list(snapshot[2]), [plumber.id])
+        self.assertEqual(snapshot[1].shape[0], 1)
+
+        plumber.status = 'closed'
+        self.index.job_saved(plumber)
+        self.assertIsNone(self.index.snapshot())
+
+    def test_refit_after_changes(self):
+        vectorizer = self.index.snapshot()[0]
+        self.assertNotIn('carpentry', vectorizer.vocabulary_)
+        for i in range(6):
+            self.index.job_saved(make_job(title='Carpenter', description=f'Carpentry work {i}'))
+
+        snapshot = self.index.snapshot()
+        self.assertIsNot(snapshot[0], vectorizer)
+        self.assertIn('carpentry', snapshot[0].vocabulary_)
+        self.assertEqual(len(snapshot[2]), 9)
+
+    @override_settings(JOB_MATCH_FANOUT_WORKERS=0)
+    def test_only_committed_writes_are_indexed(self):
+        job_index = recommendation_service.job_index
+        job_index.invalidate()
+        job_index.snapshot()
+        plumber_id, painter_id, electrician_id = (job.id for job in self.jobs)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    rolled_back = make_job(title='Welder', description='Gate welding')
+                    self.jobs[0].delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            committed = make_job(title='Welder', description='Grill welding')
+            self.jobs[1].delete()
+
+        snapshot = job_index.snapshot()
+        texts = dict(zip(snapshot[2], snapshot[3]))
+        self.assertEqual(set(texts), {plumber_id, electrician_id, committed.id})
+        self.assertNotIn(rolled_back.description, ' '.join(texts.values()))
+
+
+def per_row_daily_scores(rows, profile):
+    """The per-row daily scorer the column-wise scores replaced"""
+    scores = []
+    for job_id, title, description, location, pincode, pay in rows:
+        text = f"{title} {description} {location}"
+        score = 0.0
+        if profile['pincode'] and pincode and pincode.startswith(profile['pincode'][:3]):
+            score += 0.5
+        for job_type in profile['jobTypes']:
+            if job_type.lower() in text.lower():
+                score += 0.3
+        score += min(float(pay or 0) / 2000.0, 1.0) * 0.2
+        scores.append((job_id, score))
+    return scores
+
+
+def per_row_simple_scores(rows, profile):
+    """The per-row fallback scorer the column-wise scores replaced"""
+    scores = []
+    for job_id, title, description, location, pincode, pay in rows:
+        score = float(pay or 0) / 1000.0
+        if profile['pincode'] and pincode and pincode.startswith(profile['pincode'][:3]):
+            score += 500
+        scores.append((job_id, score))
+    return scores
+
+
+def ranked(scores):
+    return [job_id for job_id, score in sorted(scores, key=lambda item: item[1], reverse=True)]
+
+
+class ColumnScoringTests(TestCase):
+    """Column-wise daily and fallback scores equal the per-row formulas they replaced"""
+
+    ROWS = [
+        (1, 'Plumbing helper', 'Bathroom work', 'Pune', '411001', Decimal('800')),
+        (2, 'CONSTRUCTION site', 'daily work', 'Pune', '411046', Decimal('2500')),
+        (3, 'Painter', 'Interior painting, plumbing too', 'Mumbai', '400001', Decimal('1200')),
+        (4, 'Helper', 'Cleaning', 'Pune', '', Decimal('800')),
+        (5, 'Helper', 'Cleaning', 'Pune', None, Decimal('800')),
+        (6, 'Construction helper', 'No pay listed', 'Pune', '411002', None),
+        (7, 'Mason', 'Construction and plumbing', 'Nagpur', '41', Decimal('0')),
+        (8, 'Plumbing helper', 'Bathroom work', 'Pune', '411001', Decimal('800')),
+    ]
+    PROFILES = [
+        {'pincode': '411046', 'jobTypes': ['plumbing', 'Construction']},
+        {'pincode': '', 'jobTypes': ['PLUMBING']},
+        {'pincode': '41', 'jobTypes': []},
+        {'pincode': '4', 'jobTypes': ['construction', 'construction']},
+        {'pincode': None, 'jobTypes': ['painting']},
+    ]
+
+    def test_scores_match_per_row_formula(self):
+        columns = job_columns_from_rows(self.ROWS)
+        for profile in self.PROFILES:
+            with self.subTest(profile=profile):
+                daily = np.where(_same_area(columns['pincode'], profile['pincode']), 0.5, 0.0)
+                daily = _add_job_type_boost(daily, columns['text_content'], profile['jobTypes'], 0.3)
+                daily += np.minimum(columns['payPerDay'] / 2000.0, 1.0) * 0.2
+                self.assertEqual(list(zip(columns['id'].tolist(), daily.tolist())),
+                                 per_row_daily_scores(self.ROWS, profile))
+
+    def test_rankings_match_per_row_formula(self):
+        for profile in self.PROFILES:
+            with self.subTest(profile=profile):
+                self.assertEqual(
+                    recommendation_service._get_daily_recommendations(profile, job_columns_from_rows(self.ROWS)),
+                    ranked(per_row_daily_scores(self.ROWS, profile)))
+                self.assertEqual(
+                    recommendation_service._get_simple_recommendations(profile, job_columns_from_rows(self.ROWS)),
+                    ranked(per_row_simple_scores(self.ROWS, profile)))
+
+    def test_long_description_does_not_pad_the_others(self):
+        rows = self.ROWS + [(9, 'Cook', 'x' * 20000, 'Pune', '411001', Decimal('900'))]
+        columns = job_columns_from_rows(rows)
+        self.assertEqual(columns['text_content'].dtype, TEXT_DTYPE)
+        self.assertLess(columns['text_content'].nbytes, 20000)  # Fixed width would be 9 x 20k chars x 4 bytes
+        self.assertEqual(columns['text_content'][0], 'Plumbing helper Bathroom work Pune')
+        self.assertEqual(recommendation_service._get_daily_recommendations(self.PROFILES[0], columns),
+                         ranked(per_row_daily_scores(rows, self.PROFILES[0])))
+
+    def test_empty_job_list(self):
+        columns = job_columns_from_rows([])
+        self.assertEqual(recommendation_service._get_daily_recommendations(self.PROFILES[0], columns), [])
+        self.assertEqual(recommendation_service._get_simple_recommendations(self.PROFILES[0], columns), [])
+
+
+class BatchScoringTests(TestCase):
+    """The NumPy scoring path must rank exactly like the per-job scorer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create(
+                uid='skilled', phoneNumber='1', skills=['Plumbing', 'welding', 'plumbing', 'driving'],
+                JobTypes=['Plumbing', 'repair'], experienceYears=3, averageRating=4.2,
+                isVerified=True, latitude=18.52, longitude=73.85,
+            ),
+            User.objects.create(uid='beginner', phoneNumber='2', skills=[], JobTypes=[], averageRating=0.0),
+            User.objects.create(
+                uid='senior', phoneNumber='3', skills=['construction', 'mason', 'carpentry'],
+                JobTypes=['construction'], experienceYears=12, verificationLevel='premium', averageRating=4.8,
+            ),
+        ]
+        make_job(title='Plumber needed', description='Fix plumbing, 3 years experience', jobType='plumbing',
+                 latitude=18.53, longitude=73.86)
+        make_job(title='Welder', description='Senior welding work', jobType='Welding', requirements='experienced')
+        make_job(title='Construction helper', description='Fresher construction helper', jobType='construction work',
+                 latitude=18.60, longitude=73.90)
+        make_job(title='Mason', description='Masonry and concrete, 10 yrs', jobType='construction')
+        make_job(title='Far away repair job', description='Electrical repair', jobType='repair',
+                 latitude=28.61, longitude=77.20)
+        make_job(title='Cook', description='Cooking for events', jobType=None)
+        make_job(title='Duplicate plumber', description='Fix plumbing, 3 years experience', jobType='plumbing')
+        make_job(title='Closed job', description='plumbing', status='closed')
+
+    def test_batch_ranking_matches_per_job_scoring(self):
+        batch_engine = JobRecommendationEngine()
+        scalar_engine = JobRecommendationEngine()
+        scalar_engine.batch_scoring = False
+        batch_engine.use_cache = scalar_engine.use_cache = False
+
+        for user in self.users:
+            with self.subTest(user=user.uid):
+                batch = batch_engine.get_recommendations(user.uid, limit=20)
+                scalar = scalar_engine.get_recommendations(user.uid, limit=20)
+                self.assertTrue(batch)
+                self.assertEqual(batch, scalar)
+
+    def test_bulk_matches_single_user_recommendations(self):
+        engine = JobRecommendationEngine()
+        engine.use_cache = False
+        WorkHistory.objects.create(user=self.users[0], job=Job.objects.get(title='Duplicate plumber'),
+                                   startDate='2026-01-01', endDate='2026-01-02', earnings=500)
+        user_ids = [user.uid for user in self.users] + ['missing']
+
+        expected = {user_id: engine.get_recommendations(user_id, max_distance_km=20, limit=4) for user_id in user_ids}
+        for chunk_size in (None, 1, 2):
+            with self.subTest(chunk_size=chunk_size):
+                bulk = engine.get_recommendations_bulk(user_ids, max_distance_km=20, limit=4, chunk_size=chunk_size)
+                self.assertEqual(bulk, expected)
+        self.assertNotIn('Duplicate plumber', [job['title'] for job in expected['skilled']])
+
+    def test_prefilter_reduces_rows_without_changing_results(self):
+        engine = JobRecommendationEngine()
+        engine.use_cache = False
+        scalar_engine = JobRecommendationEngine()
+        scalar_engine.use_cache = False
+        scalar_engine.batch_scoring = False
+
+        recommendations = engine.get_recommendations('skilled', max_distance_km=20, limit=20)
+        self.assertEqual(recommendations, scalar_engine.get_recommendations('skilled', max_distance_km=20, limit=20))
+        stats = engine.row_stats()
+        # The far-away job is dropped by the bounding box in SQL, never fetched
+        self.assertEqual(stats['rows_fetched'], 6)
+        self.assertEqual(stats['rows_returned'], len(recommendations))
+
+        engine.prefilter_job_types = True
+        relevant = engine.get_recommendations('senior', limit=20)
+        self.assertEqual({job['title'] for job in relevant}, {'Construction helper', 'Mason'})
+
+    def test_prefilter_keeps_every_job_with_a_type_or_skill_score(self):
+        User.objects.create(uid='handyman', phoneNumber='4', skills=['welding'], JobTypes=['Plumbing and repair work'],
+                            experienceYears=3)
+        make_job(title='Helper', description='General work', jobType='')
+        engine = JobRecommendationEngine()
+        engine.use_cache = False
+        prefiltering_engine = JobRecommendationEngine()
+        prefiltering_engine.use_cache = False
+        prefiltering_engine.prefilter_job_types = True
+
+        for user in User.objects.filter(uid__in=['skilled', 'senior', 'handyman']):
+            with self.subTest(user=user.uid):
+                jobs = Job.objects.in_bulk()
+                expected = [
+                    job for job in engine.get_recommendations(user.uid, limit=20)
+                    if engine._calculate_job_type_score(user.JobTypes, jobs[job['id']].jobType)
+                    or engine._calculate_skill_score(user.skills, jobs[job['id']])
+                ]
+                self.assertEqual(prefiltering_engine.get_recommendations(user.uid, limit=20), expected)
+
+        # Reverse containment: 'plumbing' and 'repair' are part of the handyman's job type
+        titles = {job['title'] for job in prefiltering_engine.get_recommendations('handyman', limit=20)}
+        self.assertEqual(titles, {'Plumber needed', 'Duplicate plumber', 'Far away repair job', 'Welder'})
+
+    def test_batch_scores_are_bit_identical(self):
+        engine = JobRecommendationEngine()
+        jobs = Job.objects.filter(status__in=['open', 'active'])
+
+        for user in self.users:
+            with self.subTest(user=user.uid):
+                expected = [(job.id, engine._calculate_job_score(user, job)) for job in jobs]
+                expected.sort(key=lambda x: x[1], reverse=True)
+                batch = engine._score_jobs_batch(user, jobs, None, 50.0)
+                self.assertEqual([(item['job'].id, item['score']) for item in batch], expected)
+
+
+class RecommendationCacheTests(TestCase):
+    """Cached results are reused until a user or job write invalidates them"""
+
+    def setUp(self):
+        caches['recommendations'].clear()
+        recommendation_cache.reset_stats()
+        self.engine = JobRecommendationEngine()
+        self.user = User.objects.create(uid='cached', phoneNumber='1', skills=['plumbing'], JobTypes=['plumbing'])
+        self.job = make_job(title='Plumber', description='plumbing work', jobType='plumbing')
+
+    def test_hits_and_invalidation(self):
+        first = self.engine.get_recommendations(self.user.uid)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.engine.get_recommendations(self.user.uid), first)
+        self.assertEqual(recommendation_cache.stats()['hits'], 1)
+        self.assertEqual(recommendation_cache.stats()['misses'], 1)
+
+        # Different parameters are cached separately
+        self.engine.get_recommendations(self.user.uid, limit=1)
+        self.assertEqual(recommendation_cache.stats()['misses'], 2)
+
+        self.job.title = 'Senior plumber'
+        self.job.save()
+        self.assertEqual(self.engine.get_recommendations(self.user.uid)[0]['title'], 'Senior plumber')
+
+        self.user.skills = []
+        self.user.JobTypes = []
+        self.user.save()
+        self.assertNotEqual(self.engine.get_recommendations(self.user.uid), first)
+        self.assertEqual(recommendation_cache.stats()['misses'], 4)
+
+
+class RecommendationQueryCountTests(TestCase):
+    """A recommendation response costs a constant number of queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.worker = User.objects.create(
+            uid='worker', phoneNumber='1', userType='daily', pinCode='411046',
+            skills=['plumbing'], JobTypes=['plumbing'],
+        )
+
+    def add_jobs(self, count):
+        for i in range(count):
+            make_job(title=f'Plumbing job {i}', description='plumbing work', jobType='plumbing')
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return len(context.captured_queries)
+
+    def test_recommendation_view_query_count(self):
+        url = f'/api/jobs/recommendations/{self.worker.uid}/'
+
+        self.add_jobs(3)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.data['total_recommendations'], 3)
+
+        self.add_jobs(9)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.data['total_recommendations'], 10)
+
+    def test_service_recommendations_do_not_query_per_job(self):
+        self.add_jobs(3)
+        few = self.count_queries(lambda: recommendation_service.get_job_recommendations(self.worker))
+        self.add_jobs(9)
+        many = self.count_queries(lambda: recommendation_service.get_job_recommendations(self.worker))
+        self.assertEqual(few, many)
+
+
+class DailyJobAlertTests(TestCase):
+    """The nightly digest run is set-based and sends at most one alert per user per day"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            User.objects.create(uid=f'worker-{i}', phoneNumber=str(i), isVerified=True,
+                                skills=['plumbing'], JobTypes=['plumbing'])
+        User.objects.create(uid='cook', phoneNumber='5', isVerified=True, skills=['cooking'])
+        User.objects.create(uid='unverified', phoneNumber='6', skills=['plumbing'])
+        for i in range(3):
+            make_job(title=f'Plumbing job {i}', description='plumbing work', jobType='plumbing')
+        Notification.objects.create(user_id='worker-0', title=DAILY_ALERT_TITLE, message='Sent earlier',
+                                    type='job_match')
+
+    def test_alerts_are_sent_once_in_chunks(self):
+        # Alerted users + open jobs + the empty page after the last full one, then per chunk of 3: the
+        # page of user ids, users, work history, jobs, and a savepoint around the insert and the counter
+        # rows' insert and update
+        with self.assertNumQueries(3 + 2 * 9):
+            stats = notification_service.send_daily_job_alerts(chunk_size=3)
+
+        self.assertEqual({key: stats[key] for key in ('users', 'alerted', 'already_alerted', 'no_matches', 'failed')},
+                         {'users': 6, 'alerted': 5, 'already_alerted': 1, 'no_matches': 0, 'failed': 0})
+        alerts = Notification.objects.filter(title=DAILY_ALERT_TITLE)
+        self.assertEqual(sorted(alerts.values_list('user_id', flat=True)),
+                         ['cook', 'worker-0', 'worker-1', 'worker-2', 'worker-3', 'worker-4'])
+        self.assertEqual(alerts.get(user_id='worker-1').message,
+                         'Found 3 new jobs for you: Plumbing job 0, Plumbing job 1 and 1 more')
+
+        rerun = notification_service.send_daily_job_alerts(chunk_size=3)
+        self.assertEqual((rerun['alerted'], rerun['already_alerted']), (0, 6))
+
+    def test_each_page_is_read_before_its_writes(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = notification_service.send_daily_job_alerts(chunk_size=4)
+
+        user_queries = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if sql.startswith('SELECT "worker_user"."uid" AS "uid" FROM "worker_user"'):
+                user_queries.append('page')
+            elif sql.startswith('UPDATE "worker_unreadnotificationcount"'):
+                user_queries.append('write')
+        # Short last page: no extra empty read
+        self.assertEqual(user_queries, ['page', 'write', 'page', 'write'])
+        self.assertEqual(stats['users'], 6)
+
+
+@override_settings(JOB_MATCH_FANOUT_WORKERS=0)
+class JobMatchFanoutTests(TestCase):
+    """A new job notifies the verified workers it suits, found through the worker match index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        plumber = {'skills': ['plumbing'], 'JobTypes': ['plumbing'], 'experienceYears': 2, 'isVerified': True,
+                   'averageRating': 4.6}
+        User.objects.create(uid='near', phoneNumber='1', latitude=18.52, longitude=73.85, **plumber)
+        User.objects.create(uid='no-location', phoneNumber='2', **plumber)
+        User.objects.create(uid='far', phoneNumber='3', latitude=28.61, longitude=77.20, **plumber)
+        User.objects.create(uid='weak', phoneNumber='4', skills=['plumbing', 'cooking', 'driving', 'painting'])
+        User.objects.create(uid='cook', phoneNumber='5', skills=['cooking'], JobTypes=['catering'])
+
+    def setUp(self):
+        worker_match_index.invalidate()
+
+    def post_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_job(title='Plumber needed', description='Fix plumbing, 2 years', jobType='plumbing',
+                            latitude=18.53, longitude=73.86)
+
+    def test_new_job_notifies_matching_workers_once(self):
+        job = self.post_job()
+        notified = Notification.objects.filter(job=job, type='job_match')
+        self.assertEqual(sorted(notified.values_list('user_id', flat=True)), ['near', 'no-location'])
+        self.assertEqual(notified.first().actionUrl, f'/jobs/{job.id}')
+
+        # Index already built: candidate users and recent notifications, nothing new to insert
+        with self.assertNumQueries(2):
+            stats = notification_service.notify_matching_workers(job)
+        self.assertEqual(stats, {'candidates': 2, 'matched': 2, 'already_notified': 2, 'notified': 0})
+
+    def test_only_verified_workers_are_candidates(self):
+        job = Job(title='Plumbing work', description='', jobType='plumbing')
+        self.assertEqual(worker_match_index.candidates(job), {'near', 'no-location', 'far'})
+
+        weak = User.objects.get(uid='weak')
+        weak.isVerified = True
+        weak.save()
+        self.assertIn('weak', worker_match_index.candidates(job))
+        User.objects.filter(uid='weak').update(isVerified=False)  # No signal: picked up on rebuild
+        worker_match_index.invalidate()
+        self.assertNotIn('weak', worker_match_index.candidates(job))
+
+    @override_settings(JOB_MATCH_FANOUT_WORKERS=1)
+    def test_request_thread_only_enqueues(self):
+        executor = mock.Mock()
+        with mock.patch.object(notification_service, '_get_fanout_executor', return_value=executor), \
+                mock.patch.object(worker_match_index, '_ensure_built') as ensure_built:
+            job = self.post_job()
+
+        executor.submit.assert_called_once_with(notification_service._fanout_in_worker, job.id)
+        ensure_built.assert_not_called()
+        self.assertFalse(Notification.objects.filter(job=job).exists())
+
+        # What the pool thread then runs
+        notification_service._run_job_match_fanout(job.id)
+        self.assertEqual(Notification.objects.filter(job=job).count(), 2)
+
+    def test_rebuild_runs_outside_the_lock(self):
+        job = Job(title='Plumbing work', description='', jobType='plumbing')
+        worker_match_index.candidates(job)
+        cook = User.objects.get(uid='cook')
+        cook.skills, cook.isVerified = ['plumbing'], True
+        real_add = worker_match_index_module._Postings.add
+
+        def add_while_user_changes(postings, uid, *args):
+            if uid != 'cook':  # Read by the scan (the cook's save is applied under the lock)
+                self.assertFalse(worker_match_index._lock.locked())
+            if uid == 'near':
+                cook.save()  # Saved mid-rebuild, after the scan read the cook's old row
+            real_add(postings, uid, *args)
+
+        worker_match_index.invalidate()
+        with mock.patch.object(worker_match_index_module._Postings, 'add', add_while_user_changes):
+            self.assertIn('cook', worker_match_index.candidates(job))
+        self.assertIn('cook', worker_match_index.candidates(job))
+
+    def test_stale_index_answers_during_rebuild(self):
+        job = Job(title='Plumbing work', description='', jobType='plumbing')
+        before = worker_match_index.candidates(job)
+        worker_match_index.invalidate()
+        with worker_match_index._build_lock:  # Another thread is rebuilding
+            with self.assertNumQueries(0):
+                self.assertEqual(worker_match_index.candidates(job), before)
+
+    def test_index_follows_user_changes(self):
+        self.assertEqual(worker_match_index.candidates(Job(title='Plumbing work', description='', jobType='plumbing')),
+                         {'near', 'no-location', 'far'})
+        cook = User.objects.get(uid='cook')
+        cook.skills, cook.JobTypes, cook.experienceYears = ['plumbing'], ['plumbing'], 2
+        cook.isVerified, cook.averageRating = True, 4.6
+        cook.save()
+        User.objects.filter(uid='far').delete()
+
+        job = self.post_job()
+        self.assertEqual(sorted(Notification.objects.filter(job=job).values_list('user_id', flat=True)),
+                         ['cook', 'near', 'no-location'])
+
+
+class UnreadCountTests(TestCase):
+    """The unread badge count is a counter row kept in step with notification writes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(uid='worker', phoneNumber='1')
+        self.url = f'/api/users/{self.user.uid}/notifications/'
+
+    def unread_count(self):
+        return self.client.get(self.url).data['unread_count']
+
+    def test_counter_follows_create_and_mark_read(self):
+        stale_user = User.objects.get(uid='worker')
+        rating = notification_service.create_rating_notification('worker', 5)
+        notification_service.create_payment_notification('worker', 500, 'Plumbing')
+        notification_service.create_welcome_notifications('worker')
+
+        # Notification list and the counter row; no COUNT(*) and no User lookups
+        with self.assertNumQueries(2):
+            self.assertEqual(self.unread_count(), 4)
+
+        stale_user.name = 'Ravi'
+        stale_user.save()  # Must not write back its stale counter
+        self.assertEqual(self.unread_count(), 4)
+
+        self.assertTrue(notification_service.mark_notification_read(rating.id, 'worker'))
+        self.assertTrue(notification_service.mark_notification_read(rating.id, 'worker'))
+        self.assertFalse(notification_service.mark_notification_read(rating.id, 'someone-else'))
+        self.assertEqual(self.unread_count(), 3)
+
+        self.assertTrue(notification_service.mark_all_notifications_read('worker'))
+        self.assertFalse(notification_service.mark_all_notifications_read('missing'))
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_user_save_never_writes_the_counter(self):
+        stale_user = User.objects.get(uid='worker')
+        notification_service.create_rating_notification('worker', 5)
+
+        stale_user.name = 'Ravi'
+        with CaptureQueriesContext(connection) as queries:
+            stale_user.save()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('unread', queries.captured_queries[0]['sql'].lower())
+        self.assertEqual(User.objects.get(uid='worker').name, 'Ravi')
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_counter_row_created_on_first_update(self):
+        User.objects.create(uid='newcomer', phoneNumber='2')
+        self.assertFalse(UnreadNotificationCount.objects.filter(user_id='newcomer').exists())
+        self.assertEqual(notification_service.get_unread_count('newcomer'), 0)
+
+        notification_service.create_rating_notification('newcomer', 4)
+        notification_service.create_rating_notification('newcomer', 5)
+        self.assertEqual(UnreadNotificationCount.objects.get(user_id='newcomer').count, 2)
+
+    def test_repair_fixes_drifted_counters(self):
+        notification_service.create_rating_notification('worker', 3)
+        UnreadNotificationCount.objects.filter(user_id='worker').update(count=7)
+        self.assertEqual(notification_service.repair_unread_counts(), 1)
+        self.assertEqual(self.unread_count(), 1)
+        self.assertEqual(notification_service.repair_unread_counts(), 0)
+
+    def test_repair_creates_missing_counter_rows(self):
+        Notification.objects.create(user_id='worker', title='Written directly', message='...')
+        self.assertEqual(notification_service.repair_unread_counts(), 1)
+        self.assertEqual(self.unread_count(), 1)
+
+
+class NotificationPaginationTests(TestCase):
+    """Keyset pagination walks every notification once, at a constant query count per page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(uid='worker', phoneNumber='1')
+        other = User.objects.create(uid='other', phoneNumber='2')
+        job = make_job()
+        Notification.objects.bulk_create(
+            [Notification(user=user, title=f'Alert {i}', message='...', isRead=i % 3 == 0, job=job if i % 2 else None)
+             for i in range(45)] +
+            [Notification(user=other, title='Not yours', message='...') for _ in range(5)]
+        )
+        # Several notifications share a timestamp, so pages must break ties on id
+        Notification.objects.filter(id__in=Notification.objects.order_by('id').values('id')[10:20]).update(
+            createdAt=Notification.objects.order_by('id')[10].createdAt)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = '/api/users/worker/notifications/'
+
+    def walk(self, **params):
+        seen, cursor = [], None
+        while True:
+            # Page of notifications (job_id read from the row) and the unread counter, at any depth
+            with self.assertNumQueries(2):
+                response = self.client.get(self.url, {'limit': 10, **params, **({'cursor': cursor} if cursor else {})})
+            seen += [item['id'] for item in response.data['notifications']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_notification_once(self):
+        mine = Notification.objects.filter(user_id='worker').order_by('-createdAt', '-id')
+        self.assertEqual(self.walk(), list(mine.values_list('id', flat=True)))
+        self.assertEqual(self.walk(unread_only='true'), list(mine.filter(isRead=False).values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+
+class NotificationStreamTests(TestCase):
+    """New notifications are published on commit and pushed to open event streams"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(uid='worker', phoneNumber='1')
+        cls.seen = Notification.objects.create(user=cls.user, title='Seen', message='...')
+        cls.missed = Notification.objects.create(user=cls.user, title='Missed', message='...')
+
+    def test_notifications_are_published_after_commit(self):
+        with mock.patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                rating = notification_service.create_rating_notification('worker', 5)
+                publish.assert_not_called()
+        publish.assert_called_once_with('worker', mock.ANY)
+        self.assertEqual(publish.call_args[0][1]['id'], rating.id)
+
+    async def test_stream_replays_missed_and_pushes_new(self):
+        response = await self.async_client.get('/api/users/worker/notifications/stream/',
+                                                headers={'Last-Event-ID': str(self.seen.id)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b'retry: 3000\n\n')
+        self.assertIn(f'id: {self.missed.id}\n'.encode(), await anext(events))
+
+        next_event = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)  # Let the stream wait on its subscription
+        get_broker().publish('worker', {'id': self.missed.id, 'title': 'Replayed already'})
+        get_broker().publish('worker', {'id': self.missed.id + 1, 'title': 'Fresh'})
+        event = (await asyncio.wait_for(next_event, 5)).decode()
+        self.assertTrue(event.startswith(f'event: notification\nid: {self.missed.id + 1}\n'))
+        self.assertIn('"title": "Fresh"', event)
+
+        # A client disconnect cancels the response task, which must unsubscribe
+        next_event = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        next_event.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await next_event
+        self.assertEqual(get_broker().stats()['subscribers'], 0)
+
+    async def test_replay_pages_through_the_whole_backlog(self):
+        backlog = [(await Notification.objects.acreate(user=self.user, title=f'Missed {i}', message='...')).id
+                   for i in range(4)]
+        with mock.patch.object(views, 'NOTIFICATION_STREAM_REPLAY_PAGE', 2):
+            response = await self.async_client.get('/api/users/worker/notifications/stream/',
+                                                    headers={'Last-Event-ID': str(self.seen.id)})
+            events = aiter(response.streaming_content)
+            await anext(events)
+            replayed = [await asyncio.wait_for(anext(events), 5) for _ in range(5)]
+            await events.aclose()
+        self.assertEqual([int(re.search(rb'id: (\d+)', event)[1]) for event in replayed], [self.missed.id] + backlog)
+
+    async def open_stream(self):
+        """A new client's event stream, past the retry line"""
+        response = await self.async_client.get('/api/users/worker/notifications/stream/')
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b'retry: 3000\n\n')
+        return events
+
+    async def test_dropped_events_are_replayed(self):
+        waiting = asyncio.Event()
+        real_get = notification_pubsub.Subscription.get
+
+        async def get(subscription, timeout=None):
+            waiting.set()
+            return await real_get(subscription, timeout)
+
+        with mock.patch.object(notification_pubsub, 'SUBSCRIBER_QUEUE_SIZE', 1), \
+                mock.patch.object(notification_pubsub.Subscription, 'get', get):
+            events = await self.open_stream()
+            next_event = asyncio.ensure_future(anext(events))
+            await asyncio.wait_for(waiting.wait(), 5)  # Past the initial replay, waiting for live events
+            first = await Notification.objects.acreate(user=self.user, title='First', message='...')
+            second = await Notification.objects.acreate(user=self.user, title='Second', message='...')
+            get_broker().publish('worker', {'id': first.id, 'title': 'First'})
+            get_broker().publish('worker', {'id': second.id, 'title': 'Second'})  # Pushes out the first
+            received = [await asyncio.wait_for(next_event, 5), await asyncio.wait_for(anext(events), 5)]
+            await events.aclose()
+        self.assertIn(f'id: {second.id}\n'.encode(), received[0])
+        self.assertIn(f'id: {first.id}\n'.encode(), received[1])  # From the database
+
+    async def test_other_processes_notifications_arrive_at_the_heartbeat(self):
+        with mock.patch.object(views, 'NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 0.01):
+            events = await self.open_stream()
+            self.assertEqual(await asyncio.wait_for(anext(events), 5), b': keep-alive\n\n')
+            # Created without publishing, as another process's broker would
+            elsewhere = await Notification.objects.acreate(user=self.user, title='Elsewhere', message='...')
+            received = b''
+            while b'event: notification' not in received:
+                received = await asyncio.wait_for(anext(events), 5)
+            await events.aclose()
+        self.assertIn(f'id: {elsewhere.id}\n'.encode(), received)
+
+    async def test_notification_created_while_subscribing_is_sent(self):
+        broker = get_broker()
+        real_subscribe = broker.subscribe
+        created = []
+
+        async def subscribe(user_id):
+            # Committed after the new client's starting point was read, before the subscription exists
+            created.append(await Notification.objects.acreate(user=self.user, title='Racing', message='...'))
+            return await real_subscribe(user_id)
+
+        with mock.patch.object(broker, 'subscribe', subscribe):
+            events = await self.open_stream()
+            event = await asyncio.wait_for(anext(events), 5)
+            await events.aclose()
+        self.assertIn(f'id: {created[0].id}\n'.encode(), event)
+
+    async def test_unknown_user(self):
+        response = await self.async_client.get('/api/users/missing/notifications/stream/')
+        self.assertEqual(response.status_code, 404)
+
+
+def box(x1, y1, x2, y2):
+    """EasyOCR-style four-corner bounding box"""
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+class FakeRegionReader:
+    """Returns the given detailed results for the full card and records every readtext call"""
+
+    def __init__(self, results, region_text=('REREAD',)):
+        self.results = results
+        self.region_text = list(region_text)
+        self.calls = []
+
+    def readtext(self, image, detail=1, **kwargs):
+        self.calls.append((image.shape, detail))
+        return self.results if detail else self.region_text
+
+
+class OcrRegionAssignmentTests(TestCase):
+    """One full-card read, split into regions by box centre; only low-confidence regions are re-read"""
+
+    # 1000x600 card: name_area (0, 180, 700, 420), number_area (0, 360, 1000, 600)
+    CARD = np.full((600, 1000), 255, dtype=np.uint8)
+
+    def setUp(self):
+        self.regions = ocr_processor.detect_aadhaar_regions(self.CARD)
+
+    def test_boxes_assigned_by_centre(self):
+        results = [
+            (box(50, 20, 400, 60), 'GOVERNMENT OF INDIA', 0.9),  # Header: full card only
+            (box(50, 200, 300, 240), 'Ravi Kumar', 0.95),  # Name area only
+            (box(600, 250, 800, 290), 'DOB 01/01/1990', 0.9),  # Straddles x=700, centre on the edge
+            (box(620, 300, 820, 340), 'Male', 0.9),  # Straddles x=700, centre beyond it
+            (box(100, 370, 400, 410), 'Father Name', 0.9),  # Name and number areas overlap here
+            (box(300, 500, 700, 560), '2345 6789 0123', 0.8),  # Number area only
+            (box(10, 10, 20, 20), 'x', 0.9),  # Too short to keep
+        ]
+        assigned = ocr_processor.assign_text_to_regions(results, self.regions)
+
+        self.assertEqual([text for text, _ in assigned['name_area']], ['Ravi Kumar', 'DOB 01/01/1990', 'Father Name'])
+        self.assertEqual([text for text, _ in assigned['number_area']], ['Father Name', '2345 6789 0123'])
+        self.assertEqual(len(assigned['full_card']), 6)
+        self.assertEqual(assigned['number_area'][1], ('2345 6789 0123', 0.8))
+
+    def extract(self, results):
+        reader = FakeRegionReader(results)
+        with mock.patch.object(ocr_processor, 'get_reader', return_value=reader):
+            text = ocr_processor.extract_text_from_image(self.CARD, preprocessed=True)
+        return set(text.split('\n')), reader.calls
+
+    def test_clean_card_is_read_once(self):
+        lines, calls = self.extract([
+            (box(50, 200, 300, 240), 'Ravi Kumar', ocr_processor.LOW_CONFIDENCE_THRESHOLD),
+            (box(300, 500, 700, 560), '2345 6789 0123', 0.9),
+        ])
+        self.assertEqual(calls, [((600, 1000), 1)])
+        self.assertEqual(lines, {'Ravi Kumar', '2345 6789 0123'})
+
+    def test_low_confidence_region_is_reread(self):
+        lines, calls = self.extract([
+            (box(50, 20, 400, 60), 'G0VT 0F lNDIA', 0.1),  # Low, but outside both regions
+            (box(50, 200, 300, 240), 'Ravi Kumar', 0.9),
+            (box(300, 500, 700, 560), '2345 6789 O123', 0.3),
+        ])
+        self.assertEqual(calls, [((600, 1000), 1), ((240, 1000), 0)])  # Full card, then the number area crop
+        self.assertEqual(lines, {'G0VT 0F lNDIA', 'Ravi Kumar', '2345 6789 O123', 'REREAD'})
+
+    def test_both_regions_reread(self):
+        _, calls = self.extract([
+            (box(100, 370, 400, 410), 'Rav1 Kumar', 0.2),  # In both regions
+        ])
+        self.assertEqual(calls, [((600, 1000), 1), ((240, 700), 0), ((240, 1000), 0)])
+
+
+class FakeBatchReader:
+    """Detects the dark pixels of each image as one box, labelled with their value"""
+
+    def __init__(self):
+        self.batches = []
+
+    def detect(self, image, detail=1, **kwargs):
+        if isinstance(image, str):
+            raise FileNotFoundError(image)
+        gray = image if image.ndim == 2 else image[..., 0]
+        ys, xs = np.nonzero(gray < batching.PAD_VALUE)
+        text = str(int(gray[ys[0], xs[0]]))
+        if not detail:
+            return [text]
+        return [(box(int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())), text, 0.9)]
+
+    def readtext(self, image, **kwargs):
+        self.batches.append(1)
+        return self.detect(image, **kwargs)
+
+    def readtext_batched(self, images, n_width=None, n_height=None, **kwargs):
+        self.batches.append(len(images))
+        for image in images:
+            assert image.shape[:2] == (n_height, n_width)
+        return [self.detect(image, **kwargs) for image in images]
+
+
+class OcrBatcherTests(TestCase):
+    """Concurrent requests of similar size and the same options share one batched call"""
+
+    def setUp(self):
+        self.reader = FakeBatchReader()
+        self.batcher = batching.OcrBatcher(self.reader, max_batch_size=16, window_ms=200)
+
+    def card(self, height, width, value, top=10, left=20, channels=None):
+        image = np.full((height, width) + ((channels,) if channels else ()), 255, dtype=np.uint8)
+        image[top:top + 30, left:left + 100] = value
+        return image
+
+    def test_each_future_gets_its_own_result(self):
+        images = [self.card(600, 1000, 10), self.card(580, 990, 20, top=500, left=850), self.card(620, 1010, 30)]
+        futures = [self.batcher.submit(image, detail=1) for image in images]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(self.reader.batches, [3])
+        self.assertEqual([result[0][1] for result in results], ['10', '20', '30'])
+        # Boxes found on the padded batch keep each image's own coordinates
+        self.assertEqual(results[1], self.reader.detect(images[1]))
+        self.assertEqual(results[1][0][0], box(850, 500, 949, 529))
+
+    def test_incompatible_requests_are_not_merged(self):
+        futures = [
+            self.batcher.submit(self.card(600, 1000, 10), detail=1),
+            self.batcher.submit(self.card(600, 1000, 20), detail=0),  # Other options
+            self.batcher.submit(self.card(600, 1000, 30, channels=3), detail=1),  # Other layout
+            self.batcher.submit(self.card(3000, 4000, 40), detail=1),  # Other size
+            self.batcher.submit(self.card(610, 1020, 50), detail=1),  # Same bucket as the first
+        ]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(sorted(self.reader.batches), [1, 1, 1, 2])
+        self.assertEqual(results[1], ['20'])
+        self.assertEqual([result[0][1] for result in results[2:]], ['30', '40', '50'])
+
+    def test_failed_request_does_not_fail_others(self):
+        futures = [self.batcher.submit('missing.png'), self.batcher.submit(self.card(600, 1000, 10))]
+        with self.assertRaises(FileNotFoundError):
+            futures[0].result(timeout=5)
+        self.assertEqual(futures[1].result(timeout=5)[0][1], '10')
+
+
+def synthetic_card(height, width, seed=0):
+    """BGR card photo: orange header, dark text lines and sensor noise on an off-white background"""
+    rng = np.random.default_rng(seed)
+    card = np.full((height, width, 3), (225, 235, 240), dtype=np.uint8)
+    card[:height // 6] = (40, 140, 250)
+    scale = width / 1000
+    for row, text in enumerate(['GOVERNMENT OF INDIA', 'Ravi Kumar', 'DOB: 01/01/1990', '2345 6789 0123']):
+        cv2.putText(card, text, (int(60 * scale), int(height * (0.3 + 0.17 * row))),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2 * scale, (20, 20, 20), max(1, int(2 * scale)))
+    noise = rng.normal(0, 6, card.shape)
+    return np.clip(card + noise, 0, 255).astype(np.uint8)
+
+
+class PreprocessingPipelineTests(TestCase):
+    """The fused pipeline binarizes at the target size and keeps no state between calls"""
+
+    def test_binary_image_at_target_size(self):
+        image, report = PreprocessingPipeline().run(synthetic_card(950, 1500))
+
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertEqual(image.shape, (760, 1200))
+        self.assertTrue(set(np.unique(image)) <= {0, 255})
+        self.assertGreater((image == 0).sum(), 1000)  # The text survived
+        self.assertEqual(list(report['timings_ms']), ['decode', 'resize', 'quality', 'clahe', 'bilateral',
+                                                      'enhance_text', 'threshold', 'morphology'])
+        self.assertTrue(all(ms >= 0 for ms in report['timings_ms'].values()))
+
+    def test_small_photos_are_upscaled_and_bytes_decode(self):
+        content = cv2.imencode('.png', synthetic_card(300, 480))[1].tobytes()
+        image, report = PreprocessingPipeline().run(memoryview(content))
+        self.assertEqual(image.shape, (500, 800))
+        self.assertIn('quality_ok', report)
+
+    def test_no_state_leaks_between_calls(self):
+        small, large = synthetic_card(500, 900, seed=1), synthetic_card(1800, 2800, seed=2)
+        expected_small = PreprocessingPipeline().run(small)[0]
+        expected_large = PreprocessingPipeline().run(large)[0]
+
+        pipeline = PreprocessingPipeline()
+        first_large = pipeline.run(large)[0]
+        first_small = pipeline.run(small)[0]
+        second_large = pipeline.run(large)[0]
+
+        np.testing.assert_array_equal(first_small, expected_small)
+        np.testing.assert_array_equal(second_large, expected_large)
+        # Earlier results are not overwritten by later calls
+        np.testing.assert_array_equal(first_large, expected_large)
+
+    def test_shared_pipeline_is_thread_safe(self):
+        cards = [synthetic_card(900 + 100 * seed, 1400, seed=seed) for seed in range(4)]
+        expected = [PreprocessingPipeline().run(card)[0] for card in cards]
+
+        pipeline = PreprocessingPipeline()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda card: pipeline.run(card)[0], cards * 3))
+        for result, expected_image in zip(results, expected * 3):
+            np.testing.assert_array_equal(result, expected_image)
+
+    def test_legacy_preprocessing_accepts_grayscale(self):
+        card = synthetic_card(600, 1000)
+        gray = cv2.cvtColor(card, cv2.COLOR_BGR2GRAY)
+
+        processed = ocr_processor.preprocess_aadhaar_image(gray)
+        self.assertEqual(processed.shape, gray.shape)
+        self.assertTrue(set(np.unique(processed)) <= {0, 255})
+        np.testing.assert_array_equal(processed, ocr_processor.preprocess_aadhaar_image(card))
+
+
+# Per-field extraction that ocr.fields.scan_aadhaar_lines replaced, logging removed
+
+LEGACY_WATERMARK_PATTERNS = [
+    r'.*scann?ed?\s+by.*', r'.*camscann?er.*', r'.*scanner.*app.*', r'.*document.*scanner.*',
+    r'.*pdf.*scanner.*', r'.*created.*with.*', r'.*powered.*by.*', r'.*download.*from.*',
+    r'.*available.*on.*', r'.*play.*store.*', r'.*app.*store.*',
+]
+LEGACY_NUMBER_PATTERNS = [
+    r'\b\d{4}\s+\d{4}\s+\d{4}\b', r'\b\d{4}-\d{4}-\d{4}\b', r'\b\d{12}\b', r'\b\d{4}\s*\d{4}\s*\d{4}\b',
+    r'(?:आधार|Aadhaar|AADHAAR).*?(\d{4}\s*\d{4}\s*\d{4})', r'(?:No\.?|Number|संख्या).*?(\d{4}\s*\d{4}\s*\d{4})',
+]
+LEGACY_DOB_PATTERNS = [
+    r'\b\d{2}/\d{2}/\d{4}\b', r'\b\d{2}-\d{2}-\d{4}\b', r'\b\d{2}\.\d{2}\.\d{4}\b', r'\b\d{1,2}/\d{1,2}/\d{4}\b',
+    r'\b\d{1,2}-\d{1,2}-\d{4}\b', r'\b\d{4}/\d{2}/\d{2}\b', r'\b\d{4}-\d{2}-\d{2}\b',
+]
+
+
+def legacy_without_watermarks(lines):
+    return [line for line in lines
+            if not any(re.search(pattern, line.strip().lower(), re.IGNORECASE) for pattern in LEGACY_WATERMARK_PATTERNS)]
+
+
+def legacy_extract_number(lines):
+    for line in legacy_without_watermarks(lines):
+        for pattern in LEGACY_NUMBER_PATTERNS:
+            for match in re.findall(pattern, line.strip(), re.IGNORECASE):
+                number = (match[0] if match else '') if isinstance(match, tuple) else match
+                digits = re.sub(r'\D', '', number)
+                if len(digits) == 12 and digits.isdigit():
+                    return f"{digits[:4]} {digits[4:8]} {digits[8:]}"
+    return None
+
+
+def legacy_extract_name(lines):
+    candidates = []
+    for line in legacy_without_watermarks(lines):
+        line = line.strip()
+        if len(line) < 3 or re.search(r'\d{4}\s*\d{4}\s*\d{4}', line) or re.search(r'\d{2}/\d{2}/\d{4}', line):
+            continue
+        words = []
+        for word in re.sub(r'[^\w\s]', ' ', line).split():
+            if word.lower() in ocr_fields.AADHAAR_FILTER_KEYWORDS:
+                continue
+            if re.search(r'\d', word) and len(re.findall(r'\d', word)) > len(word) * 0.3:
+                continue
+            if len(word) < 2 or len(word) > 25 or not re.search(r'[a-zA-Z]', word):
+                continue
+            words.append(word)
+        if words and 3 <= len(' '.join(words)) <= 50 and len(words) <= 4:
+            candidates.append((' '.join(words), len(words) * 0.25))
+    return max(candidates, key=lambda candidate: candidate[1])[0] if candidates else None
+
+
+def legacy_extract_dob(lines):
+    for line in lines:
+        for pattern in LEGACY_DOB_PATTERNS:
+            match = re.search(pattern, line)
+            if match and (re.match(r'\d{2}/\d{2}/\d{4}', match.group())
+                          or re.match(r'\d{1,2}/\d{1,2}/\d{4}', match.group())):
+                return match.group()
+    return None
+
+
+class AadhaarFieldExtractionTests(TestCase):
+    """scan_aadhaar_lines finds the same number, name and DOB as the per-field functions it replaced"""
+
+    LINE_SETS = {
+        'clean card': ['GOVERNMENT OF INDIA', 'Ravi Kumar', 'DOB: 01/01/1990', 'Male', '2345 6789 0123'],
+        'watermarks': ['Scanned by CamScanner Ramesh', 'Sunita Devi', 'Download from Play Store 3456 7890 1234',
+                       'DOB: 12/11/1985 Created with PDF Scanner app', '4567 8901 2345'],
+        'watermark only name': ['Scannd by CamScanner Priya Sharma', 'Female'],
+        'name split by keywords': ['Government Ravi India Kumar Card', 'Ravi', 'पुरुष / MALE', '2345-6789-0123'],
+        'longest name wins': ['Anil', 'Anil Kumar Singh', 'Anil Kumar', 'Aadhaar No. 234567890123'],
+        'short slash DOB': ['जन्म तिथि / DOB : 3/7/1992', 'Meena Patil', 'No. 2345 6789 0123'],
+        'both DOB formats': ['Issued 5/6/2015', 'DOB: 01/02/1990'],
+        'other date formats only': ['DOB 01-02-1990', 'Printed 2015/06/05', 'DOB: 01.02.1990', 'Lata Rao'],
+        'number split across lines': ['Suresh Patil', '2345 6789', '0123', 'DOB: 09/09/1999'],
+        'number after keyword': ['Aadhaar number', 'Your Aadhaar No: 2345 6789 0123', 'VID: 9123 4567 8901 2345'],
+        'nothing found': ['Male', '|', 'Il', 'Year of Birth: 1990'],
+        'empty': [],
+    }
+
+    def test_matches_per_field_extraction(self):
+        for label, lines in self.LINE_SETS.items():
+            with self.subTest(label):
+                self.assertEqual(ocr_fields.scan_aadhaar_lines(lines), {
+                    'number': legacy_extract_number(lines),
+                    'name': legacy_extract_name(lines),
+                    'dob': legacy_extract_dob(lines),
+                })
+
+    def test_expected_fields(self):
+        scan = ocr_fields.scan_aadhaar_lines
+        self.assertEqual(scan(self.LINE_SETS['watermarks']),
+                         {'number': '4567 8901 2345', 'name': 'Sunita Devi', 'dob': '12/11/1985'})
+        self.assertEqual(scan(self.LINE_SETS['name split by keywords'])['name'], 'Ravi Kumar')
+        self.assertEqual(scan(self.LINE_SETS['both DOB formats'])['dob'], '5/6/2015')
+        self.assertIsNone(scan(self.LINE_SETS['other date formats only'])['dob'])
+        self.assertIsNone(scan(self.LINE_SETS['number split across lines'])['number'])
+
+    def test_missing_fields_are_empty_strings(self):
+        for text in ('Male\n2345 6789 0123\nDOB: 01/01/1990', ''):
+            with self.subTest(text=text):
+                fields = ocr_processor.extract_id_fields(text)
+                self.assertEqual(fields['Name'], '')
+                self.assertEqual(set(fields), {'Name', 'DOB', 'ID Number'})
+        self.assertEqual(ocr_processor.extract_id_fields('Male'), {'Name': '', 'DOB': '', 'ID Number': ''})
+
+
+AADHAAR_QR = '<PrintLetterBarcodeData uid="234567890123" name="Ravi Kumar" gender="M" dob="01/01/1990"/>'
+AADHAAR_BARCODE = '234567890123'
+
+
+class AadhaarCodeScanTests(TestCase):
+    """QR/barcode decode ladder: downscaled, then the QR region, then the full image"""
+
+    # 1600x2000 photo: downscaled to 800x1000, QR region (right half) is 1600x1000
+    STAGES = {(800, 1000): 'downscaled', (1600, 1000): 'region', (1600, 2000): 'full'}
+
+    def setUp(self):
+        self.service = code_scanning.AadhaarVerificationService()
+        self.decoded = []
+
+    def scan(self, found, shape=(1600, 2000)):
+        """Scan a blank image whose stages decode the symbols in found: {stage: [data, ...]}"""
+        def decode(image):
+            stage = self.STAGES.get(image.shape, f'{image.shape[0]}x{image.shape[1]}')
+            self.decoded.append(stage)
+            return [SimpleNamespace(data=data.encode()) for data in found.get(stage, [])]
+
+        pyzbar = SimpleNamespace(decode=decode)
+        with mock.patch.object(code_scanning, 'PYZBAR_AVAILABLE', True), \
+                mock.patch.object(code_scanning, 'pyzbar', pyzbar, create=True):
+            return self.service._scan_codes(np.full(shape, 255, dtype=np.uint8))
+
+    def test_qr_in_downscaled_image(self):
+        self.assertEqual(self.scan({'downscaled': [AADHAAR_QR], 'full': [AADHAAR_QR]}), (AADHAAR_QR, None))
+        self.assertEqual(self.decoded, ['downscaled'])
+        self.assertEqual(self.service.stats(), {'qr_downscaled': 1})
+
+    def test_qr_in_region_then_full_image(self):
+        self.assertEqual(self.scan({'region': [AADHAAR_QR]}), (AADHAAR_QR, None))
+        self.assertEqual(self.scan({'full': [AADHAAR_QR]}), (AADHAAR_QR, None))
+        self.assertEqual(self.decoded, ['downscaled', 'region', 'downscaled', 'region', 'full'])
+        self.assertEqual(self.service.stats(), {'qr_region': 1, 'qr_full': 1})
+
+    def test_small_image_skips_downscale(self):
+        self.STAGES = {(600, 450): 'region', (600, 900): 'full'}
+        self.assertEqual(self.scan({'full': [AADHAAR_QR]}, shape=(600, 900)), (AADHAAR_QR, None))
+        self.assertEqual(self.decoded, ['region', 'full'])
+
+    def test_barcode_kept_until_no_qr_turns_up(self):
+        self.assertEqual(self.scan({'downscaled': [AADHAAR_BARCODE], 'region': ['999999999999']}),
+                         (None, AADHAAR_BARCODE))
+        self.assertEqual(self.decoded, ['downscaled', 'region', 'full'])
+        self.assertEqual(self.service.stats(), {'barcode_downscaled': 1})
+
+        # A QR code found later still wins, and the barcode is not counted
+        self.assertEqual(self.scan({'downscaled': [AADHAAR_BARCODE], 'full': [AADHAAR_QR]}), (AADHAAR_QR, None))
+        self.assertEqual(self.service.stats(), {'barcode_downscaled': 1, 'qr_full': 1})
+
+    def test_symbols_are_classified(self):
+        found = ['https://example.com', '<Other name="x"/>', '12345', AADHAAR_BARCODE, ' 345678901234 ', AADHAAR_QR]
+        self.assertEqual(self.scan({'downscaled': found}), (AADHAAR_QR, None))
+        self.assertEqual(self.scan({'downscaled': found[:-1]}), (None, AADHAAR_BARCODE))
+        self.assertEqual(self.scan({'downscaled': found[:3]}), (None, None))
+
+    def test_verification_outcomes_are_counted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'card.png')
+            cv2.imwrite(path, np.full((1600, 2000), 255, dtype=np.uint8))
+            with mock.patch.object(self.service, '_extract_text_ocr', return_value='2345 6789 0123'):
+                with mock.patch.object(self.service, '_scan_codes', return_value=(AADHAAR_QR, None)):
+                    qr = self.service.verify_aadhaar_image(path)
+                with mock.patch.object(self.service, '_scan_codes', return_value=(None, None)):
+                    ocr = self.service.verify_aadhaar_image(path)
+
+        self.assertEqual(qr['verification_method'], 'qr_code')
+        self.assertEqual(qr['extracted_data']['aadhaar_number'], '234567890123')
+        self.assertEqual(self.service.stats(), {'ocr_fallback': 1})
+        self.assertEqual(ocr['extracted_data']['aadhaar_number'], '234567890123')
+
+
+class InstrumentationLogTests(TestCase):
+    """The process's OCR stage timings and counters reach the log as a periodic JSON line"""
+
+    def setUp(self):
+        self.addCleanup(instrumentation.log_snapshot_every, settings.OCR_METRICS_LOG_SECONDS)
+        instrumentation.reset()
+        self.addCleanup(instrumentation.reset)
+
+    def logged_snapshots(self, logs):
+        return [json.loads(line.split('ocr_metrics ', 1)[1]) for line in logs.output]
+
+    def test_snapshot_is_logged_once_per_interval(self):
+        instrumentation.log_snapshot_every(0.05)
+        with self.assertLogs('utils.instrumentation', 'INFO') as logs:
+            instrumentation.count('qr_decoded')
+            time.sleep(0.06)
+            instrumentation.record_timing('ocr.read', 12.5)  # Due: logs the totals so far
+            instrumentation.count('qr_decoded')  # Not due again yet
+            instrumentation.log_snapshot()
+
+        first, last = self.logged_snapshots(logs)
+        self.assertEqual(first, {'counters': {'qr_decoded': 1},
+                                 'spans': {'ocr.read': {'calls': 1, 'total_ms': 12.5, 'mean_ms': 12.5}}})
+        self.assertEqual(last['counters'], {'qr_decoded': 2})
+
+    def test_turned_off(self):
+        instrumentation.log_snapshot_every(0)
+        with self.assertNoLogs('utils.instrumentation', 'INFO'):
+            instrumentation.count('qr_decoded')
+            instrumentation.record_timing('ocr.read', 1.0)
+
+    def test_verification_module_enables_it_from_settings(self):
+        self.assertEqual(instrumentation._log_interval, settings.OCR_METRICS_LOG_SECONDS)
+
+
+class AsyncAadhaarVerificationTests(TransactionTestCase):
+    """
+    The async verify-aadhaar mode ends with the same response as the synchronous one
+
+    Job states are written to the database cache from the pool's threads, on their own
+    connections, so these tests can't run inside a transaction.
+    """
+
+    def upload(self, **params):
+        image = SimpleUploadedFile('card.png', b'\x89PNG\r\n\x1a\n not really a card', content_type='image/png')
+        return APIClient().post('/api/verify-aadhaar/' + ('?async=1' if params.get('async_mode') else ''),
+                                {'name': 'Ravi Kumar', 'aadhaar_image': image}, format='multipart')
+
+    def test_job_result_matches_synchronous_response(self):
+        sync_response = self.upload()
+
+        queued = self.upload(async_mode=True)
+        self.assertEqual(queued.status_code, 202)
+        self.assertEqual(queued.data['verification_status'], 'queued')
+
+        done = APIClient().get(f"{queued.data['status_url']}?wait=10")
+        self.assertEqual(done.status_code, sync_response.status_code)
+        self.assertEqual(done.data, sync_response.data)
+
+    def test_job_run_by_another_process_is_found(self):
+        # Job states live in the shared "verification_jobs" cache, not in this process
+        self.assertNotIn('LocMemCache', settings.CACHES['verification_jobs']['BACKEND'])
+        caches['verification_jobs'].set(f'{VerificationJobs.KEY_PREFIX}elsewhere', {'status': 'running'})
+        self.assertEqual(APIClient().get('/api/verify-aadhaar/jobs/elsewhere/').data['verification_status'],
+                         'running')
+
+        result = {'success': True, 'verification_status': 'verified'}
+        caches['verification_jobs'].set(f'{VerificationJobs.KEY_PREFIX}elsewhere',
+                                        {'status': 'done', 'result': result, 'status_code': 200})
+        done = APIClient().get('/api/verify-aadhaar/jobs/elsewhere/')
+        self.assertEqual((done.status_code, done.data), (200, result))
+
+    def test_unknown_job(self):
+        response = APIClient().get('/api/verify-aadhaar/jobs/missing/')
+        self.assertEqual(response.status_code, 404)
+
+
+class OcrResultCacheTests(TestCase):
+    """Re-uploading the same image reuses its OCR output and only re-runs name matching"""
+
+    def setUp(self):
+        caches['ocr_results'].clear()
+
+    def test_reupload_skips_ocr(self):
+        fields = {'Name': 'Ravi Kumar', 'ID Number': '2345 6789 0123', 'DOB': '01/01/1990'}
+        image = b'\x89PNG\r\n\x1a\n card'
+        with mock.patch.object(aadhaar_verification, '_run_ocr', return_value=('Ravi Kumar', fields)) as run_ocr:
+            mismatch, _ = aadhaar_verification.verify_aadhaar_image(image, 'Suresh Patil')
+            retry, status_code = aadhaar_verification.verify_aadhaar_image(image, 'Ravi Kumar')
+            aadhaar_verification.verify_aadhaar_image(image + b'\x00', 'Ravi Kumar')
+
+        self.assertEqual(run_ocr.call_count, 2)
+        self.assertEqual(mismatch['verification_status'], 'name_mismatch')
+        self.assertEqual(retry['extracted_data'], mismatch['extracted_data'])
+        self.assertEqual(retry['comparison']['provided_name'], 'Ravi Kumar')
+        # Only the OCR output is kept, never the image
+        self.assertEqual(set(caches['ocr_results'].get(ocr_result_cache.image_key(image))),
+                         {'extracted_text', 'extracted_fields'})
+
+
+@override_settings(OCR_TRACE_ENABLED=True)
+class OcrTraceTests(TestCase):
+    """Per-request OCR traces are recorded only when asked for"""
+
+    def setUp(self):
+        caches['ocr_results'].clear()
+
+    def upload(self, **headers):
+        image = SimpleUploadedFile('card.png', b'\x89PNG\r\n\x1a\n traced card', content_type='image/png')
+        return APIClient().post('/api/verify-aadhaar/', {'name': 'Ravi Kumar', 'aadhaar_image': image},
+                                format='multipart', **headers)
+
+    def test_trace_on_demand(self):
+        fields = {'Name': 'Ravi Kumar', 'ID Number': '2345 6789 0123', 'DOB': '01/01/1990'}
+        with mock.patch.object(aadhaar_verification, '_run_ocr', return_value=('Ravi Kumar', fields)):
+            plain = self.upload()
+            traced = self.upload(HTTP_X_OCR_TRACE='1', HTTP_X_REQUEST_ID='req-42')
+
+        self.assertNotIn('trace', plain.data)
+        trace = traced.data['trace']
+        self.assertEqual(trace['trace_id'], 'req-42')
+        self.assertEqual({span['name'] for span in trace['spans']}, {'name_match', 'verify.total'})
+        self.assertIn("Name matching 'Ravi Kumar' against 'Ravi Kumar'", trace['events'])
+
+
+class UploadTests(TestCase):
+    """Uploads decode from Django's buffers and get unique temp paths"""
+
+    def setUp(self):
+        image = np.zeros((40, 60), dtype=np.uint8)
+        image[10:30, 20:40] = 255
+        self.image = image
+        self.content = cv2.imencode('.png', image)[1].tobytes()
+
+    def temporary_upload(self):
+        upload = TemporaryUploadedFile('card.png', 'image/png', len(self.content), None)
+        upload.write(self.content)
+        return upload
+
+    def test_decode_from_memory_and_temp_file(self):
+        for upload in (SimpleUploadedFile('card.png', self.content), self.temporary_upload()):
+            np.testing.assert_array_equal(upload_to_ndarray(upload), self.image)
+            upload.close()  # Buffer was released, so Django can close the upload
+
+    def test_buffer_is_not_copied(self):
+        upload = SimpleUploadedFile('card.png', self.content)
+        with open_upload_buffer(upload) as buffer:
+            self.assertEqual(buffer, self.content)
+            self.assertTrue(buffer.readonly)
+
+    def test_same_named_uploads_get_unique_temp_paths(self):
+        first, second = SimpleUploadedFile('card.png', b'one'), SimpleUploadedFile('card.png', b'two')
+        with upload_temp_path(first) as first_path, upload_temp_path(second) as second_path:
+            self.assertNotEqual(first_path, second_path)
+            with open(second_path, 'rb') as f:
+                self.assertEqual(f.read(), b'two')
+        self.assertFalse(os.path.exists(first_path))
+        self.assertFalse(os.path.exists(second_path))
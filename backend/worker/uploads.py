@@ -0,0 +1,90 @@
+"""
+Uploaded image access without extra copies
+Verification endpoints read uploads through these helpers instead of
+file.read() / writing "temp_<client filename>" into the working directory:
+small uploads are used straight from Django's in-memory buffer, large ones are
+memory-mapped from the temp file Django already wrote, and anything that needs
+a path on disk gets a unique one.
+"""
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+
+
+@contextmanager
+def open_upload_buffer(upload):
+    """
+    Read-only view of an upload's bytes, valid inside the with block
+
+    In-memory uploads expose their BytesIO buffer and temp-file uploads are
+    memory-mapped, so neither is copied. The view is released on exit (Django
+    can't close the upload while it is exported); copy it with bytes() to keep
+    the data longer, e.g. for a background job.
+    """
+    mapped = None
+    if isinstance(upload, InMemoryUploadedFile):
+        view = upload.file.getbuffer().toreadonly()
+    elif isinstance(upload, TemporaryUploadedFile) and upload.size:
+        upload.file.flush()
+        mapped = mmap.mmap(upload.file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+    else:
+        upload.seek(0)
+        view = memoryview(upload.read())
+
+    try:
+        yield view
+    finally:
+        view.release()
+        if mapped is not None:
+            mapped.close()
+
+
+def upload_to_ndarray(upload, flags: int = cv2.IMREAD_GRAYSCALE) -> np.ndarray:
+    """
+    Decode an uploaded image straight from its buffer
+
+    Args:
+        upload: Django UploadedFile
+        flags: cv2.imdecode flags (grayscale by default, which is what OCR uses)
+
+    Returns:
+        The decoded image
+
+    Raises:
+        ValueError: If the upload is not a decodable image
+    """
+    with open_upload_buffer(upload) as buffer:
+        image = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), flags)
+    if image is None:
+        raise ValueError("Could not decode image from uploaded file.")
+    return image
+
+
+@contextmanager
+def upload_temp_path(upload):
+    """
+    Path of a file holding the upload, for tools that only take paths
+
+    Uploads Django spooled to disk are used in place; others are written to a
+    uniquely named temp file (same extension) that is removed afterwards.
+    """
+    if isinstance(upload, TemporaryUploadedFile):
+        upload.file.flush()
+        yield upload.temporary_file_path()
+        return
+
+    suffix = os.path.splitext(upload.name or '')[1]
+    fd, path = tempfile.mkstemp(prefix='upload_', suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as dest:
+            for chunk in upload.chunks():
+                dest.write(chunk)
+        yield path
+    finally:
+        os.remove(path)
@@ -17,6 +17,7 @@ urlpatterns = [
     path('users/<str:uid>/notifications/', views.get_notifications, name='get_notifications'),
     path('users/<str:uid>/notifications/mark-read/<int:notification_id>/', views.mark_notification_read, name='mark_notification_read'),
     path('users/<str:uid>/notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
+    path('users/<str:uid>/notifications/stream/', views.notification_stream, name='notification_stream'),
     path('users/<str:uid>/payment-log/', views.payment_log_view, name='payment_log_view'),
 
     # Legacy endpoints (keeping for backward compatibility)
@@ -41,4 +42,5 @@ urlpatterns = [
     path('auth/verify-otp/', views.verify_otp, name='verify_otp'),
     path('register-worker/', views.register_worker, name='register_worker'),
     path('verify-aadhaar/', views.verify_aadhaar_card, name='verify_aadhaar'),
+    path('verify-aadhaar/jobs/<str:job_id>/', views.get_aadhaar_verification_job, name='get_aadhaar_verification_job'),
 ]
@@ -0,0 +1,137 @@
+"""
+Background verification jobs
+Slow verifications (Aadhaar OCR) run in a bounded local thread pool instead of
+the request thread. The POST returns a job id; clients poll or long-poll the
+job's status, which lives in the "verification_jobs" cache alias. That cache
+must be shared between processes (database, Redis or Memcached, not local
+memory) so any worker can answer a poll for a job another worker runs.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+
+
+class VerificationJobs:
+    """
+    Bounded pool of verification jobs
+
+    Args:
+        max_workers: Jobs running at once
+        max_pending: Jobs allowed to wait for a worker; submit() refuses beyond that
+        result_ttl: Seconds a job's status and result stay retrievable
+        alias: Cache holding the job states, shared by every process
+    """
+
+    KEY_PREFIX = 'verification_job:'
+    # Cross-process long-polls re-read the cache this often
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, result_ttl: int = 600,
+                 alias: str = 'verification_jobs'):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.alias = alias
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Completion events for jobs running in this process, for long-polling
+        self._events: Dict[str, threading.Event] = {}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def submit(self, func: Callable, *args) -> Optional[str]:
+        """
+        Queue func(*args), which must return (response data, HTTP status code)
+
+        Returns:
+            The job id, or None when the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        job_id = uuid.uuid4().hex
+        self._events[job_id] = threading.Event()
+        self._set(job_id, {'status': QUEUED})
+        self._get_executor().submit(self._run, job_id, func, args)
+        return job_id
+
+    def get(self, job_id: str, wait: float = 0) -> Optional[Dict]:
+        """
+        Current state of a job: {'status': ...} plus 'result' and 'status_code' once done
+
+        Args:
+            job_id: Id returned by submit()
+            wait: Seconds to wait for the job to finish before answering (long-poll)
+
+        Returns:
+            The job state, or None for unknown or expired jobs
+        """
+        state = self.cache.get(self._key(job_id))
+        if state is None or state['status'] == DONE or wait <= 0:
+            return state
+
+        event = self._events.get(job_id)
+        if event is not None:
+            event.wait(wait)
+            return self.cache.get(self._key(job_id))
+
+        # Running in another process: poll the shared cache until the deadline
+        deadline = time.monotonic() + wait
+        while state is not None and state['status'] != DONE and time.monotonic() < deadline:
+            time.sleep(min(self.POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+            state = self.cache.get(self._key(job_id))
+        return state
+
+    def _run(self, job_id: str, func: Callable, args):
+        try:
+            self._set(job_id, {'status': RUNNING})
+            try:
+                data, status_code = func(*args)
+            except Exception as e:
+                logger.exception(f"Verification job {job_id} failed")
+                data, status_code = {
+                    'success': False,
+                    'error': f'Verification system error: {str(e)}',
+                    'verification_status': 'system_error'
+                }, status.HTTP_500_INTERNAL_SERVER_ERROR
+            self._set(job_id, {'status': DONE, 'result': data, 'status_code': status_code})
+        finally:
+            self._slots.release()
+            event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='verification-job')
+        return self._executor
+
+    def _set(self, job_id: str, state: Dict):
+        self.cache.set(self._key(job_id), state, self.result_ttl)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+
+# Global instance
+verification_jobs = VerificationJobs(
+    max_workers=settings.VERIFICATION_JOB_WORKERS,
+    max_pending=settings.VERIFICATION_JOB_QUEUE_SIZE,
+)
@@ -1,10 +1,16 @@
+import logging
 import os
+import uuid
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db.models import Max
 from django.utils import timezone
-from .models import User, Job, Rating, PaymentLog, Certification, Portfolio, WorkHistory
+from django.views.decorators.http import require_GET
+from .models import User, Job, Rating, PaymentLog, Certification, Portfolio, WorkHistory, Notification
 from .serializers import UserSerializer, JobSerializer, RatingSerializer, PaymentLogSerializer, CertificationSerializer, PortfolioSerializer, WorkHistorySerializer, NotificationSerializer
 
 # --- AI/ML SERVICE IMPORTS ---
@@ -62,14 +68,23 @@ except ImportError:
 
 # Import notification service
 try:
-    from services.notification_service import notification_service
+    from services.notification_service import notification_service, serialize_notification
+    from services.notification_pubsub import get_broker
     NOTIFICATION_AVAILABLE = True
 except ImportError:
     NOTIFICATION_AVAILABLE = False
 # Wage recommendation service removed - using built-in recommendation engine
 
 from .sms_util import send_otp_via_fast2sms, generate_otp, cache_otp,verify_otp_in_cache
-from .recommendation_service import recommendation_service
+from .recommendation_service import recommendation_service, jobs_in_order
+from .aadhaar_verification import verify_aadhaar_image
+from .verification_jobs import verification_jobs
+from .uploads import open_upload_buffer, upload_temp_path
+
+logger = logging.getLogger(__name__)
+
+# Longest a verification status request may long-poll
+MAX_JOB_WAIT_SECONDS = 25
 
 # Import Aadhaar verification service
 try:
@@ -83,10 +98,14 @@ try:
         sys.path.append(ocr_path)
 
     from ocr.processor import extract_text_from_image, extract_id_fields, enhanced_fuzzy_match
+    from ocr.reader import ocr_available
     from utils.helpers import preprocess_image_from_streamlit, validate_image_quality, enhance_text_regions
 
-    AADHAAR_VERIFICATION_AVAILABLE = True
-    print("✅ Your AI/ML OCR service loaded successfully with EasyOCR")
+    # The EasyOCR model itself loads on the first verification request (or lives in the OCR server)
+    AADHAAR_VERIFICATION_AVAILABLE = ocr_available()
+    if not AADHAAR_VERIFICATION_AVAILABLE:
+        raise ImportError("No module named 'easyocr' and OCR_SERVER_ADDRESS is not set")
+    print("✅ Your AI/ML OCR service is available (EasyOCR loads on first use)")
 except Exception as e:
     print(f"⚠️ AI/ML OCR service not available: {e}")
     print("Using mock OCR for testing")
@@ -268,14 +287,8 @@ def get_job_recommendations(request, uid):
         # Use enhanced recommendation engine
         if RECOMMENDATION_AVAILABLE:
             recommended_jobs_data = recommendation_engine.get_recommendations(uid, limit=10)
-            # Convert to Job objects for serialization
-            recommended_jobs = []
-            for job_data in recommended_jobs_data:
-                try:
-                    job = Job.objects.get(id=job_data['id'])
-                    recommended_jobs.append(job)
-                except Job.DoesNotExist:
-                    continue
+            # Convert to Job objects for serialization (one query, ranking order kept)
+            recommended_jobs = jobs_in_order([job_data['id'] for job_data in recommended_jobs_data])
         else:
             # Fallback to simple filtering
             recommended_jobs = Job.objects.filter(status='open')[:10]
@@ -359,15 +372,12 @@ def verify_certificate_ocr(request, uid):
     try:
         user = User.objects.get(uid=uid, userType='skilled')
         image_file = request.FILES['certificate_image']
-        temp_image_path = f"temp_{image_file.name}"
-        with open(temp_image_path, 'wb+') as dest:
-            for chunk in image_file.chunks(): dest.write(chunk)
-
-        # Use real OCR service
-        ocr_result = ocr_service.process_certificate_image(temp_image_path)
+        # Unique path per upload (removed afterwards), so same-named uploads don't collide
+        with upload_temp_path(image_file) as temp_image_path:
+            # Use real OCR service
+            ocr_result = ocr_service.process_certificate_image(temp_image_path)
         is_valid, reasons = ocr_service.verify_certificate_authenticity(ocr_result.get('certificate_data', {}))
         id_data = ocr_result.get('certificate_data', {})
-        os.remove(temp_image_path)
         if is_valid and user.name.lower() in id_data.get('name', '').lower():
             user.isVerified = True
             user.save()
@@ -379,8 +389,6 @@ def verify_certificate_ocr(request, uid):
     except User.DoesNotExist:
         return Response({'error': 'Skilled worker not found.'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
-        if 'temp_image_path' in locals() and os.path.exists(temp_image_path):
-            os.remove(temp_image_path)
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['POST'])
@@ -511,14 +519,9 @@ def upload_certificate(request, uid):
         title = request.data.get('title', 'Certificate')
         cert_type = request.data.get('type', 'government')
 
-        # Save image temporarily for OCR processing
-        temp_image_path = f"temp_cert_{image_file.name}"
-        with open(temp_image_path, 'wb+') as dest:
-            for chunk in image_file.chunks():
-                dest.write(chunk)
-
         # Simple name verification without OCR
         # For production: In a real system, this would extract the name from the certificate image using OCR
+        # (decode it with uploads.upload_to_ndarray(image_file) rather than saving a temp file)
         # For now, we simulate this by assuming the certificate contains the user's name
         # In practice, you would integrate with a real OCR service here
 
@@ -606,14 +609,6 @@ def upload_certificate(request, uid):
             user.isVerified = True
             user.save()
 
-        # Clean up temp file
-        try:
-            if os.path.exists(temp_image_path):
-                os.remove(temp_image_path)
-        except Exception as cleanup_error:
-            # Log cleanup error but don't fail the request
-            print(f"Warning: Failed to clean up temp file {temp_image_path}: {cleanup_error}")
-
         serializer = CertificationSerializer(certificate)
 
         # Prepare response message based on verification results
@@ -761,27 +756,33 @@ def save_course_certificate(request, uid):
 
 # Notification endpoints
 
+MAX_NOTIFICATION_PAGE_SIZE = 100
+
 @api_view(['GET'])
 def get_notifications(request, uid):
     """Get notifications for a user"""
     try:
         if NOTIFICATION_AVAILABLE:
             unread_only = request.query_params.get('unread_only', 'false').lower() == 'true'
-            limit = int(request.query_params.get('limit', 20))
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), MAX_NOTIFICATION_PAGE_SIZE)
+            # Keyset pagination: pass back next_cursor from the previous response
+            cursor = request.query_params.get('cursor')
 
-            notifications = notification_service.get_user_notifications(uid, limit, unread_only)
+            notifications, next_cursor = notification_service.get_notifications_page(uid, limit, unread_only, cursor)
             unread_count = notification_service.get_unread_count(uid)
 
             return Response({
                 'notifications': notifications,
                 'unread_count': unread_count,
-                'total_count': len(notifications)
+                'total_count': len(notifications),
+                'next_cursor': next_cursor
             })
         else:
             return Response({
                 'notifications': [],
                 'unread_count': 0,
                 'total_count': 0,
+                'next_cursor': None,
                 'message': 'Notification service not available'
             })
 
@@ -820,6 +821,102 @@ def mark_all_notifications_read(request, uid):
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+# Server-sent event stream of new notifications
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = 15
+# Notifications read per query when replaying missed ones from the database
+NOTIFICATION_STREAM_REPLAY_PAGE = 100
+
+
+def _sse(data, event_id=None, event='notification'):
+    """One server-sent event"""
+    lines = f"event: {event}\n" + (f"id: {event_id}\n" if event_id is not None else '')
+    return f"{lines}data: {json.dumps(data)}\n\n"
+
+
+async def _notifications_after(uid, after_id):
+    """Every notification of the user with an id above after_id, oldest first, a page per query"""
+    while True:
+        page = [notification async for notification in Notification.objects.filter(
+            user_id=uid, id__gt=after_id).order_by('id')[:NOTIFICATION_STREAM_REPLAY_PAGE]]
+        for notification in page:
+            yield notification
+        if len(page) < NOTIFICATION_STREAM_REPLAY_PAGE:
+            return
+        after_id = page[-1].id
+
+
+@require_GET
+async def notification_stream(request, uid):
+    """
+    Push a user's new notifications as server-sent events
+
+    Each `notification` event carries the same JSON as the notification listing
+    and the notification id as its event id. Browsers reconnect by themselves and
+    send the last id back in Last-Event-ID; every notification created meanwhile
+    is replayed from the database first. Events a slow client's buffer dropped
+    are replayed from the database the same way, and so are notifications
+    created by other processes, which the in-process broker never sees: the
+    database is checked again at every heartbeat, so they arrive within
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS. Needs the ASGI server (backend.asgi)
+    so an open stream doesn't hold a worker thread.
+    """
+    if not NOTIFICATION_AVAILABLE:
+        return JsonResponse({'error': 'Notification service not available'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Notification streaming needs the ASGI server (backend.asgi)'},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+    if not await User.objects.filter(uid=uid).aexists():
+        return JsonResponse({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    if last_event_id.isdigit():
+        last_id = int(last_event_id)
+    else:  # New client: only notifications created from here on are sent
+        latest = await Notification.objects.filter(user_id=uid).aaggregate(latest=Max('id'))
+        last_id = latest['latest'] or 0
+
+    async def events():
+        # Subscribe, then replay everything after last_id, so nothing created in between is missed
+        subscription = await get_broker().subscribe(uid)
+        try:
+            replayed_up_to = last_id
+            sent = set()  # Ids above replayed_up_to already sent live, so a replay skips them
+            dropped = subscription.dropped
+            replay = True
+            yield "retry: 3000\n\n"
+
+            while True:
+                if replay:
+                    async for notification in _notifications_after(uid, replayed_up_to):
+                        replayed_up_to = notification.id
+                        if notification.id not in sent:
+                            sent.add(notification.id)
+                            yield _sse(serialize_notification(notification), notification.id)
+                    sent = {event_id for event_id in sent if event_id > replayed_up_to}
+                    replay = False
+
+                data = await subscription.get(timeout=NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                if data is None:
+                    yield ": keep-alive\n\n"  # Comment line, keeps proxies from closing an idle stream
+                    # The broker only sees this process's notifications; pick up other processes' from the database
+                    replay = True
+                elif data['id'] > replayed_up_to and data['id'] not in sent:
+                    sent.add(data['id'])
+                    yield _sse(data, data['id'])
+
+                if subscription.dropped > dropped:
+                    # The buffer overflowed while the client was slow; the dropped events are in the database
+                    dropped = subscription.dropped
+                    replay = True
+        finally:
+            await subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+
 @api_view(['POST'])
 def register_worker(request):
     """Register a new blue-collar worker with complete profile"""
@@ -887,157 +984,65 @@ def verify_aadhaar_card(request):
                 'verification_status': 'failed'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Use your ENHANCED AI/ML OCR for Aadhaar verification
-        print(f"🤖 Starting ENHANCED Aadhaar verification for user: {user_name}")
-
-        # Try to use your enhanced AI/ML OCR first
-        try:
-            # Import your OCR functions locally to avoid global issues
-            import sys
-            import os
-            import cv2
-            import numpy as np
-
-            # Add your OCR module to path (updated path)
-            ocr_path = os.path.join(os.path.dirname(__file__), '..', 'services', 'ocr_id_verification', 'src')
-            if ocr_path not in sys.path:
-                sys.path.append(ocr_path)
-
-            from ocr.processor import extract_text_from_image, extract_id_fields, enhanced_fuzzy_match
-            from utils.helpers import preprocess_image_from_streamlit, validate_image_quality, enhance_text_regions
-
-            print("✅ Your ENHANCED AI/ML OCR modules loaded successfully with 80% strict matching and advanced preprocessing")
-
-            # Convert Django file to format your OCR can process
-            file_bytes = aadhaar_file.read()
-
-            # Create a file-like object that your OCR expects
-            class FileWrapper:
-                def __init__(self, content):
-                    self.content = content
-                    self.position = 0
-
-                def read(self):
-                    if self.position == 0:
-                        self.position = len(self.content)
-                        return self.content
-                    return b''
-
-            file_wrapper = FileWrapper(file_bytes)
-
-            # Enhanced image preprocessing with validation
-            print("🖼️ Starting enhanced image preprocessing...")
-            processed_image = preprocess_image_from_streamlit(file_wrapper)
-
-            # Validate image quality
-            is_quality_ok, quality_message = validate_image_quality(processed_image)
-            print(f"🔍 Image quality check: {quality_message}")
-
-            if not is_quality_ok:
-                print(f"⚠️ Image quality warning: {quality_message}")
-                # Continue processing but note the quality issue
-
-            # Enhance text regions for better OCR
-            enhanced_image = enhance_text_regions(processed_image)
-            print(f"✅ Image preprocessing and enhancement completed")
-
-            # Use your enhanced EasyOCR extraction
-            print("📄 Starting enhanced text extraction...")
-            extracted_text = extract_text_from_image(enhanced_image)
-            print(f"📄 Extracted text ({len(extracted_text)} chars): {extracted_text[:300]}...")  # First 300 chars
-
-            # Use your enhanced field extraction
-            print("🔍 Starting enhanced field extraction...")
-            extracted_fields = extract_id_fields(extracted_text)
-            print(f"🔍 Extracted fields: {extracted_fields}")
-
-            # Prepare response data
-            extracted_name = extracted_fields.get('Name', '').strip()
-            extracted_id = extracted_fields.get('ID Number', '').strip()
-            extracted_dob = extracted_fields.get('DOB', '').strip()
-
-            print(f"🎯 Primary extracted name: '{extracted_name}'")
-            print(f"🆔 Extracted Aadhaar number: '{extracted_id}'")
-            print(f"📅 Extracted DOB: '{extracted_dob}'")
-
-            # Enhanced name matching logic with fuzzy matching
-            name_match = False
-            confidence = 0.0
-            match_message = ""
-
-            # If we have an Aadhaar number, that's the primary verification
-            if extracted_id:
-                print(f"✅ Aadhaar number extracted: {extracted_id}")
-
-                # Use enhanced fuzzy matching for name verification
-                if extracted_name and user_name:
-                    print(f"🔍 Starting enhanced fuzzy matching...")
-                    name_match, confidence, match_message = enhanced_fuzzy_match(
-                        extracted_name, user_name, min_confidence=0.8
-                    )
-                    print(f"🎯 Enhanced matching result: {match_message}")
-                    # STRICT REQUIREMENT: No verification without proper name matching
-                    confidence = 0.0
-                    name_match = False
-                    print(f"❌ STRICT VERIFICATION FAILED: No name extracted from Aadhaar card")
-            else:
-                print(f"❌ No Aadhaar number extracted")
-
-            # STRICT VERIFICATION: Require BOTH Aadhaar number AND 80% name match
-            if extracted_id:
-                if name_match and confidence >= 0.8:  # Strict 80% requirement
-                    verification_status = 'verified'
-                    message = f'✅ Aadhaar verified successfully! Enhanced OCR with 80%+ name match achieved. (confidence: {confidence:.1%}) - {match_message}'
-                else:
-                    verification_status = 'name_mismatch'
-                    if extracted_name and len(extracted_name.strip()) > 0:
-                        if len(extracted_name.strip()) <= 2:
-                            message = f'❌ Name Verification Failed: OCR extracted incomplete name "{extracted_name}". Please upload a clearer image of your Aadhaar card where the full name is clearly visible.'
-                        else:
-                            message = f'❌ Name Verification Failed: Name verification failed. Aadhaar shows "{extracted_name}" but you entered "{user_name}". Please enter your full name as shown on your Aadhaar card.'
-                    else:
-                        message = f'❌ Name Verification Failed: Could not extract name from Aadhaar card. Please ensure the image is clear and shows your full name prominently.'
-            else:
-                verification_status = 'failed'
-                message = '❌ Aadhaar Number Not Found: Could not extract Aadhaar number from image. Please ensure the image is clear and shows the full Aadhaar card.'
-
-            # Determine success based on verification status
-            is_success = verification_status == 'verified'
-            status_code = status.HTTP_200_OK if is_success else status.HTTP_400_BAD_REQUEST
-
-            return Response({
-                'success': is_success,
-                'verification_status': verification_status,
-                'message': message,
-                'extracted_data': {
-                    'name': extracted_name,
-                    'aadhaar_number': extracted_id,
-                    'dob': extracted_dob,
-                    'raw_text': extracted_text[:500]  # First 500 chars for debugging
-                },
-                'comparison': {
-                    'name_match': name_match,
-                    'confidence': confidence,
-                    'extracted_name': extracted_name,
-                    'provided_name': user_name
-                },
-                'ocr_method': 'Enhanced_Aadhaar_OCR_v2_Advanced_Preprocessing_80_Percent_Strict'
-            }, status=status_code)
-
-        except Exception as ocr_error:
-            print(f"❌ ENHANCED AI/ML OCR error: {str(ocr_error)}")
-            # NO FALLBACK - Strict 80% matching required
-            return Response({
-                'success': False,
-                'verification_status': 'ocr_failed',
-                'message': f'OCR processing failed: {str(ocr_error)}. Please ensure the Aadhaar card image is clear and well-lit.',
-                'error': 'OCR_PROCESSING_ERROR'
-            }, status=status.HTTP_400_BAD_REQUEST)
+        # Debug mode: record this request's per-stage timings and per-line OCR trace
+        trace_id = None
+        if (settings.DEBUG or settings.OCR_TRACE_ENABLED) and str(
+                request.headers.get('X-OCR-Trace', request.query_params.get('trace', ''))).lower() in ('1', 'true', 'yes'):
+            trace_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+        # Work on Django's upload buffer instead of copying it out with read()
+        with open_upload_buffer(aadhaar_file) as file_bytes:
+            # Async mode: queue the OCR work and answer immediately with a job id
+            # (the job outlives the upload, so it gets its own copy of the bytes)
+            if str(request.query_params.get('async', request.data.get('async', ''))).lower() in ('1', 'true', 'yes'):
+                job_id = verification_jobs.submit(verify_aadhaar_image, bytes(file_bytes), user_name, trace_id)
+                if job_id is None:
+                    return Response({
+                        'success': False,
+                        'error': 'Verification queue is full, please retry shortly',
+                        'verification_status': 'busy'
+                    }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+
+                return Response({
+                    'success': True,
+                    'job_id': job_id,
+                    'verification_status': 'queued',
+                    'status_url': f'/api/verify-aadhaar/jobs/{job_id}/'
+                }, status=status.HTTP_202_ACCEPTED)
+
+            data, status_code = verify_aadhaar_image(file_bytes, user_name, trace_id)
+            return Response(data, status=status_code)
 
     except Exception as e:
-        print(f"❌ Unexpected error in verify_aadhaar_card: {str(e)}")
+        logger.exception("Unexpected error in verify_aadhaar_card")
         return Response({
             'success': False,
             'error': f'Verification system error: {str(e)}',
             'verification_status': 'system_error'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def get_aadhaar_verification_job(request, job_id):
+    """Status of an async Aadhaar verification; ?wait=<seconds> long-polls until it finishes"""
+    try:
+        wait = min(max(float(request.query_params.get('wait', 0)), 0.0), MAX_JOB_WAIT_SECONDS)
+    except ValueError:
+        wait = 0.0
+
+    job = verification_jobs.get(job_id, wait=wait)
+    if job is None:
+        return Response({
+            'success': False,
+            'error': 'Verification job not found or expired',
+            'verification_status': 'failed'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if job['status'] != 'done':
+        return Response({
+            'success': True,
+            'job_id': job_id,
+            'verification_status': job['status']
+        }, status=status.HTTP_202_ACCEPTED)
+
+    # Finished: the same body and status code the synchronous endpoint returns
+    return Response(job['result'], status=job['status_code'])